@@ -1,15 +1,34 @@
 import json
 import os
+import sys
 import time
+from dataclasses import asdict
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 
 import minedojo
-import numpy as np
 from openai import OpenAI
 
 from agent_state import AgentState
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from core.adapters.minedojo.action_codec import (  # noqa: E402
+    ActionStreamExtractor,
+    codec_for_space,
+)
+from core.adapters.minedojo.action_mapper import macro_length  # noqa: E402
+from core.llm.prompt import PromptBuilder  # noqa: E402
+from core.llm.providers.openai import OpenAIClient  # noqa: E402
+from core.llm.providers.transport import shared_httpx_client  # noqa: E402
+from core.llm.streaming import read_until  # noqa: E402
+from core.llm.types import LLMMessage, LLMRequest  # noqa: E402
+from core.models.signals import MacroAction  # noqa: E402
+from core.observability.summarizer import ObservationSummarizer  # noqa: E402
+from core.runtime.macro import MacroExecutor, triggers_from_names  # noqa: E402
+from core.runtime.pipeline import DecisionPipeline, state_matcher  # noqa: E402
+
 # test basic AI integration
 
 ROOT = Path(__file__).resolve().parent
@@ -22,6 +41,32 @@ TASK_ID = os.getenv("MINEDOJO_TASK_ID", "harvest_milk")
 MAX_STEPS = int(os.getenv("MAX_STEPS", "50"))
 INCLUDE_INVENTORY = os.getenv("INCLUDE_INVENTORY", "0") == "1"
 INCLUDE_VOXELS = os.getenv("INCLUDE_VOXELS", "0") == "1"
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1500"))
+# PIPELINE=1 overlaps the next LLM call with env.step (see DecisionPipeline).
+PIPELINE = os.getenv("PIPELINE", "0") == "1"
+# Unverified speculative actions allowed in a row before a fresh decision;
+# 0 commits only speculations whose decision-relevant state is unchanged.
+PIPELINE_MAX_STALENESS = int(os.getenv("PIPELINE_MAX_STALENESS", "0"))
+STEP_DELAY_S = float(os.getenv("STEP_DELAY_S", "0"))
+# MAX_MACRO_STEPS > 1 lets the model hold or chain an action for up to that
+# many env steps per LLM call; MACRO_INTERRUPTS end a macro early.
+MAX_MACRO_STEPS = int(os.getenv("MAX_MACRO_STEPS", "1"))
+MACRO_INTERRUPTS = os.getenv("MACRO_INTERRUPTS", "life_drop,reward,done").split(",")
+# STRUCTURED_OUTPUT=1 constrains the model to the action JSON schema.
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "0") == "1"
+# STREAM_ACTIONS=1 streams the response and stops reading once the action parses.
+STREAM_ACTIONS = os.getenv("STREAM_ACTIONS", "0") == "1"
+# State fields a speculative decision is checked against; world time and
+# other per-tick counters are left out so unchanged situations still match.
+DECISION_FIELDS = (
+    ("homeostasis",),
+    ("position",),
+    ("biome", "biome_name"),
+    ("lighting_weather", "is_raining"),
+    ("nearby",),
+    ("inventory_state",),
+    ("voxels",),
+)
 
 
 def load_env_file(path: Path) -> None:
@@ -37,26 +82,8 @@ def load_env_file(path: Path) -> None:
         os.environ.setdefault(key, value)
 
 
-def summarize_obs(obs):
-    summary = {}
-    if isinstance(obs, dict):
-        for k, v in obs.items():
-            summary[k] = summarize_obs(v)
-        return summary
-    if isinstance(obs, np.ndarray):
-        summary = {
-            "shape": list(obs.shape),
-            "dtype": str(obs.dtype),
-        }
-        if obs.size and np.issubdtype(obs.dtype, np.number):
-            summary["min"] = float(np.nanmin(obs))
-            summary["max"] = float(np.nanmax(obs))
-        return summary
-    if isinstance(obs, (list, tuple)):
-        return {"type": type(obs).__name__, "len": len(obs)}
-    if isinstance(obs, (int, float, str, bool)) or obs is None:
-        return obs
-    return {"type": type(obs).__name__}
+# Learns the observation layout on the first step and reuses it afterwards.
+summarize_obs = ObservationSummarizer()
 
 
 def action_space_info(space):
@@ -70,42 +97,12 @@ def action_space_info(space):
     return info
 
 
-def parse_action(text, space):
-    try:
-        data = json.loads(text)
-        action = data.get("action", None) if isinstance(data, dict) else None
-    except Exception:
-        action = None
-
-    if action is None:
-        return space.sample(), {"parsed": False, "raw": text}
-
-    if hasattr(space, "nvec"):
-        arr = np.array(action, dtype=np.int64).reshape(-1)
-        nvec = np.array(space.nvec, dtype=np.int64)
-        if arr.size != nvec.size:
-            return space.sample(), {"parsed": False, "raw": text}
-        arr = np.clip(arr, 0, nvec - 1)
-        return arr, {"parsed": True}
-
-    if hasattr(space, "n") and isinstance(action, int):
-        return int(max(0, min(space.n - 1, action))), {"parsed": True}
-
-    if hasattr(space, "shape"):
-        arr = np.array(action, dtype=np.float32).reshape(space.shape)
-        if hasattr(space, "low") and hasattr(space, "high"):
-            arr = np.clip(arr, space.low, space.high)
-        return arr, {"parsed": True}
-
-    return space.sample(), {"parsed": False, "raw": text}
-
-
 def main():
     load_env_file(SECRETS_ENV)
     if "OPENAI_API_KEY" not in os.environ:
         raise RuntimeError("OPENAI_API_KEY not set. Add it to .env or export it.")
 
-    client = OpenAI()
+    client = OpenAI(http_client=shared_httpx_client())
     env = minedojo.make(task_id=TASK_ID, image_size=(160, 256))
 
     task_prompt, task_guidance = minedojo.tasks.ALL_PROGRAMMATIC_TASK_INSTRUCTIONS[
@@ -113,62 +110,141 @@ def main():
     ]
     space = env.action_space
     space_info = action_space_info(space)
-
-    obs = env.reset()
-    info = {}
-    TELEMETRY_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with TELEMETRY_PATH.open("a", encoding="utf-8") as f:
-        for step in range(MAX_STEPS):
-            obs_summary = summarize_obs(obs)
-            state_for_prompt = AgentState.from_info(info).to_dict(
-                include_inventory=INCLUDE_INVENTORY,
-                include_voxels=INCLUDE_VOXELS,
-            )
-            prompt = (
-                "You control a MineDojo agent.\n"
-                f"Task: {task_prompt}\n"
-                f"Guidance: {task_guidance}\n"
-                f"Action space: {space_info}\n"
-                f"State: {json.dumps(state_for_prompt)[:4000]}\n"
-                f"Observation summary: {json.dumps(obs_summary)[:4000]}\n"
-                'Return JSON only, like: {"action": [0,1,0,...]}.\n'
+    prompt_builder = PromptBuilder(
+        task_prompt,
+        task_guidance,
+        space_info,
+        token_budget=PROMPT_TOKEN_BUDGET,
+        max_macro_steps=MAX_MACRO_STEPS,
+    )
+    macro_executor = MacroExecutor(triggers_from_names(MACRO_INTERRUPTS))
+    codec = codec_for_space(space, MAX_MACRO_STEPS)
+    request_params = (
+        {"text": {"format": codec.response_format()}} if STRUCTURED_OUTPUT else {}
+    )
+
+    llm = OpenAIClient(client=client, default_model=MODEL)
+
+    def decide_streaming(prompt):
+        extractor = ActionStreamExtractor(codec)
+        llm_stream = llm.generate_stream(
+            LLMRequest(
+                messages=[LLMMessage(role="user", content=prompt)],
+                metadata={"provider_params": request_params},
             )
-
+        )
+        action, parse_meta = read_until(llm_stream, extractor.feed) or extractor.finish()
+        parse_meta["stream"] = asdict(llm_stream.stats)
+        return action, parse_meta
+
+    def decide(context):
+        state_for_prompt, obs_for_prompt = context
+        prompt = prompt_builder.build(state_for_prompt, obs_for_prompt)
+        started = time.perf_counter()
+        if STREAM_ACTIONS:
+            action, parse_meta = decide_streaming(prompt)
+        else:
             resp = client.responses.create(
                 model=MODEL,
                 input=prompt,
+                **request_params,
             )
             text = getattr(resp, "output_text", "") or ""
-            action, parse_meta = parse_action(text, space)
+            action, parse_meta = codec.parse(text)
+        latency_ms = (time.perf_counter() - started) * 1000.0
+        return action, parse_meta, prompt_builder.token_counter(prompt), latency_ms
+
+    pipeline = (
+        DecisionPipeline(
+            decide,
+            max_staleness=PIPELINE_MAX_STALENESS,
+            matches=state_matcher(DECISION_FIELDS),
+        )
+        if PIPELINE
+        else None
+    )
 
-            obs, reward, done, info = env.step(action)
-            state_dict = AgentState.from_info(info).to_dict(
-                include_inventory=INCLUDE_INVENTORY,
-                include_voxels=INCLUDE_VOXELS,
-            )
-            record = {
-                "ts": datetime.utcnow().isoformat() + "Z",
-                "step": step,
-                "task_id": TASK_ID,
-                "model": MODEL,
-                "action": action.tolist() if hasattr(action, "tolist") else action,
-                "action_parse": parse_meta,
-                "reward": reward,
-                "done": done,
-                "info_keys": list(info.keys()) if isinstance(info, dict) else None,
-                "state": state_dict,
-            }
-
-            print(
-                f"[step {step}] reward={reward} done={done} action={record['action']}"
+    obs = env.reset()
+    info = {}
+    # The state built after each env.step is reused for the next prompt.
+    state_dict = AgentState.from_info(info).to_dict(
+        include_inventory=INCLUDE_INVENTORY,
+        include_voxels=INCLUDE_VOXELS,
+    )
+    context = (state_dict, summarize_obs(obs))
+    decision = decide(context) if pipeline is None else pipeline.first(context)
+    TELEMETRY_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with TELEMETRY_PATH.open("a", encoding="utf-8") as f:
+        step = 0
+        while step < MAX_STEPS:
+            action, parse_meta, prompt_tokens, latency_ms = decision
+            macro = action if isinstance(action, MacroAction) else MacroAction(actions=[action])
+            run_macro = partial(
+                macro_executor.run, env.step, info=info, limit=MAX_STEPS - step
             )
-            f.write(json.dumps(record) + "\n")
+            if pipeline is None:
+                result = run_macro(macro)
+            else:
+                result = pipeline.step(run_macro, macro, context)
+            obs, info, done = result.obs, result.info, result.done
+
+            records = []
+            for offset, transition in enumerate(result.transitions):
+                state_dict = AgentState.from_info(transition.info).to_dict(
+                    include_inventory=INCLUDE_INVENTORY,
+                    include_voxels=INCLUDE_VOXELS,
+                )
+                step_action = transition.action
+                record = {
+                    "ts": datetime.utcnow().isoformat() + "Z",
+                    "step": step + offset,
+                    "task_id": TASK_ID,
+                    "model": MODEL,
+                    "action": step_action.tolist()
+                    if hasattr(step_action, "tolist")
+                    else step_action,
+                    "action_parse": parse_meta,
+                    "prompt_tokens_est": prompt_tokens if offset == 0 else None,
+                    # LLM call time of the decision behind this macro.
+                    "latency_ms": latency_ms if offset == 0 else None,
+                    "reward": transition.reward,
+                    "done": transition.done,
+                    "info_keys": list(transition.info.keys()),
+                    "state": state_dict,
+                }
+                if macro_length(macro) > 1:
+                    record["macro"] = {
+                        "index": offset,
+                        "length": macro_length(macro),
+                        "interrupted": result.interrupted,
+                    }
+                records.append(record)
+            step += result.steps
+
+            if not done and step < MAX_STEPS:
+                context = (state_dict, summarize_obs(obs))
+                if pipeline is None:
+                    decision = decide(context)
+                else:
+                    decision, report = pipeline.resolve(context)
+                    records[-1]["pipeline"] = asdict(report)
+                    records[-1]["pipeline"]["overlap_ratio"] = report.overlap_ratio
+
+            for record in records:
+                print(
+                    f"[step {record['step']}] reward={record['reward']} "
+                    f"done={record['done']} action={record['action']}"
+                )
+                f.write(json.dumps(record) + "\n")
             f.flush()
 
-            if done:
+            if done or not records:
                 break
-            time.sleep(0.1)
+            if STEP_DELAY_S > 0:
+                time.sleep(STEP_DELAY_S)
 
+    if pipeline is not None:
+        pipeline.close()
     env.close()
 
 
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+# Usage: PYTHONPATH=src python benchmarks/episodic_bench.py [episodes] [dim] [queries]
+
+import sys
+import time
+
+import numpy as np
+
+from core.memory.episodic import EpisodeQuery, EpisodicMemory
+from core.models.memory_records import EpisodicMemoryRecord
+
+TASKS = [f"task-{index}" for index in range(20)]
+BIOMES = ["plains", "forest", "desert", "taiga", "swamp", "jungle", "ocean", "mountains"]
+
+
+def make_episodes(rng, count: int, dim: int, clusters: np.ndarray, offset: int):
+    # Episodes cluster around a few thousand "situations", like real states do.
+    vectors = clusters[rng.integers(0, len(clusters), count)]
+    vectors = vectors + 0.3 * rng.standard_normal((count, dim)).astype(np.float32)
+    tasks = rng.integers(0, len(TASKS), count)
+    biomes = rng.integers(0, len(BIOMES), count)
+    records = [
+        EpisodicMemoryRecord(
+            summary=f"episode {offset + index}",
+            task_id=TASKS[tasks[index]],
+            biome=BIOMES[biomes[index]],
+            time=float(offset + index),
+        )
+        for index in range(count)
+    ]
+    return records, vectors
+
+
+def percentiles(values):
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]  # noqa: E731
+    return pick(0.5), pick(0.99)
+
+
+def exact(memory: EpisodicMemory, vector: np.ndarray, k: int, mask=None):
+    size = len(memory)
+    matrix = memory._vectors[:size]
+    ids = np.arange(size) if mask is None else np.flatnonzero(mask)
+    scores = matrix[ids] @ (vector / np.linalg.norm(vector))
+    return set(ids[np.argsort(-scores)[:k]].tolist())
+
+
+def main() -> None:
+    episodes = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    queries = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    rng = np.random.default_rng(0)
+    clusters = rng.standard_normal((2000, dim)).astype(np.float32)
+    memory = EpisodicMemory(dim=dim)
+
+    start = time.perf_counter()
+    batch = 50_000
+    for offset in range(0, episodes - 1000, batch):
+        count = min(batch, episodes - 1000 - offset)
+        records, vectors = make_episodes(rng, count, dim, clusters, offset)
+        memory.extend(records, vectors)
+    build_s = time.perf_counter() - start
+    records, vectors = make_episodes(rng, 1000, dim, clusters, len(memory))
+    inserts = []
+    for record, vector in zip(records, vectors):
+        record.embedding = vector
+        begin = time.perf_counter()
+        memory.store(record)
+        inserts.append((time.perf_counter() - begin) * 1000.0)
+    p50, p99 = percentiles(inserts)
+    print(f"built {len(memory)} episodes in {build_s:.1f}s  trained={memory.trained}")
+    print(f"single store      p50 {p50:6.3f}  p99 {p99:6.3f} ms")
+
+    probe_vectors = clusters[rng.integers(0, len(clusters), queries)]
+    probe_vectors = probe_vectors + 0.3 * rng.standard_normal((queries, dim)).astype(np.float32)
+    recent = float(len(memory) - 100_000)
+    cases = {
+        "top-10": lambda v: EpisodeQuery(v, k=10),
+        "top-10 task": lambda v: EpisodeQuery(v, k=10, task_id="task-3"),
+        "top-10 task+biome": lambda v: EpisodeQuery(v, k=10, task_id="task-3", biome="desert"),
+        "top-10 recent": lambda v: EpisodeQuery(v, k=10, since=recent),
+    }
+    size = len(memory)
+    task_mask = memory._tasks[:size] == memory._task_codes["task-3"]
+    masks = {
+        "top-10": None,
+        "top-10 task": task_mask,
+        "top-10 task+biome": task_mask & (memory._biomes[:size] == memory._biome_codes["desert"]),
+        "top-10 recent": memory._times[:size] >= recent,
+    }
+    for label, make in cases.items():
+        latencies = []
+        hits = 0
+        for vector in probe_vectors:
+            query = make(vector)
+            begin = time.perf_counter()
+            matches = memory.query(query)
+            latencies.append((time.perf_counter() - begin) * 1000.0)
+            truth = exact(memory, vector, 10, masks[label])
+            hits += len(truth & {match.episode_id for match in matches})
+        p50, p99 = percentiles(latencies)
+        recall = hits / (10 * len(probe_vectors))
+        print(f"{label:<18}p50 {p50:6.3f}  p99 {p99:6.3f} ms  recall@10 {recall:.3f}")
+    print(f"stats {memory.stats}")
+
+
+if __name__ == "__main__":
+    main()
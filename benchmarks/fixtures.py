@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+import numpy as np
+
+INVENTORY_SLOTS = 36
+VOXEL_SHAPE = (3, 3, 3)
+
+
+def make_inventory() -> Dict[str, Any]:
+    names = np.array(["air"] * INVENTORY_SLOTS, dtype=object)
+    names[:4] = ["bucket", "wheat", "dirt", "stone_pickaxe"]
+    return {
+        "name": names,
+        "quantity": np.array([1, 12, 64, 1] + [0] * (INVENTORY_SLOTS - 4), dtype=np.int64),
+        "variant": np.zeros(INVENTORY_SLOTS, dtype=np.int64),
+        "cur_durability": np.zeros(INVENTORY_SLOTS, dtype=np.float32),
+        "max_durability": np.zeros(INVENTORY_SLOTS, dtype=np.float32),
+    }
+
+
+def make_voxels() -> Dict[str, Any]:
+    return {
+        "block_name": np.full(VOXEL_SHAPE, "grass", dtype=object),
+        "block_meta": np.zeros(VOXEL_SHAPE, dtype=np.int64),
+        "is_collidable": np.ones(VOXEL_SHAPE, dtype=bool),
+        "is_tool_not_required": np.ones(VOXEL_SHAPE, dtype=bool),
+        "blocks_movement": np.ones(VOXEL_SHAPE, dtype=bool),
+        "is_liquid": np.zeros(VOXEL_SHAPE, dtype=bool),
+        "is_solid": np.ones(VOXEL_SHAPE, dtype=bool),
+        "can_burn": np.zeros(VOXEL_SHAPE, dtype=bool),
+        "blocks_light": np.ones(VOXEL_SHAPE, dtype=bool),
+        "cos_look_vec_angle": np.random.default_rng(0).random(VOXEL_SHAPE),
+    }
+
+
+def make_info(step: int = 0) -> Dict[str, Any]:
+    return {
+        "is_dead": False,
+        "living_death_event_fired": False,
+        "damage_source": {"damage_type": None},
+        "inventory": make_inventory(),
+        "inventories_available": {"main": INVENTORY_SLOTS},
+        "current_item_index": 0,
+        "distance_travelled_cm": 120.0 + step,
+        "stat": {f"stat_{i}": i for i in range(40)},
+        "achievement": {f"achievement_{i}": bool(i % 2) for i in range(20)},
+        "life": 20.0,
+        "armor": 0.0,
+        "score": 0.0,
+        "food": 20.0,
+        "saturation": 5.0,
+        "xp": 0.0,
+        "is_alive": True,
+        "air": 300.0,
+        "name": "MineDojoAgent0",
+        "is_sleeping": False,
+        "xpos": 10.5 + 0.1 * step,
+        "ypos": 64.0,
+        "zpos": -3.25,
+        "pitch": 0.0,
+        "yaw": 90.0,
+        "biome_name": "plains",
+        "biome_id": 1,
+        "biome_temperature": 0.8,
+        "biome_rainfall": 0.4,
+        "sea_level": 63.0,
+        "light_level": 15.0,
+        "is_raining": False,
+        "can_see_sky": True,
+        "sun_brightness": 1.0,
+        "sky_light_level": 15.0,
+        "world_time": 6000.0 + step,
+        "total_time": 6000.0 + step,
+        "voxels": make_voxels(),
+        "nearby_furnace": False,
+        "nearby_crafting_table": False,
+    }
+
+
+def make_obs() -> Dict[str, Any]:
+    rng = np.random.default_rng(0)
+    return {
+        "rgb": rng.integers(0, 255, size=(3, 160, 256), dtype=np.uint8),
+        "inventory": make_inventory(),
+        "voxels": make_voxels(),
+        "location_stats": {
+            "pos": np.array([10.5, 64.0, -3.25], dtype=np.float32),
+            "yaw": np.array([90.0], dtype=np.float32),
+            "pitch": np.array([0.0], dtype=np.float32),
+            "biome_id": np.array([1], dtype=np.int64),
+            "rainfall": np.array([0.4], dtype=np.float32),
+            "temperature": np.array([0.8], dtype=np.float32),
+            "light_level": np.array([15], dtype=np.int64),
+            "sky_light_level": np.array([15.0], dtype=np.float32),
+            "sun_brightness": np.array([1.0], dtype=np.float32),
+            "sea_level": np.array([63], dtype=np.int64),
+            "is_raining": np.array([False]),
+            "can_see_sky": np.array([True]),
+        },
+        "life_stats": {
+            "life": np.array([20.0], dtype=np.float32),
+            "oxygen": np.array([300.0], dtype=np.float32),
+            "armor": np.array([0.0], dtype=np.float32),
+            "food": np.array([20.0], dtype=np.float32),
+            "saturation": np.array([5.0], dtype=np.float32),
+            "xp": np.array([0.0], dtype=np.float32),
+            "is_sleeping": np.array([False]),
+        },
+        "rays": {
+            "ray_yaw": np.linspace(-30, 30, 32, dtype=np.float32),
+            "ray_pitch": np.linspace(-30, 30, 32, dtype=np.float32),
+            "block_distance": rng.random((32, 32), dtype=np.float32),
+            "entity_distance": np.full((32, 32), np.nan, dtype=np.float32),
+        },
+        "mask": {"action_type": np.ones(8, dtype=bool)},
+    }
+
+
+class FakeMineDojoEnv:
+    # Stand-in for a MineDojo env: MineDojo-shaped observations, a fixed
+    # episode length and an optional per-step delay in place of the JVM tick.
+    def __init__(self, episode_len: int = 100, step_latency_s: float = 0.0) -> None:
+        self.episode_len = episode_len
+        self.step_latency_s = step_latency_s
+        self._obs = make_obs()
+        self._t = 0
+
+    def reset(self) -> Dict[str, Any]:
+        self._t = 0
+        return self._obs
+
+    def step(self, action: Any):
+        if self.step_latency_s:
+            time.sleep(self.step_latency_s)
+        self._t += 1
+        self._obs["life_stats"]["life"][0] = 20.0 - self._t % 20
+        done = self._t >= self.episode_len
+        return self._obs, 1.0, done, make_info(self._t)
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        server = self.server
+        if getattr(self, "_handshake_done", False) is False:
+            # First request on this connection pays the simulated TCP+TLS setup.
+            self._handshake_done = True
+            time.sleep(server.handshake_latency_s)
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = self.rfile.read(length)
+        if server.response_latency_s:
+            time.sleep(server.response_latency_s)
+        body = json.dumps({"echo_bytes": len(payload)}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class LocalHTTPServer:
+    # Keep-alive HTTP/1.1 server on 127.0.0.1. ``handshake_latency_s`` is
+    # charged once per new connection in place of a remote TCP+TLS handshake.
+    def __init__(self, handshake_latency_s: float = 0.0, response_latency_s: float = 0.0) -> None:
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+        self._server.daemon_threads = True
+        self._server.handshake_latency_s = handshake_latency_s
+        self._server.response_latency_s = response_latency_s
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "LocalHTTPServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+# Usage: PYTHONPATH=src python benchmarks/memory_store_bench.py [records] [keys]
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from core.memory.storage import SegmentFileBackend, SQLiteBackend
+from core.models.memory_records import PolicyTraceRecord, SemanticMemoryEntry
+
+
+def trace(index: int) -> PolicyTraceRecord:
+    return PolicyTraceRecord(
+        timestamp="2024-01-01T00:00:00",
+        action={"forward": 1, "camera": [0.0, 15.0], "step": index},
+        outcome={"reward": 0.0, "life": 20.0, "food": 18.0},
+    )
+
+
+def run(label: str, factory, records: int, keys: int) -> None:
+    backend = factory()
+    start = time.perf_counter()
+    for index in range(records):
+        backend.append("policy_traces", trace(index))
+    append_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for index in range(records):
+        key = f"fact-{index % keys}"
+        backend.put("semantic", key, SemanticMemoryEntry(key, index))
+    put_s = time.perf_counter() - start
+    backend.close()
+
+    # Cold start: open, then the first read of each namespace.
+    start = time.perf_counter()
+    backend = factory()
+    open_ms = (time.perf_counter() - start) * 1000.0
+    start = time.perf_counter()
+    backend.tail("policy_traces", 100)
+    tail_ms = (time.perf_counter() - start) * 1000.0
+    start = time.perf_counter()
+    backend.get("semantic", "fact-1")
+    get_ms = (time.perf_counter() - start) * 1000.0
+    start = time.perf_counter()
+    for index in range(1000):
+        backend.get("semantic", f"fact-{index % keys}")
+    warm_get_us = (time.perf_counter() - start) * 1000.0
+    start = time.perf_counter()
+    scanned = sum(1 for _ in backend.scan("policy_traces"))
+    scan_s = time.perf_counter() - start
+    extra = ""
+    if isinstance(backend, SegmentFileBackend):
+        extra = f"  compactions {backend.compactions}"
+    backend.close()
+    print(
+        f"{label:<9} append {records / append_s:8.0f}/s  put {records / put_s:8.0f}/s  "
+        f"open {open_ms:5.2f} ms  first tail {tail_ms:6.2f} ms  first get {get_ms:6.2f} ms  "
+        f"get {warm_get_us:5.1f} us  scan {scanned / scan_s:8.0f}/s{extra}"
+    )
+
+
+def main() -> None:
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    keys = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        run(
+            "segments",
+            lambda: SegmentFileBackend(root / "segments", segment_bytes=4 * 1024 * 1024),
+            records,
+            keys,
+        )
+        run("sqlite", lambda: SQLiteBackend(root / "memory.db"), records, keys)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+# Usage: PYTHONPATH=src python benchmarks/pipeline_bench.py [steps] [llm_ms] [env_ms]
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import FakeMineDojoEnv  # noqa: E402
+
+from core.runtime.pipeline import DecisionPipeline  # noqa: E402
+
+NOOP = [0, 0, 0, 12, 12, 0, 0, 0]
+
+
+def main() -> None:
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    llm_s = (float(sys.argv[2]) if len(sys.argv) > 2 else 200.0) / 1000.0
+    env_s = (float(sys.argv[3]) if len(sys.argv) > 3 else 150.0) / 1000.0
+
+    def decide(context):
+        time.sleep(llm_s)
+        return NOOP
+
+    env = FakeMineDojoEnv(episode_len=steps + 1, step_latency_s=env_s)
+    obs = env.reset()
+    start = time.perf_counter()
+    for step in range(steps):
+        action = decide(obs)
+        obs, _, _, _ = env.step(action)
+    serial = (time.perf_counter() - start) / steps * 1000.0
+    print(f"{'serial':<28} {serial:8.1f} ms/step")
+
+    for max_staleness in (1, 4, None):
+        env = FakeMineDojoEnv(episode_len=steps + 1, step_latency_s=env_s)
+        context = env.reset()
+        overlap = 0.0
+        with DecisionPipeline(decide, max_staleness=max_staleness) as pipeline:
+            start = time.perf_counter()
+            action = pipeline.first(context)
+            for step in range(steps):
+                obs, _, _, info = pipeline.step(env.step, action, context)
+                context = info
+                action, report = pipeline.resolve(context)
+                overlap += report.overlap_ratio
+            per_step = (time.perf_counter() - start) / steps * 1000.0
+        label = f"pipelined (staleness {max_staleness})"
+        print(f"{label:<28} {per_step:8.1f} ms/step  overlap {overlap / steps:.2f}")
+    print(f"{'max(llm, env)':<28} {max(llm_s, env_s) * 1000.0:8.1f} ms/step")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+# Usage: PYTHONPATH=src python benchmarks/prediction_error_bench.py [records] [sources]
+
+import sys
+import time
+
+import numpy as np
+
+from core.memory.prediction_error import PredictionErrorHistory
+from core.models.memory_records import PredictionErrorRecord
+from core.models.signals import PredictionError
+
+
+def main() -> None:
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sources = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    rng = np.random.default_rng(0)
+    # Heavy-tailed magnitudes, one scale per source.
+    names = [f"source-{index}" for index in range(sources)]
+    picks = rng.integers(0, sources, records)
+    magnitudes = rng.lognormal(0.0, 1.0, records) * (1.0 + picks)
+    history = PredictionErrorHistory()
+
+    record_s = 0.0
+    surprise_s = 0.0
+    batch = 100_000
+    for offset in range(0, records, batch):
+        stop = min(records, offset + batch)
+        pending = [
+            PredictionErrorRecord(
+                error=PredictionError(magnitude=float(magnitudes[index])),
+                source=names[picks[index]],
+            )
+            for index in range(offset, stop)
+        ]
+        start = time.perf_counter()
+        for record in pending:
+            history.record(record)
+        record_s += time.perf_counter() - start
+        start = time.perf_counter()
+        for index in range(offset, stop):
+            history.surprise(magnitudes[index], names[picks[index]])
+        surprise_s += time.perf_counter() - start
+    print(f"recorded {records} errors at {records / record_s:.0f}/s")
+    print(f"surprise percentile per step {surprise_s / records * 1e6:.1f} us")
+
+    for name, index in zip(names, range(sources)):
+        values = np.sort(magnitudes[picks == index])
+        summary = history.summary(name)
+        errors = [
+            abs(np.searchsorted(values, estimate) / len(values) - q)
+            for q, estimate in summary.quantiles.items()
+        ]
+        print(
+            f"{name}  n={summary.count}  mean {summary.mean:7.3f} ({values.mean():7.3f})  "
+            f"p99 {summary.quantiles[0.99]:7.3f} ({np.quantile(values, 0.99):7.3f})  "
+            f"max rank error {max(errors):.5f}  "
+            f"centroids {history.statistics(name).digest.centroids}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+# Usage: PYTHONPATH=src python benchmarks/prompt_bench.py [steps]
+
+import json
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import make_info, make_obs  # noqa: E402
+
+from core.llm.prompt import PromptBuilder, approx_tokens  # noqa: E402
+from core.models.state import AgentState  # noqa: E402
+
+TASK_PROMPT = "obtain milk from a cow"
+TASK_GUIDANCE = (
+    "1. Find a cow.\n2. Use an empty bucket on the cow to obtain milk. "
+    "Cows are commonly found in plains biomes."
+)
+ACTION_SPACE = {"type": "MultiDiscrete", "nvec": [3, 3, 4, 25, 25, 8, 244, 36], "shape": [8]}
+
+
+def summarize_obs(obs):
+    # Per-step observation summary as built by __main__.py.
+    if isinstance(obs, dict):
+        return {k: summarize_obs(v) for k, v in obs.items()}
+    if isinstance(obs, np.ndarray):
+        summary = {"shape": list(obs.shape), "dtype": str(obs.dtype)}
+        if obs.size and np.issubdtype(obs.dtype, np.number):
+            summary["min"] = float(np.nanmin(obs))
+            summary["max"] = float(np.nanmax(obs))
+        return summary
+    return obs
+
+
+def _tolist(value):
+    # __main__.py would raise on ndarrays here; list them so the comparison runs.
+    return value.tolist()
+
+
+def legacy_prompt(state_for_prompt, obs_summary) -> str:
+    return (
+        "You control a MineDojo agent.\n"
+        f"Task: {TASK_PROMPT}\n"
+        f"Guidance: {TASK_GUIDANCE}\n"
+        f"Action space: {ACTION_SPACE}\n"
+        f"State: {json.dumps(state_for_prompt, default=_tolist)[:4000]}\n"
+        f"Observation summary: {json.dumps(obs_summary)[:4000]}\n"
+        'Return JSON only, like: {"action": [0,1,0,...]}.\n'
+    )
+
+
+def _valid_json_sections(prompt: str) -> bool:
+    for line in prompt.splitlines():
+        for label in ("State: ", "Observation summary: "):
+            if line.startswith(label):
+                try:
+                    json.loads(line[len(label) :])
+                except ValueError:
+                    return False
+    return True
+
+
+def main() -> None:
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    warnings.simplefilter("ignore", RuntimeWarning)
+    builder = PromptBuilder(TASK_PROMPT, TASK_GUIDANCE, ACTION_SPACE)
+    obs_summary = summarize_obs(make_obs())
+    for include_heavy in (False, True):
+        before = after = 0
+        valid_before = valid_after = True
+        for step in range(steps):
+            state = AgentState.from_info(make_info(step)).to_dict(
+                include_inventory=include_heavy, include_voxels=include_heavy
+            )
+            old = legacy_prompt(state, obs_summary)
+            new = builder.build(state, obs_summary)
+            before += approx_tokens(old)
+            after += approx_tokens(new)
+            valid_before = valid_before and _valid_json_sections(old)
+            valid_after = valid_after and _valid_json_sections(new)
+        label = "with inventory+voxels" if include_heavy else "default state"
+        print(
+            f"{label:<24} tokens/step before={before / steps:7.1f} after={after / steps:7.1f} "
+            f"({1 - after / before:.0%} fewer)  valid JSON before={valid_before} after={valid_after}"
+        )
+    print(f"static prefix tokens (cacheable): {approx_tokens(builder.static_prefix)}")
+
+
+if __name__ == "__main__":
+    main()
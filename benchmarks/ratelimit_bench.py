@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+# Usage: PYTHONPATH=src python benchmarks/ratelimit_bench.py [agents] [seconds] [rpm]
+
+import sys
+import threading
+import time
+from collections import deque
+
+from core.llm.ratelimit import RateLimitedLLMClient, RateLimiter, RetryPolicy, TransientLLMError
+from core.llm.types import LLMMessage, LLMRequest, LLMResponse, LLMUsage
+
+
+class QuotaClient:
+    # Provider stand-in enforcing a requests/min quota over a sliding one-second
+    # window, answering 429 with Retry-After when it is exceeded.
+    def __init__(self, rpm: int, latency_s: float = 0.02) -> None:
+        self.per_second = max(1, rpm // 60)
+        self.latency_s = latency_s
+        self._lock = threading.Lock()
+        self._window: deque = deque()
+        self.rejected = 0
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        time.sleep(self.latency_s)
+        now = time.monotonic()
+        with self._lock:
+            while self._window and now - self._window[0] >= 1.0:
+                self._window.popleft()
+            if len(self._window) >= self.per_second:
+                self.rejected += 1
+                raise TransientLLMError("rate limited", 429, 1.0 - (now - self._window[0]))
+            self._window.append(now)
+        return LLMResponse(text="{}", usage=LLMUsage(100, 10, 110))
+
+
+def run(client, agents: int, seconds: float, priorities):
+    done = {priority: 0 for priority in set(priorities)}
+    crashed = [0]
+    deadline = time.monotonic() + seconds
+
+    def agent(priority: str) -> None:
+        request = LLMRequest(messages=[LLMMessage("user", "x" * 400)], metadata={"priority": priority})
+        while time.monotonic() < deadline:
+            try:
+                client.generate(request)
+            except Exception:
+                crashed[0] += 1
+                continue
+            done[priority] += 1
+
+    threads = [threading.Thread(target=agent, args=(priorities[i],), daemon=True) for i in range(agents)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(seconds + 5.0)
+    return done, crashed[0]
+
+
+def main() -> None:
+    agents = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    rpm = int(sys.argv[3]) if len(sys.argv) > 3 else 600
+    quota = rpm * seconds / 60.0
+    priorities = ["motor"] + ["background"] * (agents - 1)
+
+    raw = QuotaClient(rpm)
+    done, crashed = run(raw, agents, seconds, priorities)
+    print(f"{'unlimited':<12} ok {sum(done.values()):5d}  errors {crashed:6d}  by lane {done}")
+
+    upstream = QuotaClient(rpm)
+    limited = RateLimitedLLMClient(
+        upstream,
+        RateLimiter(rpm=rpm, tpm=rpm * 150, burst_s=1.0),
+        RetryPolicy(max_retries=3, base_delay_s=0.05, max_delay_s=1.0),
+    )
+    done, crashed = run(limited, agents, seconds, priorities)
+    print(
+        f"{'rate limited':<12} ok {sum(done.values()):5d}  errors {crashed:6d}  by lane {done}"
+        f"  (quota {quota:.0f}, 429s {upstream.rejected})"
+    )
+
+
+if __name__ == "__main__":
+    main()
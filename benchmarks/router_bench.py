@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+# Usage: PYTHONPATH=src python benchmarks/router_bench.py [requests] [slow_ratio]
+
+import random
+import sys
+import time
+
+from core.llm.router import Route, RoutingLLMClient
+from core.llm.types import LLMMessage, LLMRequest, LLMResponse
+
+
+class ScriptedClient:
+    # Fake provider: ``base_ms`` with jitter, and ``slow_ratio`` of calls
+    # taking ``slow_ms`` instead.
+    def __init__(self, name: str, base_ms: float, slow_ms: float, slow_ratio: float, seed: int) -> None:
+        self.name = name
+        self.base_ms = base_ms
+        self.slow_ms = slow_ms
+        self.slow_ratio = slow_ratio
+        self._rng = random.Random(seed)
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        slow = self._rng.random() < self.slow_ratio
+        latency_ms = self.slow_ms if slow else self.base_ms * self._rng.uniform(0.8, 1.2)
+        time.sleep(latency_ms / 1000.0)
+        return LLMResponse(text="{}", latency_ms=latency_ms, provider=self.name)
+
+
+def percentiles(values):
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]  # noqa: E731
+    return pick(0.5), pick(0.95), pick(0.99), values[-1]
+
+
+def run(client, requests: int):
+    request = LLMRequest(messages=[LLMMessage("user", "state")])
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client.generate(request)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return percentiles(latencies)
+
+
+def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    slow_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.03
+
+    def providers():
+        return {
+            "openai": ScriptedClient("openai", 20.0, 400.0, slow_ratio, 1),
+            "anthropic": ScriptedClient("anthropic", 30.0, 400.0, slow_ratio, 2),
+        }
+
+    modes = {
+        "single provider": providers()["openai"],
+        "routed": RoutingLLMClient(
+            [Route(name, client) for name, client in providers().items()], hedge=False
+        ),
+        "routed + hedged": RoutingLLMClient(
+            [Route(name, client) for name, client in providers().items()], hedge_min_ms=20.0
+        ),
+    }
+    for label, client in modes.items():
+        p50, p95, p99, worst = run(client, requests)
+        extra = ""
+        if isinstance(client, RoutingLLMClient):
+            stats = client.stats
+            extra = f"  hedged {stats.hedged} (won {stats.hedge_wins})  routes {stats.per_route}"
+            client.close()
+        print(
+            f"{label:<16} p50 {p50:6.1f}  p95 {p95:6.1f}  p99 {p99:6.1f}  max {worst:6.1f} ms{extra}"
+        )
+
+
+if __name__ == "__main__":
+    main()
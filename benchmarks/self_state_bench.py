@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+# Usage: PYTHONPATH=src python benchmarks/self_state_bench.py [steps] [queries]
+
+import sys
+import time
+
+import numpy as np
+
+from core.memory.self_state import SelfStateMemory
+from core.models.memory_records import SelfStateSnapshot
+from core.models.state import AgentState, HomeostasisState, PositionState
+
+
+def snapshots(rng, count: int, offset: int):
+    # Food drains one point per 300 steps and refills on eating.
+    food = 20.0 - (np.arange(offset, offset + count) // 300) % 21
+    life = rng.uniform(10.0, 20.0, count)
+    return [
+        SelfStateSnapshot(
+            state=AgentState(
+                homeostasis=HomeostasisState(life=float(life[index]), food=float(food[index])),
+                position=PositionState(xpos=float(index), ypos=64.0, zpos=0.0),
+            ),
+            step=offset + index,
+        )
+        for index in range(count)
+    ]
+
+
+def timed(label: str, queries: int, call) -> None:
+    start = time.perf_counter()
+    for _ in range(queries):
+        result = call()
+    elapsed_us = (time.perf_counter() - start) / queries * 1e6
+    print(f"{label:<34}{elapsed_us:9.1f} us  ({len(result.steps)} points)")
+
+
+def main() -> None:
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = np.random.default_rng(0)
+    memory = SelfStateMemory()
+    record_s = 0.0
+    batch = 100_000
+    for offset in range(0, steps, batch):
+        pending = snapshots(rng, min(batch, steps - offset), offset)
+        start = time.perf_counter()
+        for snapshot in pending:
+            memory.record(snapshot)
+        record_s += time.perf_counter() - start
+    print(f"recorded {steps} snapshots at {steps / record_s:.0f}/s")
+
+    timed("life over last 200 steps", queries, lambda: memory.series("life", last=200))
+    timed("life over last 50000 steps", queries, lambda: memory.series("life", last=50_000))
+    timed(
+        "mean food per 1000 (all history)",
+        queries,
+        lambda: memory.windows("food", 1000),
+    )
+    timed(
+        "min life per 100 (last 100000)",
+        queries,
+        lambda: memory.windows("life", 100, stat="min", last=100_000),
+    )
+    start = time.perf_counter()
+    for _ in range(queries):
+        summary = memory.aggregate(["life", "food"], last=1000)
+    elapsed_us = (time.perf_counter() - start) / queries * 1e6
+    print(f"{'aggregate life/food, last 1000':<34}{elapsed_us:9.1f} us  {summary['food']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+# Usage: PYTHONPATH=src python benchmarks/serializer_bench.py [iterations]
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import make_info  # noqa: E402
+
+from core.models.state import AgentState  # noqa: E402
+from core.observability.config import LoggingConfig  # noqa: E402
+from core.observability.serializer import safe_serialize  # noqa: E402
+
+
+def _bench(label: str, payload, iterations: int, config: LoggingConfig) -> None:
+    safe_serialize(payload, config.max_field_bytes, config.redact_keys)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        out = safe_serialize(payload, config.max_field_bytes, config.redact_keys)
+    elapsed = time.perf_counter() - start
+    size = len(json.dumps(out, ensure_ascii=True))
+    print(f"{label:<28} {elapsed / iterations * 1e6:10.1f} us/call  {size:7d} bytes")
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    config = LoggingConfig()
+    info = make_info()
+    state = AgentState.from_info(info)
+
+    _bench("state (full dataclass)", {"state": state}, iterations, config)
+    _bench(
+        "state.to_dict(inv, voxels)",
+        {"state": state.to_dict(include_inventory=True, include_voxels=True)},
+        iterations,
+        config,
+    )
+    _bench("state.to_dict()", {"state": state.to_dict()}, iterations, config)
+    _bench("raw info dict", info, iterations, config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+# Usage: PYTHONPATH=src python benchmarks/standin_bench.py [agents] [requests] [latency] [errors]
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.llm.providers.transport import HTTPTransport
+from core.llm.ratelimit import RateLimitedLLMClient, RateLimiter, RetryPolicy, TransientLLMError
+from core.llm.standin import ResponsesStandInServer, StandInConfig, parse_errors, parse_latency
+from core.llm.types import LLMMessage, LLMRequest, LLMResponse
+
+
+class ResponsesHTTPClient:
+    # Minimal SDK-free Responses API client for the stand-in.
+    def __init__(self, base_url: str, transport: HTTPTransport) -> None:
+        self.url = base_url + "/responses"
+        self.transport = transport
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        payload = {
+            "model": request.model,
+            "input": [{"role": m.role, "content": m.content} for m in request.messages],
+        }
+        response = self.transport.json_request("POST", self.url, payload)
+        if response.status != 200:
+            retry_after = response.headers.get("retry-after")
+            raise TransientLLMError(
+                f"HTTP {response.status}",
+                response.status,
+                float(retry_after) if retry_after else None,
+            )
+        data = response.json()
+        text = "".join(part["text"] for item in data["output"] for part in item["content"])
+        return LLMResponse(text=text, provider="standin", model=data.get("model"))
+
+
+def run(agents: int, requests: int, config: StandInConfig):
+    with ResponsesStandInServer(config) as server, HTTPTransport() as transport:
+        client = RateLimitedLLMClient(
+            ResponsesHTTPClient(server.url, transport),
+            RateLimiter(),
+            RetryPolicy(max_retries=8, base_delay_s=0.01, max_delay_s=0.2),
+        )
+
+        def agent(index: int):
+            latencies = []
+            for step in range(requests):
+                request = LLMRequest(
+                    messages=[LLMMessage("user", f"agent {index} step {step}")], model="stand-in"
+                )
+                start = time.perf_counter()
+                client.generate(request)
+                latencies.append((time.perf_counter() - start) * 1000.0)
+            return latencies
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=agents) as pool:
+            latencies = sorted(sum(pool.map(agent, range(agents)), []))
+        elapsed = time.perf_counter() - start
+        return {
+            "req/s": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(latencies[len(latencies) // 2], 1),
+            "p95_ms": round(latencies[int(len(latencies) * 0.95)], 1),
+            "injected": dict(server.stats.errors),
+            "retries": client.stats.retries,
+        }
+
+
+def main() -> None:
+    agents = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    latency = parse_latency(sys.argv[3] if len(sys.argv) > 3 else "lognormal:50:0.5,tail:0.02:400")
+    errors = parse_errors(sys.argv[4] if len(sys.argv) > 4 else "429=0.03,500=0.02")
+    for attempt in range(2):
+        # Same seed and requests: identical latencies and injected errors.
+        print(f"run {attempt + 1}: {run(agents, requests, StandInConfig(latency, errors, retry_after_s=0.05))}")
+
+
+if __name__ == "__main__":
+    main()
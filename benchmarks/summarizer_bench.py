@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+# Usage: PYTHONPATH=src python benchmarks/summarizer_bench.py [iterations]
+
+import json
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import make_obs  # noqa: E402
+
+from core.observability.summarizer import ObservationSummarizer  # noqa: E402
+
+
+def legacy_summarize_obs(obs):
+    # Recursive summary previously inlined in __main__.py.
+    if isinstance(obs, dict):
+        return {k: legacy_summarize_obs(v) for k, v in obs.items()}
+    if isinstance(obs, np.ndarray):
+        summary = {"shape": list(obs.shape), "dtype": str(obs.dtype)}
+        if obs.size and np.issubdtype(obs.dtype, np.number):
+            summary["min"] = float(np.nanmin(obs))
+            summary["max"] = float(np.nanmax(obs))
+        return summary
+    if isinstance(obs, (list, tuple)):
+        return {"type": type(obs).__name__, "len": len(obs)}
+    if isinstance(obs, (int, float, str, bool)) or obs is None:
+        return obs
+    return {"type": type(obs).__name__}
+
+
+def _bench(label: str, fn, obs, iterations: int) -> float:
+    fn(obs)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(obs)
+    per_call = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{label:<28} {per_call:10.1f} us/call")
+    return per_call
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    warnings.simplefilter("ignore", RuntimeWarning)
+    obs = make_obs()
+    summarizer = ObservationSummarizer()
+    if json.dumps(summarizer(obs)) != json.dumps(legacy_summarize_obs(obs)):
+        raise SystemExit("summaries differ")
+
+    before = _bench("legacy summarize_obs", legacy_summarize_obs, obs, iterations)
+    after = _bench("ObservationSummarizer", summarizer, obs, iterations)
+    print(f"speedup {before / after:.2f}x, schema compiles: {summarizer.recompiles}")
+    _bench("  + mean/std", ObservationSummarizer(include_moments=True), obs, iterations)
+
+
+if __name__ == "__main__":
+    main()
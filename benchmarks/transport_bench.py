@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+# Usage: PYTHONPATH=src python benchmarks/transport_bench.py [agents] [requests] [handshake_ms]
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import LocalHTTPServer  # noqa: E402
+
+from core.llm.providers.transport import HTTPTransport, TransportConfig  # noqa: E402
+
+PAYLOAD = {"model": "gpt-4.1", "input": [{"role": "user", "content": "x" * 2000}]}
+
+
+def run(url: str, transports, requests: int):
+    def agent(transport: HTTPTransport):
+        latencies = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            transport.json_request("POST", url + "/v1/responses", PAYLOAD)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(transports)) as pool:
+        latencies = sorted(sum(pool.map(agent, transports), []))
+    elapsed = time.perf_counter() - start
+    opened = sum({id(t): t.stats.connections_opened for t in transports}.values())
+    return len(latencies) / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)], opened
+
+
+def main() -> None:
+    agents = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    handshake_s = (float(sys.argv[3]) if len(sys.argv) > 3 else 20.0) / 1000.0
+
+    no_keepalive = TransportConfig(max_keepalive_connections=0)
+    shared = HTTPTransport()
+    modes = {
+        "connection per request": [HTTPTransport(no_keepalive) for _ in range(agents)],
+        "pool per agent": [HTTPTransport() for _ in range(agents)],
+        "shared pool": [shared] * agents,
+    }
+    with LocalHTTPServer(handshake_latency_s=handshake_s) as server:
+        for label, transports in modes.items():
+            rps, p50, p95, opened = run(server.url, transports, requests)
+            print(
+                f"{label:<24} {rps:8.0f} req/s  p50 {p50:6.2f} ms  p95 {p95:6.2f} ms"
+                f"  connections {opened}"
+            )
+            for transport in set(transports):
+                transport.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+# Usage: PYTHONPATH=src python benchmarks/vector_env_bench.py [steps] [step_latency_ms]
+
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import FakeMineDojoEnv  # noqa: E402
+
+from core.adapters.minedojo.env_adapter import MineDojoAdapter  # noqa: E402
+from core.adapters.minedojo.vector_env import VectorMineDojoAdapter  # noqa: E402
+
+NOOP = [0, 0, 0, 12, 12, 0, 0, 0]
+
+
+def _serial(steps: int, factory) -> float:
+    adapter = MineDojoAdapter(factory())
+    adapter.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, done, _ = adapter.step(NOOP)
+        if done:
+            adapter.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def _vector(steps: int, factory, num_envs: int) -> float:
+    with VectorMineDojoAdapter([factory] * num_envs) as envs:
+        envs.reset()
+        start = time.perf_counter()
+        for _ in range(steps):
+            envs.step([NOOP] * num_envs)
+        return steps * num_envs / (time.perf_counter() - start)
+
+
+def main() -> None:
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    factory = partial(FakeMineDojoEnv, episode_len=50, step_latency_s=latency_ms / 1000.0)
+    print(f"{'MineDojoAdapter':<28} {_serial(steps, factory):10.1f} env-steps/s")
+    for num_envs in (1, 2, 4, 8):
+        rate = _vector(steps, factory, num_envs)
+        print(f"{f'VectorMineDojoAdapter x{num_envs}':<28} {rate:10.1f} env-steps/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.adapters.minedojo.action_mapper import clamp_macro, macro_length
+from core.models.signals import MacroAction
+
+ParseResult = Tuple[Any, Dict[str, Any]]
+
+KIND_MULTI_DISCRETE = "multi_discrete"
+KIND_DISCRETE = "discrete"
+KIND_BOX = "box"
+KIND_UNKNOWN = "unknown"
+
+# A flat action array, or a scalar followed by a delimiter so that "12" is not
+# committed while "123" may still be streaming in.
+_ACTION_VALUE = re.compile(r'"action"\s*:\s*(\[[^\[\]{}"]*\]|-?\d+(?:\.\d+)?(?=\s*[,}\s]))')
+
+
+@dataclass
+class ParseStats:
+    parsed: int = 0
+    recovered: int = 0
+    failed: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+
+
+class ActionCodec:
+    # Everything that depends only on the action space (kind, nvec, bounds,
+    # dtype, schema) is resolved once here; parse() only decodes and clips.
+    def __init__(
+        self,
+        space: Any,
+        max_macro_steps: int = 1,
+        fallback: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self.space = space
+        self.max_macro_steps = max_macro_steps
+        self.fallback = fallback or getattr(space, "sample", lambda: None)
+        self.stats = ParseStats()
+        self._size = 0
+        self._upper: Optional[np.ndarray] = None
+        self._low: Optional[np.ndarray] = None
+        self._high: Optional[np.ndarray] = None
+        self._shape: Tuple[int, ...] = ()
+        self._n = 0
+        if hasattr(space, "nvec"):
+            self.kind = KIND_MULTI_DISCRETE
+            self._upper = np.asarray(space.nvec, dtype=np.int64).reshape(-1) - 1
+            self._size = int(self._upper.size)
+        elif hasattr(space, "n"):
+            self.kind = KIND_DISCRETE
+            self._n = int(space.n)
+        elif hasattr(space, "shape"):
+            self.kind = KIND_BOX
+            self._shape = tuple(space.shape)
+            if hasattr(space, "low") and hasattr(space, "high"):
+                self._low = np.asarray(space.low, dtype=np.float32)
+                self._high = np.asarray(space.high, dtype=np.float32)
+        else:
+            self.kind = KIND_UNKNOWN
+        self._schema: Optional[Dict[str, Any]] = None
+
+    def coerce(self, raw: Any) -> Any:
+        if self.kind == KIND_MULTI_DISCRETE:
+            arr = np.array(raw, dtype=np.int64).reshape(-1)
+            if arr.size != self._size:
+                return None
+            return np.clip(arr, 0, self._upper, out=arr)
+        if self.kind == KIND_DISCRETE:
+            if not isinstance(raw, int) or isinstance(raw, bool):
+                return None
+            return max(0, min(self._n - 1, raw))
+        if self.kind == KIND_BOX:
+            arr = np.array(raw, dtype=np.float32).reshape(self._shape)
+            if self._low is not None:
+                np.clip(arr, self._low, self._high, out=arr)
+            return arr
+        return None
+
+    def parse(self, text: str) -> ParseResult:
+        recovered = False
+        try:
+            data = json.loads(text)
+        except (TypeError, ValueError):
+            data = None
+        if not isinstance(data, dict):
+            data = extract_action_object(text)
+            recovered = data is not None
+        if data is None:
+            return self._fail(text, "no_json")
+        return self.parse_data(data, text, recovered)
+
+    def parse_data(self, data: Dict[str, Any], text: str = "", recovered: bool = False) -> ParseResult:
+        raw_actions = data.get("actions") if self.max_macro_steps > 1 else None
+        if not isinstance(raw_actions, list) or not raw_actions:
+            if data.get("action") is None:
+                return self._fail(text, "missing_action")
+            raw_actions = [data["action"]]
+        actions: List[Any] = []
+        for raw in raw_actions:
+            try:
+                action = self.coerce(raw)
+            except (TypeError, ValueError):
+                action = None
+            if action is None:
+                return self._fail(text, "invalid_action")
+            actions.append(action)
+
+        meta: Dict[str, Any] = {"parsed": True}
+        if recovered:
+            meta["recovered"] = True
+            self.stats.recovered += 1
+        self.stats.parsed += 1
+
+        try:
+            repeat = int(data.get("repeat", 1))
+        except (TypeError, ValueError):
+            repeat = 1
+        if self.max_macro_steps > 1 and (len(actions) > 1 or repeat > 1):
+            macro = clamp_macro(MacroAction(actions=actions, repeat=repeat), self.max_macro_steps)
+            meta["macro_steps"] = macro_length(macro)
+            return macro, meta
+        return actions[0], meta
+
+    def json_schema(self) -> Dict[str, Any]:
+        if self._schema is None:
+            action = self._action_schema()
+            properties: Dict[str, Any] = {"action": action}
+            if self.max_macro_steps > 1:
+                # Strict mode requires every property, so the macro forms are
+                # expressed as nullable alternatives: one "action" (optionally
+                # held for "repeat" steps) or a sequence in "actions".
+                properties = {
+                    "action": {"anyOf": [action, {"type": "null"}]},
+                    "actions": {
+                        "anyOf": [
+                            {
+                                "type": "array",
+                                "items": action,
+                                "minItems": 1,
+                                "maxItems": self.max_macro_steps,
+                            },
+                            {"type": "null"},
+                        ]
+                    },
+                    "repeat": {
+                        "anyOf": [
+                            {"type": "integer", "minimum": 1, "maximum": self.max_macro_steps},
+                            {"type": "null"},
+                        ]
+                    },
+                }
+            self._schema = {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False,
+            }
+        return self._schema
+
+    def response_format(self, name: str = "minedojo_action", strict: bool = True) -> Dict[str, Any]:
+        # ``text.format`` for the OpenAI Responses API, e.g.
+        # ``metadata={"provider_params": {"text": {"format": codec.response_format()}}}``.
+        return {"type": "json_schema", "name": name, "schema": self.json_schema(), "strict": strict}
+
+    def _action_schema(self) -> Dict[str, Any]:
+        if self.kind == KIND_MULTI_DISCRETE:
+            assert self._upper is not None
+            return {
+                "type": "array",
+                "items": {"type": "integer", "minimum": 0},
+                "minItems": self._size,
+                "maxItems": self._size,
+                "description": "Upper bound per position: " + json.dumps(self._upper.tolist()),
+            }
+        if self.kind == KIND_DISCRETE:
+            return {"type": "integer", "minimum": 0, "maximum": self._n - 1}
+        if self.kind == KIND_BOX:
+            schema: Dict[str, Any] = {"type": "number"}
+            for dim in reversed(self._shape):
+                schema = {"type": "array", "items": schema, "minItems": dim, "maxItems": dim}
+            return schema
+        return {}
+
+    def _fail(self, text: str, reason: str) -> ParseResult:
+        self.stats.failed += 1
+        self.stats.errors[reason] = self.stats.errors.get(reason, 0) + 1
+        return self.fallback(), {"parsed": False, "raw": text, "error": reason}
+
+
+_CODECS: Dict[Tuple[int, int], Tuple[Any, ActionCodec]] = {}
+
+
+def codec_for_space(space: Any, max_macro_steps: int = 1) -> ActionCodec:
+    key = (id(space), max_macro_steps)
+    cached = _CODECS.get(key)
+    if cached is None or cached[0] is not space:
+        cached = (space, ActionCodec(space, max_macro_steps))
+        _CODECS[key] = cached
+    return cached[1]
+
+
+class _ObjectScanner:
+    # Incremental brace/string tracker that yields the first complete
+    # top-level JSON object carrying "action" or "actions".
+    def __init__(self) -> None:
+        self.buffer = ""
+        self.start = -1
+        self.depth = 0
+        self._pos = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> Optional[Dict[str, Any]]:
+        self.buffer += text
+        buffer = self.buffer
+        for index in range(self._pos, len(buffer)):
+            char = buffer[index]
+            if self.depth == 0:
+                if char == "{":
+                    self.start = index
+                    self.depth = 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self.depth += 1
+            elif char == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        data = json.loads(buffer[self.start : index + 1])
+                    except ValueError:
+                        data = None
+                    if isinstance(data, dict) and ("action" in data or "actions" in data):
+                        self._pos = index + 1
+                        return data
+        self._pos = len(buffer)
+        return None
+
+
+def extract_action_object(text: str) -> Optional[Dict[str, Any]]:
+    return _ObjectScanner().feed(text)
+
+
+class ActionStreamExtractor:
+    # Feeds on text deltas and returns the parsed action as soon as it is
+    # complete: when the first top-level JSON object carrying an action closes
+    # or, with ``early_commit`` and no macros, when its "action" value does.
+    # Prose, code fences and trailing explanations around the object are ignored.
+    def __init__(self, codec: ActionCodec, early_commit: bool = True) -> None:
+        self.codec = codec
+        self.early_commit = early_commit and codec.max_macro_steps <= 1
+        self._scanner = _ObjectScanner()
+        self.result: Optional[ParseResult] = None
+        self.committed_at: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        return self._scanner.buffer
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def feed(self, delta: str) -> Optional[ParseResult]:
+        if self.result is not None or not delta:
+            return self.result
+        scanner = self._scanner
+        data = scanner.feed(delta)
+        if data is not None:
+            self._commit(self.codec.parse_data(data, scanner.buffer))
+        elif self.early_commit and scanner.depth > 0:
+            match = _ACTION_VALUE.search(scanner.buffer, scanner.start)
+            if match is not None:
+                try:
+                    value = json.loads(match.group(1))
+                except ValueError:
+                    value = None
+                if value is not None:
+                    self._commit(self.codec.parse_data({"action": value}, scanner.buffer))
+        return self.result
+
+    def finish(self) -> ParseResult:
+        if self.result is None:
+            self._commit(self.codec.parse(self.text))
+        assert self.result is not None
+        return self.result
+
+    def _commit(self, result: ParseResult) -> None:
+        self.result = result
+        self.committed_at = len(self.text)
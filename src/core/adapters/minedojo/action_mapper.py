@@ -1,13 +1,42 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Iterator, Optional
 
-from core.models.signals import ActionProposal
+from core.models.signals import ActionProposal, MacroAction
 
+DEFAULT_MAX_MACRO_STEPS = 8
 
-def map_action(action_proposal: ActionProposal) -> Any:
+
+def clamp_macro(macro: MacroAction, max_steps: Optional[int] = DEFAULT_MAX_MACRO_STEPS) -> MacroAction:
+    actions = list(macro.actions)
+    repeat = max(1, int(macro.repeat or 1))
+    if max_steps is not None and actions:
+        actions = actions[:max_steps]
+        repeat = min(repeat, max(1, max_steps // len(actions)))
+    return MacroAction(actions=actions, repeat=repeat)
+
+
+def macro_length(macro: MacroAction) -> int:
+    return len(macro.actions) * max(1, macro.repeat)
+
+
+def iter_macro(macro: MacroAction) -> Iterator[Any]:
+    for _ in range(max(1, macro.repeat)):
+        yield from macro.actions
+
+
+def map_action(
+    action_proposal: ActionProposal, max_macro_steps: Optional[int] = DEFAULT_MAX_MACRO_STEPS
+) -> Any:
     if action_proposal is None:
         return None
     if hasattr(action_proposal, "action") and action_proposal.action is not None:
-        return action_proposal.action
-    return action_proposal
+        action = action_proposal.action
+    else:
+        action = action_proposal
+    if isinstance(action, MacroAction):
+        return clamp_macro(action, max_macro_steps)
+    repeat = getattr(action_proposal, "repeat", None)
+    if repeat is not None and repeat > 1:
+        return clamp_macro(MacroAction(actions=[action], repeat=repeat), max_macro_steps)
+    return action
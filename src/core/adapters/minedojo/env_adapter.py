@@ -1,13 +1,20 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
+
+from core.adapters.minedojo.obs_ring import ObservationRing
 
 
 class MineDojoAdapter:
-    def __init__(self, env: Any) -> None:
+    def __init__(self, env: Any, history: int = 0, shared_history: bool = False) -> None:
         self.env = env
         self._last_obs: Any = None
         self._last_info: Dict[str, Any] = {}
+        # With ``history`` > 0 the last N observations are copied into a
+        # preallocated ring and ``get_raw_observation`` serves read-only views.
+        self.history: Optional[ObservationRing] = (
+            ObservationRing(history, shared=shared_history) if history > 0 else None
+        )
 
     def reset(self) -> Tuple[Any, Any]:
         result = self.env.reset()
@@ -15,7 +22,7 @@ class MineDojoAdapter:
             obs, info = result
         else:
             obs, info = result, {}
-        self._last_obs = obs
+        self._record(obs)
         self._last_info = info if isinstance(info, dict) else {}
         return obs, self._last_info
 
@@ -26,13 +33,26 @@ class MineDojoAdapter:
             done = bool(terminated or truncated)
         else:
             obs, reward, done, info = result
-        self._last_obs = obs
+        self._record(obs)
         self._last_info = info if isinstance(info, dict) else {}
         return obs, reward, done, self._last_info
 
     def close(self) -> None:
         if hasattr(self.env, "close"):
             self.env.close()
+        if self.history is not None:
+            self.history.close()
 
     def get_raw_observation(self) -> Any:
         return self._last_obs
+
+    def get_observation_at(self, step: int) -> Any:
+        if self.history is None:
+            raise ValueError("Observation history is disabled; pass history=N.")
+        return self.history.at(step)
+
+    def _record(self, obs: Any) -> None:
+        if self.history is None:
+            self._last_obs = obs
+            return
+        self._last_obs = self.history.at(self.history.push(obs))
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+ObsPath = Tuple[Any, ...]
+# (path, shape, dtype, byte offset of row 0)
+LayoutEntry = Tuple[ObsPath, Tuple[int, ...], str, int]
+
+ALIGN = 64
+
+
+def flatten_obs(obs: Any, prefix: ObsPath = ()) -> Dict[ObsPath, Any]:
+    if isinstance(obs, dict):
+        flat: Dict[ObsPath, Any] = {}
+        for key, value in obs.items():
+            flat.update(flatten_obs(value, prefix + (key,)))
+        return flat
+    return {prefix: obs}
+
+
+def unflatten_obs(flat: Dict[ObsPath, Any]) -> Any:
+    if () in flat:
+        return flat[()]
+    root: Dict[Any, Any] = {}
+    for path, value in flat.items():
+        node = root
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+    return root
+
+
+def build_layout(obs: Any, rows: int, offset: int = 0) -> Tuple[List[LayoutEntry], int]:
+    # Every numeric/bool array leaf gets a 64-byte aligned ``[rows, *shape]``
+    # region; object arrays and non-array leaves are left to the caller.
+    layout: List[LayoutEntry] = []
+    for path, value in flatten_obs(obs).items():
+        if not isinstance(value, np.ndarray) or value.dtype.hasobject:
+            continue
+        layout.append((path, tuple(value.shape), value.dtype.str, offset))
+        offset += -(-value.nbytes * rows // ALIGN) * ALIGN
+    return layout, max(offset, 1)
+
+
+def layout_signature(layout: Sequence[LayoutEntry]) -> List[Tuple[ObsPath, Tuple[int, ...], str]]:
+    return [(path, shape, dtype) for path, shape, dtype, _ in layout]
+
+
+def layout_views(buffer: Any, layout: Sequence[LayoutEntry], rows: int) -> Dict[ObsPath, np.ndarray]:
+    return {
+        path: np.ndarray((rows,) + shape, dtype=np.dtype(dtype), buffer=buffer, offset=offset)
+        for path, shape, dtype, offset in layout
+    }
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.adapters.minedojo.obs_layout import (
+    ALIGN,
+    LayoutEntry,
+    ObsPath,
+    build_layout,
+    flatten_obs,
+    layout_views,
+    unflatten_obs,
+)
+
+LeafKey = Union[str, ObsPath]
+
+
+def _header_bytes(capacity: int) -> int:
+    # int64 push counter followed by the step id stored in each slot.
+    return -(-(capacity + 1) * 8 // ALIGN) * ALIGN
+
+
+def _as_path(key: LeafKey) -> ObsPath:
+    return key if isinstance(key, tuple) else (key,)
+
+
+class ObservationRing:
+    # Preallocated history of the last ``capacity`` observations. Every array
+    # leaf lives in one contiguous ``[capacity, *shape]`` array (optionally in
+    # shared memory); reads return read-only views into it, so looking at
+    # history neither copies nor allocates frames. A view stays valid until its
+    # slot is overwritten ``capacity`` pushes later.
+    def __init__(self, capacity: int, shared: bool = False) -> None:
+        if capacity < 1:
+            raise ValueError("ObservationRing capacity must be at least 1.")
+        self.capacity = capacity
+        self.shared = shared
+        self._owner = True
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._layout: List[LayoutEntry] = []
+        self._arrays: Dict[ObsPath, np.ndarray] = {}
+        self._header: Optional[np.ndarray] = None
+        self._trees: List[Any] = []
+        self._extra_slots: List[List[Tuple[Optional[Dict[Any, Any]], Any, ObsPath]]] = []
+
+    @classmethod
+    def attach(cls, name: str, capacity: int, layout: Sequence[LayoutEntry]) -> "ObservationRing":
+        # Read-only access from another process; only array leaves are shared.
+        ring = cls(capacity, shared=True)
+        ring._owner = False
+        ring._shm = shared_memory.SharedMemory(name=name)
+        ring._map(ring._shm.buf, list(layout), [])
+        return ring
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._shm.name if self._shm is not None else None
+
+    @property
+    def layout(self) -> List[LayoutEntry]:
+        return list(self._layout)
+
+    @property
+    def count(self) -> int:
+        return int(self._header[0]) if self._header is not None else 0
+
+    @property
+    def latest_step(self) -> Optional[int]:
+        count = self.count
+        return count - 1 if count else None
+
+    @property
+    def steps(self) -> range:
+        count = self.count
+        return range(max(0, count - self.capacity), count)
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def __contains__(self, step: int) -> bool:
+        return step in self.steps
+
+    def push(self, obs: Any) -> int:
+        if not self._owner:
+            raise ValueError("Attached ObservationRing is read-only.")
+        if self._header is None:
+            self._allocate(obs)
+        assert self._header is not None
+        step = int(self._header[0])
+        slot = step % self.capacity
+        flat = flatten_obs(obs)
+        for path, array in self._arrays.items():
+            value = flat.get(path)
+            if getattr(value, "shape", None) != array.shape[1:]:
+                raise ValueError(
+                    f"Observation {'/'.join(map(str, path)) or '<root>'} changed shape "
+                    f"from {array.shape[1:]} to {getattr(value, 'shape', None)}"
+                )
+            np.copyto(array[slot], value, casting="same_kind")
+        for node, key, path in self._extra_slots[slot]:
+            if node is None:
+                self._trees[slot] = flat.get(path)
+            else:
+                node[key] = flat.get(path)
+        # Publish the slot only after its data is written.
+        self._header[1 + slot] = step
+        self._header[0] = step + 1
+        return step
+
+    def at(self, step: int) -> Any:
+        slot = self._slot(step)
+        if self._trees:
+            return self._trees[slot]
+        return unflatten_obs(self._slot_views(slot))
+
+    def latest(self) -> Any:
+        step = self.latest_step
+        if step is None:
+            return None
+        return self.at(step)
+
+    def window(self, key: LeafKey, count: Optional[int] = None) -> np.ndarray:
+        # The last ``count`` values of one array leaf, oldest first. A view when
+        # the range does not wrap around the end of the ring, else a copy.
+        path = _as_path(key)
+        array = self._arrays.get(path)
+        if array is None:
+            raise KeyError(f"No array observation at {path!r}")
+        steps = self.steps
+        count = len(steps) if count is None else min(count, len(steps))
+        if count <= 0:
+            return array[:0]
+        first = (steps.stop - count) % self.capacity
+        last = first + count
+        if last <= self.capacity:
+            view = array[first:last]
+            view.flags.writeable = False
+            return view
+        return np.concatenate((array[first:], array[: last - self.capacity]))
+
+    def close(self) -> None:
+        self._arrays = {}
+        self._header = None
+        self._trees = []
+        self._extra_slots = []
+        if self._shm is not None:
+            try:
+                self._shm.close()
+            except BufferError:
+                # Views handed out earlier are still alive; the mapping goes
+                # away with them.
+                pass
+            if self._owner:
+                self._shm.unlink()
+            self._shm = None
+
+    def _slot(self, step: int) -> int:
+        if self._header is None or step not in self.steps:
+            raise KeyError(f"Step {step} is not retained (retained: {self.steps})")
+        slot = step % self.capacity
+        if int(self._header[1 + slot]) != step:
+            raise KeyError(f"Step {step} was overwritten")
+        return slot
+
+    def _slot_views(self, slot: int) -> Dict[ObsPath, Any]:
+        views: Dict[ObsPath, Any] = {}
+        for path, array in self._arrays.items():
+            view = array[slot]
+            view.flags.writeable = False
+            views[path] = view
+        return views
+
+    def _allocate(self, obs: Any) -> None:
+        header = _header_bytes(self.capacity)
+        layout, nbytes = build_layout(obs, self.capacity, offset=header)
+        if self.shared:
+            # Processes started from here on share this tracker, so readers
+            # attaching later do not unlink the segment when they exit.
+            resource_tracker.ensure_running()
+            self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            buffer: Any = self._shm.buf
+        else:
+            buffer = bytearray(nbytes)
+        array_paths = {path for path, _, _, _ in layout}
+        paths = list(flatten_obs(obs))
+        self._map(buffer, layout, [path for path in paths if path not in array_paths], paths)
+        assert self._header is not None
+        self._header[:] = -1
+        self._header[0] = 0
+
+    def _map(
+        self,
+        buffer: Any,
+        layout: List[LayoutEntry],
+        extra_paths: List[ObsPath],
+        paths: Optional[List[ObsPath]] = None,
+    ) -> None:
+        self._layout = layout
+        self._header = np.ndarray((self.capacity + 1,), dtype=np.int64, buffer=buffer)
+        self._arrays = layout_views(buffer, layout, self.capacity)
+        if paths is None:
+            return
+        # One read-only view tree per slot, built once; pushes only refresh the
+        # non-array leaves in place.
+        self._trees = []
+        self._extra_slots = []
+        for slot in range(self.capacity):
+            views = self._slot_views(slot)
+            tree = unflatten_obs({path: views.get(path) for path in paths})
+            refs: List[Tuple[Optional[Dict[Any, Any]], Any, ObsPath]] = []
+            for path in extra_paths:
+                if not path:
+                    refs.append((None, None, path))
+                    continue
+                node = tree
+                for key in path[:-1]:
+                    node = node[key]
+                refs.append((node, path[-1], path))
+            self._trees.append(tree)
+            self._extra_slots.append(refs)
@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import traceback
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.adapters.minedojo.env_adapter import MineDojoAdapter
+from core.adapters.minedojo.obs_layout import (
+    LayoutEntry,
+    ObsPath,
+    build_layout,
+    flatten_obs,
+    layout_signature,
+    layout_views,
+    unflatten_obs,
+)
+
+EnvFactory = Callable[[], Any]
+
+FINAL_OBSERVATION_KEY = "final_observation"
+FINAL_INFO_KEY = "final_info"
+
+
+class VectorEnvError(RuntimeError):
+    def __init__(self, index: int, remote_traceback: str) -> None:
+        super().__init__(f"Environment {index} failed:\n{remote_traceback}")
+        self.index = index
+        self.remote_traceback = remote_traceback
+
+
+class _WorkerState:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.slots: Dict[ObsPath, np.ndarray] = {}
+
+    def attach(self, name: str, layout: Sequence[LayoutEntry], num_envs: int) -> None:
+        self.shm = shared_memory.SharedMemory(name=name)
+        views = layout_views(self.shm.buf, layout, num_envs)
+        self.slots = {path: view[self.index] for path, view in views.items()}
+
+    def publish(self, obs: Any) -> Any:
+        # Before the buffers exist the first observation travels through the
+        # pipe so the parent can size them; afterwards only non-array leaves do.
+        if self.shm is None:
+            return obs
+        extras: Dict[ObsPath, Any] = {}
+        for path, value in flatten_obs(obs).items():
+            slot = self.slots.get(path)
+            if slot is None:
+                extras[path] = value
+            elif getattr(value, "shape", None) != slot.shape:
+                raise ValueError(
+                    f"Observation {'/'.join(map(str, path))} changed shape "
+                    f"from {slot.shape} to {getattr(value, 'shape', None)}"
+                )
+            else:
+                np.copyto(slot, value, casting="same_kind")
+        return extras
+
+    def close(self) -> None:
+        self.slots = {}
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
+
+
+def _worker(
+    index: int, remote: Any, parent_remote: Any, env_fn: EnvFactory, auto_reset: bool
+) -> None:
+    parent_remote.close()
+    state = _WorkerState(index)
+    adapter: Optional[MineDojoAdapter] = None
+    try:
+        while True:
+            try:
+                command, data = remote.recv()
+            except EOFError:
+                break
+            if command == "close":
+                remote.send(("ok", None))
+                break
+            try:
+                if adapter is None:
+                    adapter = MineDojoAdapter(env_fn())
+                if command == "reset":
+                    obs, info = adapter.reset()
+                    remote.send(("ok", (state.publish(obs), info)))
+                elif command == "step":
+                    obs, reward, done, info = adapter.step(data)
+                    if done and auto_reset:
+                        final_info = info
+                        final_obs = obs
+                        obs, reset_info = adapter.reset()
+                        info = dict(reset_info)
+                        info[FINAL_OBSERVATION_KEY] = final_obs
+                        info[FINAL_INFO_KEY] = final_info
+                    remote.send(("ok", (state.publish(obs), reward, done, info)))
+                elif command == "attach":
+                    state.attach(*data)
+                    remote.send(("ok", None))
+                elif command == "call":
+                    name, args, kwargs = data
+                    remote.send(("ok", getattr(adapter.env, name)(*args, **kwargs)))
+                else:
+                    raise ValueError(f"Unknown worker command: {command!r}")
+            except Exception:
+                remote.send(("error", traceback.format_exc()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        state.close()
+        if adapter is not None:
+            adapter.close()
+        remote.close()
+
+
+class VectorMineDojoAdapter:
+    # Runs one env per subprocess. Array observations are written by the
+    # workers straight into a shared-memory block laid out as ``[num_envs,
+    # *shape]`` per key, so a batched step only pickles rewards, flags, infos
+    # and non-array leaves.
+    def __init__(
+        self,
+        env_fns: Sequence[EnvFactory],
+        auto_reset: bool = True,
+        copy_obs: bool = True,
+        start_method: Optional[str] = None,
+        daemon: bool = True,
+    ) -> None:
+        if not env_fns:
+            raise ValueError("VectorMineDojoAdapter needs at least one env factory.")
+        self.num_envs = len(env_fns)
+        self.auto_reset = auto_reset
+        self.copy_obs = copy_obs
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._arrays: Dict[ObsPath, np.ndarray] = {}
+        self._layout: List[LayoutEntry] = []
+        self._paths: List[ObsPath] = []
+        self._last_obs: Any = None
+        self._last_infos: List[Dict[str, Any]] = [{} for _ in env_fns]
+        self._waiting = False
+        self._closed = False
+
+        # Workers must share the parent's resource tracker; one started lazily
+        # inside a worker would unlink the segment when that worker exits.
+        resource_tracker.ensure_running()
+        ctx = mp.get_context(start_method)
+        self._remotes: List[Any] = []
+        self._processes: List[Any] = []
+        for index, env_fn in enumerate(env_fns):
+            remote, worker_remote = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(index, worker_remote, remote, env_fn, auto_reset),
+                daemon=daemon,
+                name=f"minedojo-env-{index}",
+            )
+            process.start()
+            worker_remote.close()
+            self._remotes.append(remote)
+            self._processes.append(process)
+
+    def __enter__(self) -> "VectorMineDojoAdapter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @property
+    def observation_layout(self) -> List[LayoutEntry]:
+        return list(self._layout)
+
+    def reset(self) -> Tuple[Any, List[Dict[str, Any]]]:
+        self._check_idle()
+        for remote in self._remotes:
+            remote.send(("reset", None))
+        results = self._gather()
+        if self._shm is None:
+            self._allocate([obs for obs, _ in results])
+            extras = [self._copy_initial(index, obs) for index, (obs, _) in enumerate(results)]
+        else:
+            extras = [obs for obs, _ in results]
+        infos = [info if isinstance(info, dict) else {} for _, info in results]
+        return self._finish(extras, infos), infos
+
+    def step_async(self, actions: Sequence[Any]) -> None:
+        self._check_idle()
+        if self._shm is None:
+            raise ValueError("reset() must be called before step().")
+        if len(actions) != self.num_envs:
+            raise ValueError(f"Expected {self.num_envs} actions, got {len(actions)}")
+        for remote, action in zip(self._remotes, actions):
+            remote.send(("step", action))
+        self._waiting = True
+
+    def step_wait(self) -> Tuple[Any, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        if not self._waiting:
+            raise ValueError("step_wait() called without a pending step_async().")
+        try:
+            results = self._gather()
+        finally:
+            self._waiting = False
+        extras = [result[0] for result in results]
+        rewards = np.asarray([float(result[1] or 0.0) for result in results], dtype=np.float64)
+        dones = np.asarray([bool(result[2]) for result in results], dtype=bool)
+        infos = [result[3] if isinstance(result[3], dict) else {} for result in results]
+        return self._finish(extras, infos), rewards, dones, infos
+
+    def step(self, actions: Sequence[Any]) -> Tuple[Any, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        self.step_async(actions)
+        return self.step_wait()
+
+    def call(self, name: str, *args: Any, **kwargs: Any) -> List[Any]:
+        self._check_idle()
+        for remote in self._remotes:
+            remote.send(("call", (name, args, kwargs)))
+        return self._gather()
+
+    def get_raw_observation(self) -> Any:
+        return self._last_obs
+
+    def get_infos(self) -> List[Dict[str, Any]]:
+        return self._last_infos
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._waiting:
+            try:
+                self._gather()
+            except Exception:
+                pass
+            self._waiting = False
+        for remote in self._remotes:
+            try:
+                remote.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for remote in self._remotes:
+            try:
+                if remote.poll(timeout):
+                    remote.recv()
+            except (EOFError, OSError):
+                pass
+            remote.close()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout)
+        self._arrays = {}
+        self._last_obs = None
+        if self._shm is not None:
+            try:
+                self._shm.close()
+            except BufferError:
+                # Zero-copy observations handed out with copy_obs=False are
+                # still alive; the mapping goes away with them.
+                pass
+            self._shm.unlink()
+            self._shm = None
+
+    def _check_idle(self) -> None:
+        if self._closed:
+            raise ValueError("VectorMineDojoAdapter is closed.")
+        if self._waiting:
+            raise ValueError("A step_async() is still pending; call step_wait() first.")
+
+    def _gather(self) -> List[Any]:
+        results: List[Any] = []
+        errors: List[Tuple[int, str]] = []
+        for index, remote in enumerate(self._remotes):
+            try:
+                status, payload = remote.recv()
+            except EOFError:
+                status, payload = "error", "worker process exited unexpectedly"
+            if status == "error":
+                errors.append((index, payload))
+            results.append(payload)
+        if errors:
+            raise VectorEnvError(*errors[0])
+        return results
+
+    def _allocate(self, observations: Sequence[Any]) -> None:
+        layout, nbytes = build_layout(observations[0], self.num_envs)
+        reference = layout_signature(layout)
+        for index, obs in enumerate(observations[1:], start=1):
+            if layout_signature(build_layout(obs, self.num_envs)[0]) != reference:
+                raise ValueError(f"Environment {index} observation layout differs from environment 0")
+        self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._layout = layout
+        self._paths = list(flatten_obs(observations[0]))
+        self._arrays = layout_views(self._shm.buf, layout, self.num_envs)
+        for remote in self._remotes:
+            remote.send(("attach", (self._shm.name, layout, self.num_envs)))
+        self._gather()
+
+    def _copy_initial(self, index: int, obs: Any) -> Dict[ObsPath, Any]:
+        extras: Dict[ObsPath, Any] = {}
+        for path, value in flatten_obs(obs).items():
+            array = self._arrays.get(path)
+            if array is None:
+                extras[path] = value
+            else:
+                array[index] = value
+        return extras
+
+    def _finish(self, extras: Sequence[Dict[ObsPath, Any]], infos: List[Dict[str, Any]]) -> Any:
+        flat: Dict[ObsPath, Any] = {}
+        for path in self._paths:
+            array = self._arrays.get(path)
+            if array is None:
+                flat[path] = [env_extras.get(path) for env_extras in extras]
+            else:
+                flat[path] = array.copy() if self.copy_obs else array
+        self._last_obs = unflatten_obs(flat)
+        self._last_infos = infos
+        return self._last_obs
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, List, Optional, Sequence, Union
 
 from core.agents.homeostatic_agent import HomeostaticAgent
 from core.agents.metacognitive_agent import MetacognitiveAgent
 from core.agents.motor_agent import MotorAgent
 from core.agents.perceptual_agent import PerceptualAgent
+from core.llm.client import AsyncLLMClient, LLMClient
+from core.llm.concurrency import DEFAULT_MAX_CONCURRENCY, generate_many_sync
+from core.llm.types import LLMRequest
 
 
 class MultiAgentCoordinator:
@@ -15,11 +18,24 @@ class MultiAgentCoordinator:
         perceptual: PerceptualAgent,
         motor: MotorAgent,
         metacognitive: MetacognitiveAgent,
+        llm_client: Optional[Union[LLMClient, AsyncLLMClient]] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
     ) -> None:
         self.homeostatic = homeostatic
         self.perceptual = perceptual
         self.motor = motor
         self.metacognitive = metacognitive
+        self.llm_client = llm_client
+        self.max_concurrency = max_concurrency
+
+    def complete_all(self, requests: Sequence[LLMRequest]) -> List[Any]:
+        # Independent per-agent completions for one step are issued
+        # concurrently, so the step pays roughly the slowest call, not the sum.
+        if self.llm_client is None:
+            raise ValueError("MultiAgentCoordinator.llm_client is not configured.")
+        return generate_many_sync(
+            self.llm_client, requests, max_concurrency=self.max_concurrency
+        )
 
     def step(self, observation: Any, memory_manager: Any, workspace: Any) -> Any:
         raise NotImplementedError("Coordinator step not implemented.")
@@ -1,4 +1,52 @@
-from core.llm.client import LLMClient
+from core.llm.cache import CachingLLMClient
+from core.llm.client import (
+    AsyncLLMClient,
+    AsyncStreamingLLMClient,
+    LLMClient,
+    StreamingLLMClient,
+)
+from core.llm.concurrency import generate_many, generate_many_sync
+from core.llm.ratelimit import (
+    AsyncRateLimitedLLMClient,
+    RateLimitedLLMClient,
+    RateLimiter,
+    RetryPolicy,
+    TransientLLMError,
+)
+from core.llm.replay import ReplayLLMClient, ReplayMissError
+from core.llm.router import AsyncRoutingLLMClient, LatencyTracker, Route, RoutingLLMClient
+from core.llm.singleflight import AsyncSingleFlightLLMClient, SingleFlightLLMClient
+from core.llm.streaming import AsyncLLMStream, LLMStream, StreamStats, open_stream, read_until
 from core.llm.types import LLMMessage, LLMRequest, LLMResponse, LLMUsage
 
-__all__ = ["LLMClient", "LLMMessage", "LLMRequest", "LLMResponse", "LLMUsage"]
+__all__ = [
+    "AsyncLLMClient",
+    "AsyncLLMStream",
+    "AsyncRateLimitedLLMClient",
+    "AsyncRoutingLLMClient",
+    "AsyncSingleFlightLLMClient",
+    "AsyncStreamingLLMClient",
+    "CachingLLMClient",
+    "LLMClient",
+    "LatencyTracker",
+    "LLMMessage",
+    "LLMRequest",
+    "LLMResponse",
+    "LLMStream",
+    "LLMUsage",
+    "RateLimitedLLMClient",
+    "RateLimiter",
+    "ReplayLLMClient",
+    "ReplayMissError",
+    "RetryPolicy",
+    "Route",
+    "RoutingLLMClient",
+    "SingleFlightLLMClient",
+    "StreamStats",
+    "StreamingLLMClient",
+    "TransientLLMError",
+    "generate_many",
+    "generate_many_sync",
+    "open_stream",
+    "read_until",
+]
@@ -0,0 +1,403 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Optional, Protocol, Tuple, Union
+
+from core.llm.client import LLMClient
+from core.llm.hashing import request_key
+from core.llm.types import LLMRequest, LLMResponse, LLMUsage
+from core.observability.logger import RunLogger
+
+CACHE_DETERMINISTIC = "deterministic"
+CACHE_ALWAYS = "always"
+
+
+class EvictionPolicy(Protocol):
+    def touch(self, key: str) -> None:
+        ...
+
+    def remove(self, key: str) -> None:
+        ...
+
+    def victim(self) -> Optional[str]:
+        ...
+
+
+class LRUPolicy(EvictionPolicy):
+    def __init__(self) -> None:
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+
+    def touch(self, key: str) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def remove(self, key: str) -> None:
+        self._order.pop(key, None)
+
+    def victim(self) -> Optional[str]:
+        return next(iter(self._order), None)
+
+
+class FIFOPolicy(EvictionPolicy):
+    def __init__(self) -> None:
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+
+    def touch(self, key: str) -> None:
+        self._order.setdefault(key, None)
+
+    def remove(self, key: str) -> None:
+        self._order.pop(key, None)
+
+    def victim(self) -> Optional[str]:
+        return next(iter(self._order), None)
+
+
+class LFUPolicy(EvictionPolicy):
+    def __init__(self) -> None:
+        self._counts: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_count = 0
+
+    def touch(self, key: str) -> None:
+        count = self._counts.get(key, 0)
+        if count:
+            bucket = self._buckets[count]
+            bucket.pop(key, None)
+            if not bucket:
+                del self._buckets[count]
+                if self._min_count == count:
+                    self._min_count = count + 1
+        else:
+            self._min_count = 1
+        self._counts[key] = count + 1
+        self._buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+    def remove(self, key: str) -> None:
+        count = self._counts.pop(key, None)
+        if count is None:
+            return
+        bucket = self._buckets.get(count)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._buckets[count]
+        if count == self._min_count:
+            self._min_count = min(self._buckets, default=0)
+
+    def victim(self) -> Optional[str]:
+        bucket = self._buckets.get(self._min_count)
+        if not bucket:
+            if not self._buckets:
+                return None
+            self._min_count = min(self._buckets)
+            bucket = self._buckets[self._min_count]
+        return next(iter(bucket), None)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    bypassed: int = 0
+
+
+def _entry_size(response: LLMResponse) -> int:
+    return len(response.text.encode("utf-8")) + 256
+
+
+class MemoryCacheTier:
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl_s: Optional[float] = None,
+        policy: Optional[EvictionPolicy] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.policy: EvictionPolicy = policy or LRUPolicy()
+        self._entries: Dict[str, Tuple[LLMResponse, float, int]] = {}
+        self._bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        response, stored_at, _ = entry
+        if self.ttl_s is not None and time.time() - stored_at > self.ttl_s:
+            self._discard(key)
+            self.expirations += 1
+            return None
+        self.policy.touch(key)
+        return response
+
+    def put(self, key: str, response: LLMResponse, stored_at: Optional[float] = None) -> None:
+        if key in self._entries:
+            self._discard(key)
+        size = _entry_size(response)
+        self._entries[key] = (response, time.time() if stored_at is None else stored_at, size)
+        self._bytes += size
+        self.policy.touch(key)
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            victim = self.policy.victim()
+            if victim is None or victim not in self._entries:
+                break
+            self._discard(victim)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+        self.policy.remove(key)
+
+
+class SQLiteCacheTier:
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_entries: Optional[int] = 100000,
+        ttl_s: Optional[float] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[LLMResponse, float]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, stored_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self.ttl_s is not None and now - row[1] > self.ttl_s:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.expirations += 1
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return _response_from_json(row[0]), row[1]
+
+    def put(self, key: str, response: LLMResponse) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, _response_to_json(response), now, now),
+            )
+            if self.max_entries is not None:
+                count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+                excess = count - self.max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM llm_cache WHERE key IN ("
+                        " SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                        (excess,),
+                    )
+                    self.evictions += excess
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        if self.ttl_s is None:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM llm_cache WHERE stored_at < ?", (time.time() - self.ttl_s,)
+            )
+            self._conn.commit()
+        self.expirations += cursor.rowcount
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _response_to_json(response: LLMResponse) -> str:
+    return json.dumps(
+        {
+            "text": response.text,
+            "usage": asdict(response.usage) if response.usage is not None else None,
+            "latency_ms": response.latency_ms,
+            "provider": response.provider,
+            "model": response.model,
+        },
+        ensure_ascii=True,
+    )
+
+
+def _response_from_json(payload: str) -> LLMResponse:
+    data = json.loads(payload)
+    usage = data.get("usage")
+    return LLMResponse(
+        text=data.get("text", ""),
+        raw=None,
+        usage=LLMUsage(**usage) if isinstance(usage, dict) else None,
+        latency_ms=data.get("latency_ms"),
+        provider=data.get("provider"),
+        model=data.get("model"),
+    )
+
+
+def _default_model(client: Any) -> Optional[str]:
+    # The model a request without one is sent to; wrappers (rate limiting,
+    # retries) expose the client they wrap as ``client``.
+    for _ in range(8):
+        model = getattr(client, "default_model", None)
+        if model:
+            return model
+        client = getattr(client, "client", None)
+        if client is None:
+            return None
+    return None
+
+
+class CachingLLMClient(LLMClient):
+    def __init__(
+        self,
+        client: LLMClient,
+        memory: Optional[MemoryCacheTier] = None,
+        disk: Optional[SQLiteCacheTier] = None,
+        mode: str = CACHE_DETERMINISTIC,
+        namespace: str = "",
+        logger: Optional[RunLogger] = None,
+    ) -> None:
+        if mode not in (CACHE_DETERMINISTIC, CACHE_ALWAYS):
+            raise ValueError(f"Unknown cache mode: {mode!r}")
+        self.client = client
+        self.memory = memory if memory is not None else MemoryCacheTier()
+        self.disk = disk
+        self.mode = mode
+        self.namespace = namespace
+        self.logger = logger
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def is_cacheable(self, request: LLMRequest) -> bool:
+        if request.metadata and "cache" in request.metadata:
+            return bool(request.metadata["cache"])
+        if self.mode == CACHE_ALWAYS:
+            return True
+        return request.temperature is not None and float(request.temperature) == 0.0
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        if not self.is_cacheable(request):
+            with self._lock:
+                self.stats.bypassed += 1
+            return self.client.generate(request)
+
+        start = time.time()
+        # Key by the model that will answer, so a persistent tier shared by
+        # runs with different default models never crosses their answers.
+        keyed = request
+        if request.model is None:
+            keyed = replace(request, model=_default_model(self.client))
+        key = request_key(keyed, self.namespace)
+        tier = None
+        with self._lock:
+            cached = self.memory.get(key)
+            if cached is not None:
+                tier = "memory"
+        if cached is None and self.disk is not None:
+            found = self.disk.get(key)
+            if found is not None:
+                cached, stored_at = found
+                tier = "disk"
+                with self._lock:
+                    self.memory.put(key, cached, stored_at=stored_at)
+
+        if cached is not None:
+            with self._lock:
+                self.stats.hits += 1
+                if tier == "memory":
+                    self.stats.memory_hits += 1
+                else:
+                    self.stats.disk_hits += 1
+            self._record("hit", key, tier)
+            return replace(cached, latency_ms=(time.time() - start) * 1000.0)
+
+        with self._lock:
+            self.stats.misses += 1
+        self._record("miss", key, None)
+        response = self.client.generate(request)
+        with self._lock:
+            self.memory.put(key, response)
+        if self.disk is not None:
+            self.disk.put(key, response)
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _record(self, outcome: str, key: str, tier: Optional[str]) -> None:
+        with self._lock:
+            self.stats.evictions = self.memory.evictions + (
+                self.disk.evictions if self.disk is not None else 0
+            )
+            self.stats.expirations = self.memory.expirations + (
+                self.disk.expirations if self.disk is not None else 0
+            )
+            stats: Dict[str, Any] = asdict(self.stats)
+        if self.logger is None:
+            return
+        self.logger.event(
+            f"llm.cache.{outcome}",
+            {"key": key[:16], "tier": tier, "stats": stats},
+        )
@@ -1,10 +1,28 @@
 from __future__ import annotations
 
-from typing import Protocol
+from typing import TYPE_CHECKING, Protocol
 
 from core.llm.types import LLMRequest, LLMResponse
 
+if TYPE_CHECKING:  # pragma: no cover
+    from core.llm.streaming import AsyncLLMStream, LLMStream
+
 
 class LLMClient(Protocol):
     def generate(self, request: LLMRequest) -> LLMResponse:
         ...
+
+
+class AsyncLLMClient(Protocol):
+    async def generate(self, request: LLMRequest) -> LLMResponse:
+        ...
+
+
+class StreamingLLMClient(LLMClient, Protocol):
+    def generate_stream(self, request: LLMRequest) -> "LLMStream":
+        ...
+
+
+class AsyncStreamingLLMClient(AsyncLLMClient, Protocol):
+    async def generate_stream(self, request: LLMRequest) -> "AsyncLLMStream":
+        ...
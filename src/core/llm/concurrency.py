@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, List, Optional, Sequence, Union
+
+from core.llm.client import AsyncLLMClient, LLMClient
+from core.llm.types import LLMRequest, LLMResponse
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class ThreadedAsyncClient(AsyncLLMClient):
+    def __init__(self, client: LLMClient) -> None:
+        self.client = client
+
+    async def generate(self, request: LLMRequest) -> LLMResponse:
+        return await asyncio.to_thread(self.client.generate, request)
+
+
+def as_async_client(client: Union[LLMClient, AsyncLLMClient]) -> AsyncLLMClient:
+    if asyncio.iscoroutinefunction(getattr(client, "generate", None)):
+        return client  # type: ignore[return-value]
+    return ThreadedAsyncClient(client)  # type: ignore[arg-type]
+
+
+async def generate_many(
+    client: Union[LLMClient, AsyncLLMClient],
+    requests: Sequence[LLMRequest],
+    max_concurrency: Optional[int] = DEFAULT_MAX_CONCURRENCY,
+    return_exceptions: bool = False,
+) -> List[Any]:
+    async_client = as_async_client(client)
+    limit = len(requests) if not max_concurrency or max_concurrency < 1 else max_concurrency
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def _one(request: LLMRequest) -> LLMResponse:
+        async with semaphore:
+            return await async_client.generate(request)
+
+    return await asyncio.gather(
+        *(_one(request) for request in requests), return_exceptions=return_exceptions
+    )
+
+
+_loop_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    # Sync callers share one long-lived loop so async SDK clients, whose HTTP
+    # pools are bound to the loop they were first used on, survive across steps.
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="llm-fanout-loop", daemon=True
+            )
+            thread.start()
+            _loop = loop
+        return _loop
+
+
+def generate_many_sync(
+    client: Union[LLMClient, AsyncLLMClient],
+    requests: Sequence[LLMRequest],
+    max_concurrency: Optional[int] = DEFAULT_MAX_CONCURRENCY,
+    return_exceptions: bool = False,
+    timeout: Optional[float] = None,
+) -> List[Any]:
+    future = asyncio.run_coroutine_threadsafe(
+        generate_many(client, requests, max_concurrency, return_exceptions),
+        _background_loop(),
+    )
+    return future.result(timeout)
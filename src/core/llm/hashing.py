@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from core.llm.types import LLMRequest
+
+
+def _normalize_text(text: str) -> str:
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def request_fingerprint(request: LLMRequest, namespace: str = "") -> Dict[str, Any]:
+    provider_params: Optional[Any] = None
+    if request.metadata:
+        provider_params = request.metadata.get("provider_params")
+    return {
+        "namespace": namespace,
+        "model": request.model,
+        "messages": [[msg.role, _normalize_text(msg.content)] for msg in request.messages],
+        "temperature": None if request.temperature is None else float(request.temperature),
+        "max_tokens": request.max_tokens,
+        "provider_params": provider_params,
+    }
+
+
+def request_key(request: LLMRequest, namespace: str = "") -> str:
+    canonical = json.dumps(
+        request_fingerprint(request, namespace),
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=True,
+        default=repr,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import json
+import math
+import warnings
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - numpy optional
+    np = None  # type: ignore
+
+from core.llm.types import LLMMessage
+
+TokenCounter = Callable[[str], int]
+
+DEFAULT_TOKEN_BUDGET = 1500
+DEFAULT_FLOAT_DIGITS = 2
+INLINE_ARRAY_ITEMS = 16
+OMITTED_KEY = "_omitted"
+
+_OUTPUT_INSTRUCTION = 'Return JSON only, like: {"action": [0,1,0,...]}.'
+_MACRO_INSTRUCTION = (
+    'To hold an action for several steps add "repeat": N (at most {max_steps}), '
+    'or return a short sequence as {{"actions": [[...], [...]]}}.'
+)
+
+
+def approx_tokens(text: str) -> int:
+    # ~4 characters per token is a close fit for English and compact JSON on
+    # current BPE tokenizers; pass a real tokenizer via ``token_counter``.
+    return math.ceil(len(text) / 4)
+
+
+def compact_value(value: Any, float_digits: int = DEFAULT_FLOAT_DIGITS) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        if value != value or value in (math.inf, -math.inf):
+            return None
+        rounded = round(value, float_digits)
+        return int(rounded) if rounded.is_integer() else rounded
+    if isinstance(value, (int, str)):
+        return value
+    if np is not None:
+        if isinstance(value, np.generic):
+            return compact_value(value.item(), float_digits)
+        if isinstance(value, np.ndarray):
+            if value.size <= INLINE_ARRAY_ITEMS:
+                return compact_value(value.tolist(), float_digits)
+            return {"shape": list(value.shape), "dtype": str(value.dtype)}
+    if isinstance(value, Mapping):
+        out: Dict[str, Any] = {}
+        for key, item in value.items():
+            compacted = compact_value(item, float_digits)
+            if compacted is None or compacted == {}:
+                continue
+            out[str(key)] = compacted
+        return out
+    if isinstance(value, (list, tuple)):
+        return [compact_value(item, float_digits) for item in value]
+    return str(value)
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def fit_json(
+    value: Any,
+    max_tokens: int,
+    token_counter: TokenCounter = approx_tokens,
+) -> str:
+    # Shrinks structurally instead of slicing the encoded text, so the result
+    # is always valid JSON: the largest top-level fields are dropped first and
+    # listed under ``_omitted``.
+    text = compact_json(value)
+    if token_counter(text) <= max_tokens or not isinstance(value, dict):
+        return text
+    remaining = dict(value)
+    omitted: List[str] = []
+    sizes = sorted(
+        ((len(compact_json(item)), key) for key, item in remaining.items()),
+        reverse=True,
+    )
+    for _, key in sizes:
+        del remaining[key]
+        omitted.append(key)
+        text = compact_json({**remaining, OMITTED_KEY: omitted})
+        if token_counter(text) <= max_tokens:
+            break
+    return text
+
+
+@dataclass
+class PromptSection:
+    name: str
+    content: Any
+    priority: int = 0
+    min_tokens: int = 0
+    max_tokens: Optional[int] = None
+    label: Optional[str] = None
+
+
+def allocate_budget(
+    sections: Sequence[PromptSection],
+    budget: int,
+    token_counter: TokenCounter = approx_tokens,
+) -> Dict[str, int]:
+    needs: Dict[str, int] = {}
+    for section in sections:
+        text = section.content if isinstance(section.content, str) else compact_json(section.content)
+        need = token_counter(text)
+        if section.max_tokens is not None:
+            need = min(need, section.max_tokens)
+        needs[section.name] = need
+
+    ordered = sorted(sections, key=lambda section: -section.priority)
+    allocation: Dict[str, int] = {}
+    remaining = max(0, budget)
+    for section in ordered:
+        grant = min(section.min_tokens, needs[section.name], remaining)
+        allocation[section.name] = grant
+        remaining -= grant
+    for section in ordered:
+        extra = min(needs[section.name] - allocation[section.name], remaining)
+        if extra > 0:
+            allocation[section.name] += extra
+            remaining -= extra
+    return allocation
+
+
+def render_section(
+    section: PromptSection,
+    max_tokens: int,
+    token_counter: TokenCounter = approx_tokens,
+) -> str:
+    if isinstance(section.content, str):
+        text = section.content
+        if token_counter(text) > max_tokens:
+            text = text[: max(0, max_tokens * 4 - 3)] + "..."
+    else:
+        text = fit_json(section.content, max_tokens, token_counter)
+    label = section.label or section.name
+    return f"{label}: {text}"
+
+
+@dataclass
+class PromptStats:
+    prefix_tokens: int = 0
+    dynamic_tokens: int = 0
+    allocation: Dict[str, int] = field(default_factory=dict)
+    # Tokens granted past ``token_budget`` to keep the sections' minimums.
+    over_budget: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prefix_tokens + self.dynamic_tokens
+
+
+class PromptBuilder:
+    def __init__(
+        self,
+        task_prompt: str,
+        task_guidance: str,
+        action_space: Any,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        float_digits: int = DEFAULT_FLOAT_DIGITS,
+        token_counter: TokenCounter = approx_tokens,
+        max_macro_steps: int = 1,
+    ) -> None:
+        self.task_prompt = task_prompt
+        self.task_guidance = task_guidance
+        self.action_space = action_space
+        self.token_budget = token_budget
+        self.float_digits = float_digits
+        self.token_counter = token_counter
+        self.max_macro_steps = max_macro_steps
+        self._prefix: Optional[str] = None
+        self._warned = False
+        self.last_stats = PromptStats()
+
+    @property
+    def static_prefix(self) -> str:
+        # Everything that is constant for the task goes first and is rendered
+        # once, so provider-side prompt caches see an identical prefix.
+        if self._prefix is None:
+            instruction = _OUTPUT_INSTRUCTION
+            if self.max_macro_steps > 1:
+                instruction += " " + _MACRO_INSTRUCTION.format(max_steps=self.max_macro_steps)
+            self._prefix = (
+                "You control a MineDojo agent.\n"
+                f"Task: {self.task_prompt}\n"
+                f"Guidance: {self.task_guidance}\n"
+                f"Action space: {compact_json(compact_value(self.action_space))}\n"
+                f"{instruction}\n"
+            )
+        return self._prefix
+
+    def sections(self, state: Any, observation: Any) -> List[PromptSection]:
+        return [
+            PromptSection(
+                "state",
+                compact_value(state, self.float_digits),
+                priority=2,
+                min_tokens=64,
+                label="State",
+            ),
+            PromptSection(
+                "observation",
+                compact_value(observation, self.float_digits),
+                priority=1,
+                min_tokens=32,
+                label="Observation summary",
+            ),
+        ]
+
+    def dynamic(self, state: Any, observation: Any) -> Tuple[str, Dict[str, int]]:
+        sections = self.sections(state, observation)
+        budget = self.token_budget - self.token_counter(self.static_prefix)
+        reserved = sum(section.min_tokens for section in sections)
+        if budget < reserved:
+            # The prefix alone uses up the budget. Sections still get their
+            # minimums rather than silently dropping the state.
+            if not self._warned:
+                self._warned = True
+                warnings.warn(
+                    f"token_budget {self.token_budget} leaves {max(0, budget)} tokens after "
+                    f"the static prompt; sections need {reserved}, going over budget",
+                    RuntimeWarning,
+                    stacklevel=3,
+                )
+            budget = reserved
+        allocation = allocate_budget(sections, budget, self.token_counter)
+        lines = [
+            render_section(section, allocation[section.name], self.token_counter)
+            for section in sections
+            if allocation[section.name] > 0
+        ]
+        return "\n".join(lines) + "\n", allocation
+
+    def build(self, state: Any, observation: Any) -> str:
+        dynamic, allocation = self.dynamic(state, observation)
+        prefix_tokens = self.token_counter(self.static_prefix)
+        dynamic_tokens = self.token_counter(dynamic)
+        self.last_stats = PromptStats(
+            prefix_tokens=prefix_tokens,
+            dynamic_tokens=dynamic_tokens,
+            allocation=allocation,
+            over_budget=max(0, prefix_tokens + dynamic_tokens - self.token_budget),
+        )
+        return self.static_prefix + dynamic
+
+    def build_messages(self, state: Any, observation: Any) -> List[LLMMessage]:
+        prompt = self.build(state, observation)
+        prefix = self.static_prefix
+        return [
+            LLMMessage(role="system", content=prefix),
+            LLMMessage(role="user", content=prompt[len(prefix) :]),
+        ]
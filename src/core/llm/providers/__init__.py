@@ -1,10 +1,25 @@
 from core.llm.providers.anthropic import AnthropicClientStub
 from core.llm.providers.gemini import GeminiClientStub
-from core.llm.providers.openai import OpenAIClient, OpenAIClientStub
+from core.llm.providers.openai import AsyncOpenAIClient, OpenAIClient, OpenAIClientStub
+from core.llm.providers.transport import (
+    HTTPResponse,
+    HTTPTransport,
+    TransportConfig,
+    close_shared_transports,
+    shared_httpx_client,
+    shared_transport,
+)
 
 __all__ = [
+    "AsyncOpenAIClient",
     "OpenAIClient",
     "OpenAIClientStub",
     "AnthropicClientStub",
     "GeminiClientStub",
+    "HTTPResponse",
+    "HTTPTransport",
+    "TransportConfig",
+    "close_shared_transports",
+    "shared_httpx_client",
+    "shared_transport",
 ]
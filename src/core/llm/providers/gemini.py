@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from core.llm.client import LLMClient
+from core.llm.providers.transport import HTTPTransport, shared_transport
 from core.llm.types import LLMRequest, LLMResponse
 
 
 class GeminiClientStub(LLMClient):
-    def __init__(self, *args, **kwargs) -> None:
-        pass
+    def __init__(self, *args, transport: Optional[HTTPTransport] = None, **kwargs) -> None:
+        self.transport = transport or shared_transport()
 
     def generate(self, request: LLMRequest) -> LLMResponse:
         raise NotImplementedError("Gemini client adapter not implemented.")
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import time
-from typing import Any, Dict, List, Optional
+from dataclasses import replace
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
-from core.llm.client import LLMClient
+from core.llm.client import AsyncStreamingLLMClient, StreamingLLMClient
+from core.llm.hashing import request_key
+from core.llm.providers.transport import TransportConfig, running_loop, shared_httpx_client
+from core.llm.streaming import AsyncLLMStream, LLMStream, StreamChunk
 from core.llm.types import LLMMessage, LLMRequest, LLMResponse, LLMUsage
 from core.observability.logger import RunLogger
 
@@ -15,7 +20,53 @@ def _messages_to_input(messages: List[LLMMessage]) -> List[Dict[str, Any]]:
     return payload
 
 
-class OpenAIClient(LLMClient):
+def _usage(raw_usage: Any) -> Optional[LLMUsage]:
+    if raw_usage is None:
+        return None
+    # Chat Completions reports prompt/completion tokens, Responses input/output.
+    prompt = getattr(raw_usage, "prompt_tokens", None)
+    completion = getattr(raw_usage, "completion_tokens", None)
+    return LLMUsage(
+        prompt_tokens=prompt if prompt is not None else getattr(raw_usage, "input_tokens", None),
+        completion_tokens=(
+            completion if completion is not None else getattr(raw_usage, "output_tokens", None)
+        ),
+        total_tokens=getattr(raw_usage, "total_tokens", None),
+    )
+
+
+def _stream_chunk(event: Any) -> Optional[StreamChunk]:
+    event_type = getattr(event, "type", None)
+    if event_type == "response.output_text.delta":
+        return getattr(event, "delta", "") or "", None
+    if event_type == "response.completed":
+        return "", _usage(getattr(getattr(event, "response", None), "usage", None))
+    if event_type in {"response.failed", "error"}:
+        error = getattr(getattr(event, "response", None), "error", None) or getattr(
+            event, "message", None
+        )
+        raise RuntimeError(f"OpenAI stream failed: {error}")
+    return None
+
+
+def _iter_chunks(events: Any) -> Iterator[StreamChunk]:
+    for event in events:
+        chunk = _stream_chunk(event)
+        if chunk is not None:
+            yield chunk
+
+
+async def _aiter_chunks(events: Any) -> AsyncIterator[StreamChunk]:
+    async for event in events:
+        chunk = _stream_chunk(event)
+        if chunk is not None:
+            yield chunk
+
+
+class _OpenAIBase:
+    _sdk_client_name = "OpenAI"
+    _asynchronous = False
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -26,6 +77,9 @@ class OpenAIClient(LLMClient):
         logger: Optional[RunLogger] = None,
         client: Any = None,
         timeout: Optional[float] = None,
+        http_client: Any = None,
+        transport: Optional[TransportConfig] = None,
+        share_transport: bool = True,
     ) -> None:
         self.default_model = default_model
         self.default_params = default_params or {}
@@ -36,9 +90,9 @@ class OpenAIClient(LLMClient):
             return
 
         try:
-            from openai import OpenAI
+            import openai
         except Exception as exc:  # pragma: no cover - optional dependency
-            raise ImportError("openai package is required for OpenAIClient") from exc
+            raise ImportError(f"openai package is required for {type(self).__name__}") from exc
 
         kwargs: Dict[str, Any] = {}
         if api_key:
@@ -49,9 +103,19 @@ class OpenAIClient(LLMClient):
             kwargs["project"] = project
         if timeout is not None:
             kwargs["timeout"] = timeout
-        self.client = OpenAI(**kwargs)
+        if http_client is None and share_transport:
+            # Every client in the process (for async clients: on the same event
+            # loop) reuses one connection pool. An async client built outside
+            # a loop keeps the SDK's own pool, since it cannot know its loop.
+            if not self._asynchronous:
+                http_client = shared_httpx_client(transport)
+            elif running_loop() is not None:
+                http_client = shared_httpx_client(transport, asynchronous=True)
+        if http_client is not None:
+            kwargs["http_client"] = http_client
+        self.client = getattr(openai, self._sdk_client_name)(**kwargs)
 
-    def generate(self, request: LLMRequest) -> LLMResponse:
+    def _prepare(self, request: LLMRequest) -> Tuple[str, Dict[str, Any], Optional[str]]:
         model = request.model or self.default_model
         if not model:
             raise ValueError("LLMRequest.model is required when no default_model is set.")
@@ -72,10 +136,15 @@ class OpenAIClient(LLMClient):
 
         params.update(self.default_params)
 
+        key = None
         if self.logger is not None:
+            # Pairs request and response records for ReplayLLMClient; keyed by
+            # the resolved model, as a replayed payload carries it.
+            key = request_key(replace(request, model=model))
             self.logger.llm_request(
                 {
                     "provider": "openai",
+                    "key": key,
                     "model": model,
                     "messages": input_messages,
                     "request_params": {
@@ -84,11 +153,11 @@ class OpenAIClient(LLMClient):
                     },
                 }
             )
+        return model, params, key
 
-        start = time.time()
-        resp = self.client.responses.create(**params)
-        latency_ms = (time.time() - start) * 1000.0
-
+    def _finish(
+        self, resp: Any, model: str, latency_ms: float, key: Optional[str] = None
+    ) -> LLMResponse:
         text = getattr(resp, "output_text", None)
         if not text:
             text = ""
@@ -101,14 +170,7 @@ class OpenAIClient(LLMClient):
                         if part_type in {"output_text", "text"}:
                             text += getattr(part, "text", "")
 
-        usage = None
-        raw_usage = getattr(resp, "usage", None)
-        if raw_usage is not None:
-            usage = LLMUsage(
-                prompt_tokens=getattr(raw_usage, "prompt_tokens", None),
-                completion_tokens=getattr(raw_usage, "completion_tokens", None),
-                total_tokens=getattr(raw_usage, "total_tokens", None),
-            )
+        usage = _usage(getattr(resp, "usage", None))
 
         response = LLMResponse(
             text=text,
@@ -123,6 +185,7 @@ class OpenAIClient(LLMClient):
             self.logger.llm_response(
                 {
                     "provider": "openai",
+                    "key": key,
                     "model": model,
                     "text": response.text,
                     "usage": usage,
@@ -133,6 +196,65 @@ class OpenAIClient(LLMClient):
 
         return response
 
+    def _finish_stream(self, stream: Any, key: Optional[str] = None) -> None:
+        if self.logger is not None:
+            self.logger.llm_response(
+                {
+                    "provider": "openai",
+                    "key": key,
+                    "model": stream.model,
+                    "text": stream.text,
+                    "usage": stream.usage,
+                    "latency_ms": stream.stats.latency_ms,
+                    "ttft_ms": stream.stats.ttft_ms,
+                    "stopped_early": stream.stats.stopped_early,
+                    "stream": True,
+                }
+            )
+
+
+class OpenAIClient(_OpenAIBase, StreamingLLMClient):
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        model, params, key = self._prepare(request)
+        start = time.time()
+        resp = self.client.responses.create(**params)
+        latency_ms = (time.time() - start) * 1000.0
+        return self._finish(resp, model, latency_ms, key)
+
+    def generate_stream(self, request: LLMRequest) -> LLMStream:
+        model, params, key = self._prepare(request)
+        events = self.client.responses.create(stream=True, **params)
+        return LLMStream(
+            _iter_chunks(events),
+            close=getattr(events, "close", None),
+            provider="openai",
+            model=model,
+            on_finish=partial(self._finish_stream, key=key),
+        )
+
+
+class AsyncOpenAIClient(_OpenAIBase, AsyncStreamingLLMClient):
+    _sdk_client_name = "AsyncOpenAI"
+    _asynchronous = True
+
+    async def generate(self, request: LLMRequest) -> LLMResponse:
+        model, params, key = self._prepare(request)
+        start = time.time()
+        resp = await self.client.responses.create(**params)
+        latency_ms = (time.time() - start) * 1000.0
+        return self._finish(resp, model, latency_ms, key)
+
+    async def generate_stream(self, request: LLMRequest) -> AsyncLLMStream:
+        model, params, key = self._prepare(request)
+        events = await self.client.responses.create(stream=True, **params)
+        return AsyncLLMStream(
+            _aiter_chunks(events),
+            close=getattr(events, "close", None),
+            provider="openai",
+            model=model,
+            on_finish=partial(self._finish_stream, key=key),
+        )
+
 
 class OpenAIClientStub(OpenAIClient):
     pass
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import socket
+import ssl
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+@dataclass(frozen=True)
+class TransportConfig:
+    max_connections: int = 64
+    max_keepalive_connections: int = 32
+    keepalive_expiry_s: float = 30.0
+    http2: bool = True
+    timeout_s: float = 60.0
+    connect_timeout_s: float = 5.0
+    dns_ttl_s: float = 300.0
+
+
+DEFAULT_CONFIG = TransportConfig()
+
+_lock = threading.Lock()
+_httpx_clients: Dict[TransportConfig, Any] = {}
+# AsyncClients per event loop: one is only usable on the loop it first ran on.
+_async_httpx_clients: "weakref.WeakKeyDictionary[Any, Dict[TransportConfig, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+_transports: Dict[TransportConfig, "HTTPTransport"] = {}
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except Exception:  # pragma: no cover - h2 optional
+        return False
+    return True
+
+
+def running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def shared_httpx_client(config: Optional[TransportConfig] = None, asynchronous: bool = False) -> Any:
+    # One pooled httpx client per config for the whole process; SDK clients
+    # take it as ``http_client=`` so every provider instance shares its
+    # keep-alive connections, DNS lookups and TLS sessions. An AsyncClient is
+    # bound to the event loop that first uses it, so async clients are shared
+    # per running loop and must be requested from inside one.
+    config = config or DEFAULT_CONFIG
+    if asynchronous:
+        loop = running_loop()
+        if loop is None:
+            raise RuntimeError("shared async httpx clients need a running event loop")
+    with _lock:
+        if asynchronous:
+            clients = _async_httpx_clients.setdefault(loop, {})
+        else:
+            clients = _httpx_clients
+        client = clients.get(config)
+        if client is not None and not client.is_closed:
+            return client
+        try:
+            import httpx
+        except Exception as exc:  # pragma: no cover - optional dependency
+            raise ImportError("httpx package is required for shared_httpx_client") from exc
+        kwargs: Dict[str, Any] = {
+            "limits": httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry_s,
+            ),
+            "timeout": httpx.Timeout(config.timeout_s, connect=config.connect_timeout_s),
+            "http2": config.http2 and _h2_available(),
+        }
+        client = httpx.AsyncClient(**kwargs) if asynchronous else httpx.Client(**kwargs)
+        clients[config] = client
+        return client
+
+
+@dataclass
+class TransportStats:
+    requests: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    stale_retries: int = 0
+    tls_resumed: int = 0
+    dns_hits: int = 0
+    dns_misses: int = 0
+
+
+@dataclass
+class HTTPResponse:
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8"))
+
+
+_Origin = Tuple[str, str, int]
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class HTTPTransport:
+    # Dependency-free pooled keep-alive transport on http.client, for providers
+    # without an SDK and for environments without httpx. Idle connections are
+    # kept per origin (LIFO, so the warmest socket is reused first); DNS
+    # answers are cached for ``dns_ttl_s`` and the last TLS session per origin
+    # is offered on reconnect so the handshake can be resumed.
+    def __init__(
+        self,
+        config: Optional[TransportConfig] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+        self.config = config or DEFAULT_CONFIG
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.stats = TransportStats()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.config.max_connections)
+        self._idle: Dict[_Origin, List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._dns: Dict[Tuple[str, int], Tuple[List[Any], float]] = {}
+        self._tls_sessions: Dict[_Origin, ssl.SSLSession] = {}
+        self._closed = False
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: Optional[bytes] = None,
+        timeout: Optional[float] = None,
+    ) -> HTTPResponse:
+        if self._closed:
+            raise RuntimeError("HTTPTransport is closed")
+        parts = urlsplit(url)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url!r}")
+        origin = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        send_headers = {"Connection": "keep-alive"}
+        send_headers.update(headers or {})
+
+        with self._slots:
+            with self._lock:
+                self.stats.requests += 1
+            while True:
+                conn, reused = self._checkout(origin, timeout)
+                try:
+                    conn.request(method, path, body=body, headers=send_headers)
+                    raw = conn.getresponse()
+                    response = HTTPResponse(
+                        status=raw.status,
+                        headers={name.lower(): value for name, value in raw.getheaders()},
+                        body=raw.read(),
+                    )
+                except _STALE_ERRORS:
+                    conn.close()
+                    if not reused:
+                        raise
+                    # The server dropped an idle keep-alive socket before
+                    # answering; retry on another connection.
+                    with self._lock:
+                        self.stats.stale_retries += 1
+                    continue
+                except BaseException:
+                    conn.close()
+                    raise
+                self._checkin(origin, conn, raw.will_close)
+                return response
+
+    def json_request(
+        self,
+        method: str,
+        url: str,
+        payload: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> HTTPResponse:
+        send_headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        send_headers.update(headers or {})
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        return self.request(method, url, headers=send_headers, body=body, timeout=timeout)
+
+    def idle_connections(self) -> int:
+        with self._lock:
+            return sum(len(pool) for pool in self._idle.values())
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            pools, self._idle = self._idle, {}
+        for pool in pools.values():
+            for conn, _ in pool:
+                conn.close()
+
+    def __enter__(self) -> "HTTPTransport":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _checkout(
+        self, origin: _Origin, timeout: Optional[float]
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        with self._lock:
+            pool = self._idle.get(origin)
+            while pool:
+                conn, idle_since = pool.pop()
+                if now - idle_since <= self.config.keepalive_expiry_s and conn.sock is not None:
+                    self.stats.connections_reused += 1
+                    conn.timeout = timeout or self.config.timeout_s
+                    conn.sock.settimeout(conn.timeout)
+                    return conn, True
+                conn.close()
+        conn = self._connect(origin, timeout or self.config.timeout_s)
+        with self._lock:
+            self.stats.connections_opened += 1
+        return conn, False
+
+    def _checkin(self, origin: _Origin, conn: http.client.HTTPConnection, will_close: bool) -> None:
+        sock = conn.sock
+        if isinstance(sock, ssl.SSLSocket) and sock.session is not None:
+            with self._lock:
+                self._tls_sessions[origin] = sock.session
+        if will_close or self._closed:
+            conn.close()
+            return
+        with self._lock:
+            pool = self._idle.setdefault(origin, [])
+            if len(pool) >= self.config.max_keepalive_connections:
+                conn.close()
+                return
+            pool.append((conn, time.monotonic()))
+
+    def _resolve(self, host: str, port: int) -> List[Any]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._dns.get((host, port))
+            if cached is not None and now - cached[1] <= self.config.dns_ttl_s:
+                self.stats.dns_hits += 1
+                return cached[0]
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        with self._lock:
+            self.stats.dns_misses += 1
+            self._dns[(host, port)] = (infos, now)
+        return infos
+
+    def _open_socket(self, host: str, port: int) -> socket.socket:
+        error: Optional[OSError] = None
+        for family, socktype, proto, _, address in self._resolve(host, port):
+            sock = socket.socket(family, socktype, proto)
+            try:
+                sock.settimeout(self.config.connect_timeout_s)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.connect(address)
+                return sock
+            except OSError as exc:
+                sock.close()
+                error = exc
+        raise error or OSError(f"Could not resolve {host}:{port}")
+
+    def _connect(self, origin: _Origin, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = origin
+        sock = self._open_socket(host, port)
+        sock.settimeout(timeout)
+        if scheme == "https":
+            with self._lock:
+                session = self._tls_sessions.get(origin)
+            try:
+                sock = self.ssl_context.wrap_socket(sock, server_hostname=host, session=session)
+            except BaseException:
+                sock.close()
+                raise
+            if sock.session_reused:
+                with self._lock:
+                    self.stats.tls_resumed += 1
+            conn: http.client.HTTPConnection = http.client.HTTPSConnection(
+                host, port, timeout=timeout, context=self.ssl_context
+            )
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        # The socket is already connected; http.client only connects when
+        # ``sock`` is None.
+        conn.sock = sock
+        return conn
+
+
+def shared_transport(config: Optional[TransportConfig] = None) -> HTTPTransport:
+    config = config or DEFAULT_CONFIG
+    with _lock:
+        transport = _transports.get(config)
+        if transport is None or transport._closed:
+            transport = HTTPTransport(config)
+            _transports[config] = transport
+        return transport
+
+
+def close_shared_transports() -> None:
+    # Async httpx clients must be closed from their event loop with
+    # ``await client.aclose()``; they are only dropped here.
+    with _lock:
+        clients = list(_httpx_clients.values())
+        transports = list(_transports.values())
+        _httpx_clients.clear()
+        _async_httpx_clients.clear()
+        _transports.clear()
+    for client in clients:
+        client.close()
+    for transport in transports:
+        transport.close()
@@ -0,0 +1,473 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from core.llm.client import AsyncLLMClient, LLMClient
+from core.llm.concurrency import as_async_client
+from core.llm.types import LLMRequest, LLMResponse, LLMUsage
+from core.observability.logger import RunLogger
+
+# Lower runs first. ``request.metadata["priority"]`` takes a lane name or int.
+LANE_MOTOR = 0
+LANE_DEFAULT = 1
+LANE_BACKGROUND = 2
+LANES: Dict[str, int] = {
+    "motor": LANE_MOTOR,
+    "default": LANE_DEFAULT,
+    "background": LANE_BACKGROUND,
+}
+
+_RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+_RETRYABLE_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "InternalServerError",
+    "RateLimitError",
+    "ServiceUnavailableError",
+}
+
+
+class TransientLLMError(RuntimeError):
+    # Raised by clients without an SDK error hierarchy for errors worth retrying.
+    def __init__(
+        self, message: str, status: Optional[int] = None, retry_after_s: Optional[float] = None
+    ) -> None:
+        super().__init__(message)
+        self.status = status
+        self.retry_after_s = retry_after_s
+
+
+@dataclass
+class ErrorInfo:
+    retryable: bool
+    rate_limited: bool = False
+    status: Optional[int] = None
+    retry_after_s: Optional[float] = None
+
+
+def _retry_after(headers: Any) -> Optional[float]:
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return float(value) / 1000.0
+        value = headers.get("retry-after")
+    except AttributeError:
+        return None
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(exc: BaseException) -> ErrorInfo:
+    status = getattr(exc, "status", None) or getattr(exc, "status_code", None)
+    response = getattr(exc, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None) or getattr(response, "status", None)
+    retry_after = getattr(exc, "retry_after_s", None)
+    if retry_after is None and response is not None:
+        retry_after = _retry_after(getattr(response, "headers", None))
+    name = type(exc).__name__
+    rate_limited = status == 429 or name == "RateLimitError"
+    retryable = (
+        isinstance(exc, (TransientLLMError, TimeoutError, ConnectionError))
+        or status in _RETRYABLE_STATUS
+        or name in _RETRYABLE_NAMES
+    )
+    return ErrorInfo(
+        retryable=retryable,
+        rate_limited=rate_limited,
+        status=status if isinstance(status, int) else None,
+        retry_after_s=retry_after,
+    )
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = 5
+    base_delay_s: float = 0.5
+    max_delay_s: float = 30.0
+
+    def delay(self, attempt: int, retry_after_s: Optional[float] = None) -> float:
+        # Full jitter; a server-provided Retry-After is honoured as a floor
+        # with a little jitter on top so retries do not arrive in lockstep.
+        ceiling = min(self.max_delay_s, self.base_delay_s * (2 ** attempt))
+        if retry_after_s is not None:
+            return retry_after_s + random.uniform(0.0, 0.1 * ceiling)
+        return random.uniform(0.0, ceiling)
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, burst: Optional[float] = None) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be > 0")
+        self.per_minute = per_minute
+        self.capacity = burst if burst is not None else per_minute
+        self.scale = 1.0
+        self._level = self.capacity
+        self._stamp = time.monotonic()
+
+    @property
+    def rate_per_s(self) -> float:
+        return self.per_minute * self.scale / 60.0
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._stamp) * self.rate_per_s)
+        self._stamp = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self._level >= amount:
+            return 0.0
+        return (amount - self._level) / self.rate_per_s
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self._level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        # Reconciles an estimate with actual usage; may leave the bucket in debt.
+        self._level = min(self.capacity, self._level - delta)
+
+
+class TokenEstimator:
+    # Predicts total tokens for a request from the usage of earlier ones:
+    # prompt tokens per character and completion tokens, both as EWMAs.
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        tokens_per_char: float = 0.25,
+        completion_tokens: float = 256.0,
+    ) -> None:
+        self.alpha = alpha
+        self.tokens_per_char = tokens_per_char
+        self.completion_tokens = completion_tokens
+
+    def estimate(self, request: LLMRequest) -> float:
+        chars = sum(len(message.content) for message in request.messages)
+        completion = self.completion_tokens
+        if request.max_tokens is not None:
+            completion = min(completion, float(request.max_tokens))
+        return chars * self.tokens_per_char + completion
+
+    def observe(self, request: LLMRequest, usage: Optional[LLMUsage]) -> Optional[float]:
+        if usage is None:
+            return None
+        chars = sum(len(message.content) for message in request.messages)
+        if usage.prompt_tokens is not None and chars:
+            self.tokens_per_char += self.alpha * (usage.prompt_tokens / chars - self.tokens_per_char)
+        if usage.completion_tokens is not None:
+            self.completion_tokens += self.alpha * (usage.completion_tokens - self.completion_tokens)
+        if usage.total_tokens is not None:
+            return float(usage.total_tokens)
+        if usage.prompt_tokens is not None or usage.completion_tokens is not None:
+            return float((usage.prompt_tokens or 0) + (usage.completion_tokens or 0))
+        return None
+
+
+@dataclass
+class RateLimitStats:
+    requests: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    failures: int = 0
+    waited_s: float = 0.0
+    scale: float = 1.0
+
+
+def request_priority(request: LLMRequest, default: int = LANE_DEFAULT) -> int:
+    value = request.metadata.get("priority") if request.metadata else None
+    if value is None:
+        return default
+    if isinstance(value, str):
+        if value not in LANES:
+            raise ValueError(f"Unknown priority lane: {value!r}")
+        return LANES[value]
+    return int(value)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class RateLimiter:
+    # Admits requests against requests/min and tokens/min buckets in priority
+    # order: only the head of the queue may take from the buckets, and a
+    # higher-priority arrival wakes it so it can jump ahead. 429s shrink both
+    # rates (multiplicative decrease) and pause admission for Retry-After;
+    # successes restore them additively up to the configured quota.
+    def __init__(
+        self,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        burst_s: float = 60.0,
+        estimator: Optional[TokenEstimator] = None,
+        decrease: float = 0.7,
+        increase: float = 0.05,
+        min_scale: float = 0.1,
+    ) -> None:
+        # ``burst_s`` seconds' worth of quota may be spent at once.
+        self.requests = TokenBucket(rpm, rpm * burst_s / 60.0) if rpm else None
+        self.tokens = TokenBucket(tpm, tpm * burst_s / 60.0) if tpm else None
+        self.estimator = estimator or TokenEstimator()
+        self.decrease = decrease
+        self.increase = increase
+        self.min_scale = min_scale
+        self.stats = RateLimitStats()
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int]] = []
+        self._waiters: Dict[asyncio.Future, asyncio.AbstractEventLoop] = {}
+        self._seq = 0
+        self._paused_until = 0.0
+
+    def _buckets(self) -> List[TokenBucket]:
+        return [bucket for bucket in (self.requests, self.tokens) if bucket is not None]
+
+    def _wait_time(self, estimate: float, now: float) -> float:
+        wait = self._paused_until - now
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1.0, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(estimate, now))
+        return max(0.0, wait)
+
+    def _wake(self) -> None:
+        # Under the lock: wakes blocked threads and every parked coroutine.
+        self._cond.notify_all()
+        waiters, self._waiters = self._waiters, {}
+        for future, loop in waiters.items():
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                pass  # loop already closed
+
+    def _enqueue(self, priority: int) -> Tuple[int, int]:
+        self._seq += 1
+        ticket = (priority, self._seq)
+        heapq.heappush(self._queue, ticket)
+        self._wake()
+        return ticket
+
+    def _poll(
+        self, ticket: Tuple[int, int], estimate: float, start: float
+    ) -> Tuple[Optional[float], Optional[float]]:
+        # Under the lock: admits ``ticket`` if it heads the queue and the
+        # buckets allow, returning (waited, None); otherwise (None, timeout),
+        # where a None timeout means wait until woken.
+        now = time.monotonic()
+        if self._queue[0] != ticket:
+            return None, None
+        wait = self._wait_time(estimate, now)
+        if wait > 0.0:
+            return None, wait
+        heapq.heappop(self._queue)
+        if self.requests is not None:
+            self.requests.take(1.0, now)
+        if self.tokens is not None:
+            self.tokens.take(estimate, now)
+        self.stats.requests += 1
+        waited = now - start
+        self.stats.waited_s += waited
+        self._wake()
+        return waited, None
+
+    def acquire(self, priority: int = LANE_DEFAULT, estimate: float = 0.0) -> float:
+        start = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(priority)
+            try:
+                while True:
+                    waited, timeout = self._poll(ticket, estimate, start)
+                    if waited is not None:
+                        return waited
+                    self._cond.wait(timeout)
+            except BaseException:
+                self._withdraw(ticket)
+                raise
+
+    async def aacquire(self, priority: int = LANE_DEFAULT, estimate: float = 0.0) -> float:
+        # Same admission as ``acquire`` without tying up a thread: the
+        # coroutine parks on a future of its own loop. A cancelled waiter
+        # leaves the queue so it cannot block the lanes behind it.
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(priority)
+        future: Optional[asyncio.Future] = None
+        try:
+            while True:
+                with self._cond:
+                    waited, timeout = self._poll(ticket, estimate, start)
+                    if waited is not None:
+                        return waited
+                    future = loop.create_future()
+                    self._waiters[future] = loop
+                await asyncio.wait((future,), timeout=timeout)
+                with self._cond:
+                    self._waiters.pop(future, None)
+        except BaseException:
+            with self._cond:
+                if future is not None:
+                    self._waiters.pop(future, None)
+                self._withdraw(ticket)
+            raise
+
+    def _withdraw(self, ticket: Tuple[int, int]) -> None:
+        # Under the lock: drops an abandoned ticket so it cannot hold the head.
+        if ticket in self._queue:
+            self._queue.remove(ticket)
+            heapq.heapify(self._queue)
+            self._wake()
+
+    def record_retry(self) -> None:
+        with self._cond:
+            self.stats.retries += 1
+
+    def record_failure(self) -> None:
+        with self._cond:
+            self.stats.failures += 1
+
+    def record_usage(self, estimate: float, actual: Optional[float]) -> None:
+        with self._cond:
+            if self.tokens is not None and actual is not None:
+                self.tokens.adjust(actual - estimate)
+            for bucket in self._buckets():
+                bucket.scale = min(1.0, bucket.scale + self.increase)
+            self.stats.scale = self._scale()
+
+    def record_rate_limited(self, retry_after_s: Optional[float]) -> None:
+        with self._cond:
+            self.stats.rate_limited += 1
+            for bucket in self._buckets():
+                bucket.scale = max(self.min_scale, bucket.scale * self.decrease)
+            self.stats.scale = self._scale()
+            if retry_after_s:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after_s)
+            self._wake()
+
+    def _scale(self) -> float:
+        buckets = self._buckets()
+        return min(bucket.scale for bucket in buckets) if buckets else 1.0
+
+
+class _RateLimitedBase:
+    def __init__(
+        self,
+        limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        default_priority: int = LANE_DEFAULT,
+        logger: Optional[RunLogger] = None,
+    ) -> None:
+        self.limiter = limiter or RateLimiter()
+        self.retry = retry or RetryPolicy()
+        self.default_priority = default_priority
+        self.logger = logger
+
+    @property
+    def stats(self) -> RateLimitStats:
+        return self.limiter.stats
+
+    def _admit(self, request: LLMRequest) -> Tuple[int, float]:
+        return request_priority(request, self.default_priority), self.limiter.estimator.estimate(request)
+
+    def _succeeded(self, request: LLMRequest, estimate: float, response: LLMResponse) -> None:
+        actual = self.limiter.estimator.observe(request, response.usage)
+        self.limiter.record_usage(estimate, actual)
+
+    def _failed(self, exc: BaseException, attempt: int, priority: int) -> float:
+        # Returns the backoff delay, or re-raises when the error is final.
+        info = classify_error(exc)
+        if info.rate_limited:
+            self.limiter.record_rate_limited(info.retry_after_s)
+        if not info.retryable or attempt >= self.retry.max_retries:
+            self.limiter.record_failure()
+            raise exc
+        delay = self.retry.delay(attempt, info.retry_after_s)
+        self.limiter.record_retry()
+        if self.logger is not None:
+            self.logger.event(
+                "llm.retry",
+                {
+                    "attempt": attempt + 1,
+                    "priority": priority,
+                    "error": type(exc).__name__,
+                    "status": info.status,
+                    "retry_after_s": info.retry_after_s,
+                    "delay_s": delay,
+                    "stats": asdict(self.limiter.stats),
+                },
+            )
+        return delay
+
+
+class RateLimitedLLMClient(_RateLimitedBase, LLMClient):
+    def __init__(
+        self,
+        client: LLMClient,
+        limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        default_priority: int = LANE_DEFAULT,
+        logger: Optional[RunLogger] = None,
+    ) -> None:
+        super().__init__(limiter, retry, default_priority, logger)
+        self.client = client
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        priority, estimate = self._admit(request)
+        attempt = 0
+        while True:
+            self.limiter.acquire(priority, estimate)
+            try:
+                response = self.client.generate(request)
+            except Exception as exc:
+                time.sleep(self._failed(exc, attempt, priority))
+                attempt += 1
+                continue
+            self._succeeded(request, estimate, response)
+            return response
+
+
+class AsyncRateLimitedLLMClient(_RateLimitedBase, AsyncLLMClient):
+    # Admission, the upstream call and backoff all stay on the event loop; the
+    # limiter may be shared with threads using ``RateLimitedLLMClient``.
+    def __init__(
+        self,
+        client: Union[LLMClient, AsyncLLMClient],
+        limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        default_priority: int = LANE_DEFAULT,
+        logger: Optional[RunLogger] = None,
+    ) -> None:
+        super().__init__(limiter, retry, default_priority, logger)
+        self.client = as_async_client(client)
+
+    async def generate(self, request: LLMRequest) -> LLMResponse:
+        priority, estimate = self._admit(request)
+        attempt = 0
+        while True:
+            await self.limiter.aacquire(priority, estimate)
+            try:
+                response = await self.client.generate(request)
+            except Exception as exc:
+                await asyncio.sleep(self._failed(exc, attempt, priority))
+                attempt += 1
+                continue
+            self._succeeded(request, estimate, response)
+            return response
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Union
+
+from core.llm.client import LLMClient
+from core.llm.hashing import request_key
+from core.llm.types import LLMMessage, LLMRequest, LLMResponse, LLMUsage
+
+PathLike = Union[str, Path]
+
+
+class ReplayMissError(KeyError):
+    pass
+
+
+@dataclass
+class ReplayStats:
+    hits: int = 0
+    misses: int = 0
+    fallbacks: int = 0
+
+
+def _request_from_payload(payload: Dict[str, Any]) -> LLMRequest:
+    params = payload.get("request_params") or {}
+    return LLMRequest(
+        messages=[
+            LLMMessage(role=str(msg.get("role", "user")), content=str(msg.get("content", "")))
+            for msg in payload.get("messages") or []
+            if isinstance(msg, dict)
+        ],
+        model=payload.get("model"),
+        temperature=params.get("temperature"),
+        max_tokens=params.get("max_output_tokens"),
+    )
+
+
+def _response_from_payload(payload: Dict[str, Any]) -> LLMResponse:
+    usage = payload.get("usage")
+    return LLMResponse(
+        text=str(payload.get("text") or ""),
+        usage=LLMUsage(
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+            total_tokens=usage.get("total_tokens"),
+        )
+        if isinstance(usage, dict)
+        else None,
+        latency_ms=payload.get("latency_ms"),
+        provider=payload.get("provider"),
+        model=payload.get("model"),
+    )
+
+
+def load_llm_log(paths: Iterable[PathLike]) -> Dict[str, List[LLMResponse]]:
+    # Records written by the providers carry the request key on both sides.
+    # Older logs without one are paired in order, keying each response by the
+    # request reconstructed from the oldest unanswered llm.request record.
+    table: Dict[str, List[LLMResponse]] = {}
+    for path in paths:
+        unanswered: Deque[str] = deque()
+        with Path(path).open("r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                payload = record.get("payload")
+                if not isinstance(payload, dict):
+                    continue
+                event = record.get("event")
+                if event == "llm.request":
+                    if payload.get("key") is None:
+                        unanswered.append(request_key(_request_from_payload(payload)))
+                elif event == "llm.response":
+                    key = payload.get("key")
+                    if key is None:
+                        if not unanswered:
+                            continue
+                        key = unanswered.popleft()
+                    table.setdefault(key, []).append(_response_from_payload(payload))
+    return table
+
+
+class ReplayLLMClient(LLMClient):
+    # Answers from recorded llm.jsonl pairs matched by ``request_key``.
+    # Identical requests recorded several times are answered in recorded
+    # order, cycling once exhausted. Misses go to ``fallback`` or raise
+    # ReplayMissError. ``replay_latency`` sleeps for the recorded latency.
+    def __init__(
+        self,
+        paths: Union[PathLike, Iterable[PathLike]],
+        fallback: Optional[LLMClient] = None,
+        default_model: Optional[str] = None,
+        replay_latency: bool = False,
+        latency_scale: float = 1.0,
+    ) -> None:
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+        self.paths = [Path(path) for path in paths]
+        self.fallback = fallback
+        self.default_model = default_model
+        self.replay_latency = replay_latency
+        self.latency_scale = latency_scale
+        self.stats = ReplayStats()
+        self._lock = threading.Lock()
+        self._responses = load_llm_log(self.paths)
+        self._cursors: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return sum(len(responses) for responses in self._responses.values())
+
+    def __contains__(self, request: LLMRequest) -> bool:
+        return self._key(request) is not None
+
+    def _key(self, request: LLMRequest) -> Optional[str]:
+        # Providers key logged requests by the model they resolved; logs
+        # written before that keyed them by the model as passed in, often None.
+        candidates = [request]
+        if request.model is None:
+            if self.default_model:
+                candidates.append(replace(request, model=self.default_model))
+        else:
+            candidates.append(replace(request, model=None))
+        for candidate in candidates:
+            key = request_key(candidate)
+            if key in self._responses:
+                return key
+        return None
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        start = time.time()
+        key = self._key(request)
+        if key is None:
+            with self._lock:
+                self.stats.misses += 1
+            if self.fallback is None:
+                raise ReplayMissError(request_key(request))
+            with self._lock:
+                self.stats.fallbacks += 1
+            return self.fallback.generate(request)
+        with self._lock:
+            responses = self._responses[key]
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            self.stats.hits += 1
+        recorded = responses[cursor % len(responses)]
+        if self.replay_latency and recorded.latency_ms:
+            time.sleep(recorded.latency_ms * self.latency_scale / 1000.0)
+        return replace(recorded, latency_ms=(time.time() - start) * 1000.0)
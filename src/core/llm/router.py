@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from core.llm.client import AsyncLLMClient, LLMClient
+from core.llm.concurrency import as_async_client
+from core.llm.types import LLMRequest, LLMResponse
+from core.observability.logger import RunLogger
+
+
+class LatencyTracker:
+    # Rolling window of outcomes for one route; percentiles are over successes.
+    def __init__(self, window: int = 200) -> None:
+        self.window = window
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._sorted: Optional[List[float]] = None
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: Optional[float], ok: bool) -> None:
+        with self._lock:
+            self._outcomes.append(ok)
+            if ok and latency_ms is not None:
+                self._latencies.append(latency_ms)
+                self._sorted = None
+
+    @property
+    def samples(self) -> int:
+        return len(self._outcomes)
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return self._outcomes.count(False) / len(self._outcomes)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self._latencies:
+                return None
+            if self._sorted is None:
+                self._sorted = sorted(self._latencies)
+            values = self._sorted
+        index = min(len(values) - 1, max(0, int(round(q * (len(values) - 1)))))
+        return values[index]
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self.percentile(0.5)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.percentile(0.95)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "p50_ms": self.p50,
+            "p95_ms": self.p95,
+            "error_rate": self.error_rate,
+        }
+
+
+@dataclass
+class Route:
+    name: str
+    client: Any
+    model: Optional[str] = None
+    tracker: LatencyTracker = field(default_factory=LatencyTracker)
+
+    def prepare(self, request: LLMRequest) -> LLMRequest:
+        return replace(request, model=self.model) if self.model else request
+
+
+@dataclass
+class RouterStats:
+    requests: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    failovers: int = 0
+    per_route: Dict[str, int] = field(default_factory=dict)
+
+
+class _RouterBase:
+    # Routes are ranked by expected time to a successful answer: p50 latency
+    # divided by the success rate. Routes with fewer than ``min_samples``
+    # outcomes are tried first so every route gets measured. With ``hedge``,
+    # a second request goes to the next route once the primary has run past its
+    # own p95 (floored at ``hedge_min_ms``); the first success wins. At most
+    # ``max_hedge_ratio`` of requests are hedged so tail cutting cannot double
+    # the load.
+    def __init__(
+        self,
+        routes: Sequence[Route],
+        hedge: bool = True,
+        hedge_quantile: float = 0.95,
+        hedge_min_ms: float = 50.0,
+        max_hedge_ratio: float = 0.2,
+        min_samples: int = 5,
+        failover: bool = True,
+        logger: Optional[RunLogger] = None,
+    ) -> None:
+        if not routes:
+            raise ValueError("RoutingLLMClient needs at least one route")
+        names = [route.name for route in routes]
+        if len(set(names)) != len(names):
+            raise ValueError("Route names must be unique")
+        self.routes = list(routes)
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_ms = hedge_min_ms
+        self.max_hedge_ratio = max_hedge_ratio
+        self.min_samples = min_samples
+        self.failover = failover
+        self.logger = logger
+        self.stats = RouterStats()
+        self._lock = threading.Lock()
+        self._cursor = 0
+
+    def ranked(self) -> List[Route]:
+        with self._lock:
+            self._cursor += 1
+            cursor = self._cursor
+        cold = [route for route in self.routes if route.tracker.samples < self.min_samples]
+        if cold:
+            # Round-robin over unmeasured routes, then the rest by score.
+            start = cursor % len(cold)
+            cold = cold[start:] + cold[:start]
+        warm = [route for route in self.routes if route.tracker.samples >= self.min_samples]
+        warm.sort(key=self._score)
+        return cold + warm
+
+    def _score(self, route: Route) -> float:
+        p50 = route.tracker.p50
+        if p50 is None:
+            return float("inf")
+        return p50 / max(0.05, 1.0 - route.tracker.error_rate)
+
+    def hedge_delay_s(self, route: Route) -> Optional[float]:
+        if not self.hedge or len(self.routes) < 2:
+            return None
+        if route.tracker.samples < self.min_samples:
+            return None
+        with self._lock:
+            if self.stats.hedged >= self.max_hedge_ratio * max(1, self.stats.requests):
+                return None
+        threshold = route.tracker.percentile(self.hedge_quantile)
+        if threshold is None:
+            return None
+        return max(threshold, self.hedge_min_ms) / 1000.0
+
+    def _started(self, route: Route) -> None:
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.per_route[route.name] = self.stats.per_route.get(route.name, 0) + 1
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def _record(self, route: Route, start: float, error: Optional[BaseException]) -> None:
+        route.tracker.record((time.perf_counter() - start) * 1000.0, error is None)
+
+    def _log(self, route: Route, hedged_to: Optional[Route], winner: Route) -> None:
+        if self.logger is None:
+            return
+        self.logger.event(
+            "llm.route",
+            {
+                "primary": route.name,
+                "hedged_to": hedged_to.name if hedged_to is not None else None,
+                "winner": winner.name,
+                "routes": {r.name: r.tracker.snapshot() for r in self.routes},
+                "stats": asdict(self.stats),
+            },
+        )
+
+
+class RoutingLLMClient(_RouterBase, LLMClient):
+    def __init__(
+        self,
+        routes: Sequence[Route],
+        executor: Optional[ThreadPoolExecutor] = None,
+        max_workers: int = 64,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(routes, **kwargs)
+        # Every in-flight call, including hedges and losers still running,
+        # occupies a worker.
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="llm-route"
+        )
+        self._owns_executor = executor is None
+
+    def _call(self, route: Route, request: LLMRequest) -> LLMResponse:
+        start = time.perf_counter()
+        try:
+            response = route.client.generate(route.prepare(request))
+        except BaseException as exc:
+            self._record(route, start, exc)
+            raise
+        self._record(route, start, None)
+        return response
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        ranked = self.ranked()
+        primary = ranked[0]
+        self._started(primary)
+        delay = self.hedge_delay_s(primary)
+        if delay is None:
+            return self._without_hedge(ranked, request)
+
+        futures: Dict["Future[LLMResponse]", Route] = {
+            self._executor.submit(self._call, primary, request): primary
+        }
+        done, _ = wait(futures, timeout=delay)
+        hedged_to: Optional[Route] = None
+        if not done:
+            hedged_to = ranked[1]
+            self._count("hedged")
+            futures[self._executor.submit(self._call, hedged_to, request)] = hedged_to
+        error: Optional[BaseException] = None
+        pending = set(futures)
+        backups = ranked[2:] if hedged_to is not None else ranked[1:]
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    winner = futures[future]
+                    if winner is hedged_to:
+                        self._count("hedge_wins")
+                    self._log(primary, hedged_to, winner)
+                    return future.result()
+                error = future.exception()
+            if not pending and self.failover and backups:
+                route = backups.pop(0)
+                self._count("failovers")
+                future = self._executor.submit(self._call, route, request)
+                futures[future] = route
+                pending = {future}
+        assert error is not None
+        raise error
+
+    def _without_hedge(self, ranked: List[Route], request: LLMRequest) -> LLMResponse:
+        candidates = ranked if self.failover else ranked[:1]
+        for index, route in enumerate(candidates):
+            try:
+                response = self._call(route, request)
+            except Exception:
+                if index == len(candidates) - 1:
+                    raise
+                self._count("failovers")
+                continue
+            self._log(ranked[0], None, route)
+            return response
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+
+class AsyncRoutingLLMClient(_RouterBase, AsyncLLMClient):
+    def __init__(self, routes: Sequence[Route], **kwargs: Any) -> None:
+        routes = [replace(route, client=as_async_client(route.client)) for route in routes]
+        super().__init__(routes, **kwargs)
+
+    async def _call(self, route: Route, request: LLMRequest) -> LLMResponse:
+        start = time.perf_counter()
+        try:
+            response = await route.client.generate(route.prepare(request))
+        except asyncio.CancelledError:
+            raise
+        except BaseException as exc:
+            self._record(route, start, exc)
+            raise
+        self._record(route, start, None)
+        return response
+
+    async def generate(self, request: LLMRequest) -> LLMResponse:
+        ranked = self.ranked()
+        primary = ranked[0]
+        self._started(primary)
+        delay = self.hedge_delay_s(primary)
+        tasks: Dict["asyncio.Task[LLMResponse]", Route] = {
+            asyncio.ensure_future(self._call(primary, request)): primary
+        }
+        hedged_to: Optional[Route] = None
+        backups = ranked[1:]
+        if delay is not None:
+            done, _ = await asyncio.wait(set(tasks), timeout=delay)
+            if not done:
+                hedged_to = backups.pop(0)
+                self._count("hedged")
+                tasks[asyncio.ensure_future(self._call(hedged_to, request))] = hedged_to
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = tasks[task]
+                        if winner is hedged_to:
+                            self._count("hedge_wins")
+                        self._log(primary, hedged_to, winner)
+                        return task.result()
+                    error = task.exception()
+                if not pending and self.failover and backups:
+                    route = backups.pop(0)
+                    self._count("failovers")
+                    task = asyncio.ensure_future(self._call(route, request))
+                    tasks[task] = route
+                    pending = {task}
+        finally:
+            # The losing request is cancelled and not recorded, unlike the
+            # sync client where it runs to completion in the background.
+            for task in pending:
+                task.cancel()
+        assert error is not None
+        raise error
+
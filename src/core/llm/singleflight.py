@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+
+from core.llm.client import AsyncLLMClient, LLMClient
+from core.llm.concurrency import as_async_client
+from core.llm.hashing import request_key
+from core.llm.types import LLMRequest, LLMResponse
+
+
+@dataclass
+class SingleFlightStats:
+    upstream_calls: int = 0
+    coalesced: int = 0
+
+
+class SingleFlightGroup:
+    # In-flight calls are tracked as ``concurrent.futures.Future`` objects so the
+    # same table can be shared by thread-based and asyncio callers.
+    def __init__(self, namespace: str = "") -> None:
+        self.namespace = namespace
+        self.stats = SingleFlightStats()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, "Future[LLMResponse]"] = {}
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def join(self, request: LLMRequest) -> Tuple[str, "Future[LLMResponse]", bool]:
+        key = request_key(request, self.namespace)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats.coalesced += 1
+                return key, future, False
+            future = Future()
+            future.set_running_or_notify_cancel()
+            self._inflight[key] = future
+            self.stats.upstream_calls += 1
+            return key, future, True
+
+    def settle(
+        self,
+        key: str,
+        future: "Future[LLMResponse]",
+        response: Optional[LLMResponse] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(response)  # type: ignore[arg-type]
+
+
+class SingleFlightLLMClient(LLMClient):
+    def __init__(
+        self,
+        client: LLMClient,
+        group: Optional[SingleFlightGroup] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.client = client
+        self.group = group or SingleFlightGroup()
+        self.timeout = timeout
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        return self.group.stats
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        key, future, leader = self.group.join(request)
+        if leader:
+            try:
+                response = self.client.generate(request)
+            except BaseException as exc:
+                self.group.settle(key, future, error=exc)
+                raise
+            self.group.settle(key, future, response=response)
+            return response
+        return future.result(self.timeout)
+
+
+class AsyncSingleFlightLLMClient(AsyncLLMClient):
+    def __init__(
+        self,
+        client: Union[LLMClient, AsyncLLMClient],
+        group: Optional[SingleFlightGroup] = None,
+    ) -> None:
+        self.client = as_async_client(client)
+        self.group = group or SingleFlightGroup()
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        return self.group.stats
+
+    async def generate(self, request: LLMRequest) -> LLMResponse:
+        key, future, leader = self.group.join(request)
+        if leader:
+            # The upstream call runs as its own task so that cancelling the
+            # leading caller does not fail the other waiters.
+            task = asyncio.ensure_future(self.client.generate(request))
+            task.add_done_callback(lambda done: self._settle(key, future, done))
+        return await asyncio.wrap_future(future)
+
+    def _settle(
+        self, key: str, future: "Future[LLMResponse]", task: "asyncio.Future[LLMResponse]"
+    ) -> None:
+        if task.cancelled():
+            self.group.settle(key, future, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self.group.settle(key, future, error=task.exception())
+        else:
+            self.group.settle(key, future, response=task.result())
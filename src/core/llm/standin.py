@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+from core.llm.client import LLMClient
+from core.llm.types import LLMMessage, LLMRequest
+
+# A no-op MineDojo action, valid for the default MultiDiscrete space.
+DEFAULT_RESPONSE = '{"action": [0, 0, 0, 12, 12, 0, 0, 0]}'
+TIMEOUT = "timeout"
+
+Responder = Callable[[Dict[str, Any]], str]
+
+_ERROR_TYPES = {429: "rate_limit_error", 500: "server_error", 503: "server_error"}
+_REQUEST_FIELDS = {"model", "input", "temperature", "max_output_tokens", "stream"}
+
+
+@dataclass
+class LatencyModel:
+    # ``kind`` is constant (a), uniform (a..b) or lognormal (median a, sigma b);
+    # ``tail_prob`` of requests take ``tail_ms`` instead.
+    kind: str = "constant"
+    a: float = 0.0
+    b: float = 0.0
+    tail_prob: float = 0.0
+    tail_ms: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.tail_prob and rng.random() < self.tail_prob:
+            return self.tail_ms
+        if self.kind == "constant":
+            return self.a
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(max(self.a, 1e-6)), self.b)
+        raise ValueError(f"Unknown latency distribution: {self.kind!r}")
+
+
+def parse_latency(spec: str) -> LatencyModel:
+    # "200", "uniform:100:300", "lognormal:200:0.5", optionally "...,tail:0.02:2000".
+    parts = spec.split(",")
+    head = parts[0].split(":")
+    if len(head) == 1:
+        model = LatencyModel("constant", float(head[0]))
+    else:
+        values = [float(value) for value in head[1:]] + [0.0]
+        model = LatencyModel(head[0], values[0], values[1])
+    for extra in parts[1:]:
+        name, *values = extra.split(":")
+        if name != "tail" or len(values) != 2:
+            raise ValueError(f"Invalid latency option: {extra!r}")
+        model.tail_prob, model.tail_ms = float(values[0]), float(values[1])
+    model.sample(random.Random(0))
+    return model
+
+
+def parse_errors(spec: str) -> Dict[str, float]:
+    # "429=0.02,500=0.01,timeout=0.005"
+    errors: Dict[str, float] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        if name != TIMEOUT and not name.isdigit():
+            raise ValueError(f"Invalid error injection: {item!r}")
+        errors[name] = float(value)
+    return errors
+
+
+@dataclass
+class StandInConfig:
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    errors: Dict[str, float] = field(default_factory=dict)
+    retry_after_s: float = 1.0
+    timeout_s: float = 30.0
+    ttft_ratio: float = 0.3
+    stream_chunk_chars: int = 8
+    seed: int = 0
+
+
+@dataclass
+class StandInStats:
+    requests: int = 0
+    streamed: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+
+
+def request_from_payload(payload: Dict[str, Any]) -> LLMRequest:
+    # Inverse of OpenAIClient._prepare; unknown top-level fields become
+    # provider_params so request keys line up with the recorded ones.
+    raw_input = payload.get("input")
+    if isinstance(raw_input, str):
+        messages = [LLMMessage(role="user", content=raw_input)]
+    else:
+        messages = [
+            LLMMessage(role=str(item.get("role", "user")), content=str(item.get("content", "")))
+            for item in raw_input or []
+            if isinstance(item, dict)
+        ]
+    extra = {key: value for key, value in payload.items() if key not in _REQUEST_FIELDS}
+    return LLMRequest(
+        messages=messages,
+        model=payload.get("model"),
+        temperature=payload.get("temperature"),
+        max_tokens=payload.get("max_output_tokens"),
+        metadata={"provider_params": extra} if extra else {},
+    )
+
+
+def replay_responder(client: LLMClient, default: str = DEFAULT_RESPONSE) -> Responder:
+    # Answers with a ReplayLLMClient (or any client); ``default`` on failure.
+    def respond(payload: Dict[str, Any]) -> str:
+        try:
+            return client.generate(request_from_payload(payload)).text
+        except Exception:
+            return default
+
+    return respond
+
+
+def _input_chars(payload: Dict[str, Any]) -> int:
+    raw_input = payload.get("input")
+    if isinstance(raw_input, str):
+        return len(raw_input)
+    return sum(
+        len(str(item.get("content", ""))) for item in raw_input or [] if isinstance(item, dict)
+    )
+
+
+def _response_object(payload: Dict[str, Any], text: str, status: str = "completed") -> Dict[str, Any]:
+    input_tokens = max(1, _input_chars(payload) // 4)
+    output_tokens = max(1, len(text) // 4)
+    return {
+        "id": "resp_" + uuid.uuid4().hex,
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": status,
+        "model": payload.get("model"),
+        "output": [
+            {
+                "type": "message",
+                "id": "msg_" + uuid.uuid4().hex,
+                "status": status,
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "usage": {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_StandInHTTPServer"
+
+    def do_POST(self) -> None:
+        owner = self.server.owner
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path.rstrip("/") not in {"/v1/responses", "/responses"}:
+            self._send_error(404, f"Unknown path {self.path}", "not_found")
+            return
+        try:
+            payload = json.loads(body.decode("utf-8") or "{}")
+        except ValueError:
+            self._send_error(400, "Invalid JSON", "invalid_request_error")
+            return
+        rng = owner.rng_for(body)
+        config = owner.config
+        latency_s = config.latency.sample(rng) / 1000.0
+
+        injected = owner.pick_error(rng)
+        if injected is not None:
+            owner.count_error(injected)
+            if injected == TIMEOUT:
+                time.sleep(config.timeout_s)
+                self.close_connection = True
+                return
+            time.sleep(latency_s * 0.1)
+            status = int(injected)
+            headers = {}
+            if status in (429, 503):
+                headers["Retry-After"] = f"{config.retry_after_s:g}"
+            self._send_error(status, "Injected error", _ERROR_TYPES.get(status, "error"), headers)
+            return
+
+        text = owner.responder(payload)
+        if payload.get("stream"):
+            owner.count_stream()
+            self._stream(payload, text, latency_s)
+            return
+        time.sleep(latency_s)
+        self._send_json(200, _response_object(payload, text))
+
+    def _send_error(
+        self, status: int, message: str, error_type: str, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        self._send_json(status, {"error": {"message": message, "type": error_type}}, headers)
+
+    def _send_json(self, status: int, data: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, payload: Dict[str, Any], text: str, latency_s: float) -> None:
+        config = self.server.owner.config
+        size = max(1, config.stream_chunk_chars)
+        chunks = [text[i : i + size] for i in range(0, len(text), size)] or [""]
+        first_s = latency_s * config.ttft_ratio
+        gap_s = (latency_s - first_s) / max(1, len(chunks) - 1) if len(chunks) > 1 else 0.0
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        sequence = 0
+
+        def send(event: Dict[str, Any]) -> None:
+            nonlocal sequence
+            event["sequence_number"] = sequence
+            sequence += 1
+            data = f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+        in_progress = _response_object(payload, "", status="in_progress")
+        item_id = in_progress["output"][0]["id"]
+        try:
+            send({"type": "response.created", "response": in_progress})
+            time.sleep(first_s)
+            for index, chunk in enumerate(chunks):
+                if index:
+                    time.sleep(gap_s)
+                send(
+                    {
+                        "type": "response.output_text.delta",
+                        "item_id": item_id,
+                        "output_index": 0,
+                        "content_index": 0,
+                        "delta": chunk,
+                    }
+                )
+            send({"type": "response.completed", "response": _response_object(payload, text)})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading early (e.g. the action was committed).
+            self.close_connection = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    owner: "ResponsesStandInServer"
+
+
+class ResponsesStandInServer:
+    # Local HTTP server speaking the OpenAI Responses API shape
+    # (POST /v1/responses, JSON or SSE with ``stream``), with sampled latency
+    # and injected errors. Randomness is derived from the seed, the request
+    # body and how often that body was seen, so a rerun with the same requests
+    # sees the same latencies and errors regardless of thread interleaving.
+    # Point the OpenAI SDK at it with ``base_url=server.url``.
+    def __init__(
+        self,
+        config: Optional[StandInConfig] = None,
+        responder: Optional[Responder] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.config = config or StandInConfig()
+        self.responder: Responder = responder or (lambda payload: DEFAULT_RESPONSE)
+        self.stats = StandInStats()
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+        self._error_table: List[Any] = []
+        total = 0.0
+        for name, probability in sorted(self.config.errors.items()):
+            total += probability
+            self._error_table.append((total, name))
+        if total > 1.0:
+            raise ValueError("Error probabilities must sum to at most 1")
+        self._server = _StandInHTTPServer((host, port), _StandInHandler)
+        self._server.owner = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def rng_for(self, body: bytes) -> random.Random:
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            seen = self._seen.get(digest, 0)
+            self._seen[digest] = seen + 1
+            self.stats.requests += 1
+        return random.Random(f"{self.config.seed}:{digest}:{seen}")
+
+    def pick_error(self, rng: random.Random) -> Optional[str]:
+        if not self._error_table:
+            return None
+        draw = rng.random()
+        for threshold, name in self._error_table:
+            if draw < threshold:
+                return name
+        return None
+
+    def count_error(self, name: str) -> None:
+        with self._lock:
+            self.stats.errors[name] = self.stats.errors.get(name, 0) + 1
+
+    def count_stream(self) -> None:
+        with self._lock:
+            self.stats.streamed += 1
+
+    def start(self) -> "ResponsesStandInServer":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, name="responses-standin", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "ResponsesStandInServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    from core.llm.replay import ReplayLLMClient
+
+    # python -m core.llm.standin [port] [latency] [errors] [llm.jsonl ...]
+    args = sys.argv[1:]
+    standin_config = StandInConfig(
+        latency=parse_latency(args[1]) if len(args) > 1 else LatencyModel(),
+        errors=parse_errors(args[2]) if len(args) > 2 else {},
+    )
+    standin_responder = replay_responder(ReplayLLMClient(args[3:])) if len(args) > 3 else None
+    standin = ResponsesStandInServer(
+        standin_config, standin_responder, port=int(args[0]) if args else 8080
+    )
+    print(f"OPENAI_BASE_URL={standin.url}", flush=True)
+    try:
+        standin.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.close()
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from core.llm.client import LLMClient
+from core.llm.types import LLMRequest, LLMResponse, LLMUsage
+
+T = TypeVar("T")
+
+# Providers adapt their native events to ``(text delta, usage or None)``.
+StreamChunk = Tuple[str, Optional[LLMUsage]]
+
+
+@dataclass
+class StreamStats:
+    ttft_ms: Optional[float] = None
+    latency_ms: Optional[float] = None
+    chunks: int = 0
+    chars: int = 0
+    stopped_early: bool = False
+
+
+class _StreamState:
+    def __init__(
+        self,
+        provider: Optional[str],
+        model: Optional[str],
+        on_finish: Optional[Callable[[Any], None]],
+    ) -> None:
+        self.provider = provider
+        self.model = model
+        self.on_finish = on_finish
+        self.stats = StreamStats()
+        self.usage: Optional[LLMUsage] = None
+        self.finished = False
+        self._parts: List[str] = []
+        self._start = time.perf_counter()
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def _elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000.0
+
+    def _accept(self, chunk: StreamChunk) -> str:
+        delta, usage = chunk
+        if usage is not None:
+            self.usage = usage
+        if delta:
+            if self.stats.ttft_ms is None:
+                self.stats.ttft_ms = self._elapsed_ms()
+            self.stats.chunks += 1
+            self.stats.chars += len(delta)
+            self._parts.append(delta)
+        return delta
+
+    def _finish(self, stopped_early: bool) -> None:
+        if self.finished:
+            return
+        self.finished = True
+        self.stats.stopped_early = stopped_early
+        self.stats.latency_ms = self._elapsed_ms()
+        if self.on_finish is not None:
+            self.on_finish(self)
+
+    def response(self, raw: Any = None) -> LLMResponse:
+        return LLMResponse(
+            text=self.text,
+            raw=raw,
+            usage=self.usage,
+            latency_ms=self.stats.latency_ms if self.finished else self._elapsed_ms(),
+            provider=self.provider,
+            model=self.model,
+        )
+
+
+class LLMStream(_StreamState):
+    # Iterates text deltas. ``close()`` stops reading (and closes the
+    # underlying connection) once the caller has what it needs.
+    def __init__(
+        self,
+        chunks: Iterator[StreamChunk],
+        close: Optional[Callable[[], None]] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        on_finish: Optional[Callable[["LLMStream"], None]] = None,
+    ) -> None:
+        super().__init__(provider, model, on_finish)
+        self._chunks = chunks
+        self._close = close
+
+    def __iter__(self) -> "LLMStream":
+        return self
+
+    def __next__(self) -> str:
+        while not self.finished:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self._finish(stopped_early=False)
+                break
+            delta = self._accept(chunk)
+            if delta:
+                return delta
+        raise StopIteration
+
+    def close(self) -> None:
+        if self.finished:
+            return
+        if self._close is not None:
+            self._close()
+        self._finish(stopped_early=True)
+
+    def __enter__(self) -> "LLMStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class AsyncLLMStream(_StreamState):
+    def __init__(
+        self,
+        chunks: AsyncIterator[StreamChunk],
+        close: Optional[Callable[[], Awaitable[None]]] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        on_finish: Optional[Callable[["AsyncLLMStream"], None]] = None,
+    ) -> None:
+        super().__init__(provider, model, on_finish)
+        self._chunks = chunks
+        self._close = close
+
+    def __aiter__(self) -> "AsyncLLMStream":
+        return self
+
+    async def __anext__(self) -> str:
+        while not self.finished:
+            try:
+                chunk = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                self._finish(stopped_early=False)
+                break
+            delta = self._accept(chunk)
+            if delta:
+                return delta
+        raise StopAsyncIteration
+
+    async def aclose(self) -> None:
+        if self.finished:
+            return
+        if self._close is not None:
+            await self._close()
+        self._finish(stopped_early=True)
+
+    async def __aenter__(self) -> "AsyncLLMStream":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+
+def open_stream(client: LLMClient, request: LLMRequest) -> LLMStream:
+    # Clients without ``generate_stream`` produce a single-delta stream.
+    generate_stream = getattr(client, "generate_stream", None)
+    if generate_stream is not None:
+        return generate_stream(request)
+    response = client.generate(request)
+    return LLMStream(
+        iter([(response.text, response.usage)]),
+        provider=response.provider,
+        model=response.model,
+    )
+
+
+def read_until(llm_stream: LLMStream, consume: Callable[[str], Optional[T]]) -> Optional[T]:
+    # Feeds deltas to ``consume`` and stops reading at its first non-None result.
+    try:
+        for delta in llm_stream:
+            result = consume(delta)
+            if result is not None:
+                return result
+        return None
+    finally:
+        llm_stream.close()
+
+
+async def aread_until(
+    llm_stream: AsyncLLMStream, consume: Callable[[str], Optional[T]]
+) -> Optional[T]:
+    try:
+        async for delta in llm_stream:
+            result = consume(delta)
+            if result is not None:
+                return result
+        return None
+    finally:
+        await llm_stream.aclose()
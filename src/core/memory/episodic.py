@@ -1,14 +1,407 @@
 from __future__ import annotations
 
-from typing import Any
+import math
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from core.memory.storage import InMemoryBackend, MemoryBackend, restore
+from core.models.memory_records import EpisodicMemoryRecord
+
+Labels = Union[str, Sequence[str], None]
+
+_NO_LABEL = -1
+
+
+@dataclass
+class EpisodeQuery:
+    embedding: Any
+    k: int = 5
+    task_id: Labels = None
+    biome: Labels = None
+    since: Optional[float] = None
+    until: Optional[float] = None
+    nprobe: Optional[int] = None
+
+
+@dataclass
+class EpisodeMatch:
+    episode_id: int
+    score: float
+    record: EpisodicMemoryRecord
+
+
+@dataclass
+class EpisodicStats:
+    stored: int = 0
+    queries: int = 0
+    probed: int = 0
+    exact_scans: int = 0
+    trained: bool = False
+
+
+def record_time(record: EpisodicMemoryRecord) -> float:
+    if record.time is not None:
+        return float(record.time)
+    if record.timestamp:
+        # fromisoformat only accepts a trailing "Z" from Python 3.11 on, and
+        # naive timestamps are taken as UTC rather than the host's local time.
+        text = record.timestamp
+        if text.endswith(("Z", "z")):
+            text = text[:-1] + "+00:00"
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            return math.nan
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return math.nan
+
+
+def _grow(array: np.ndarray, needed: int) -> np.ndarray:
+    if needed <= len(array):
+        return array
+    grown = np.empty((max(needed, 2 * len(array)),) + array.shape[1:], dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return vectors / norms
 
 
 class EpisodicMemory:
-    def __init__(self) -> None:
-        pass
+    # Episodes live in row-aligned columns: a growable float32 matrix of unit
+    # embeddings (so scores are cosine similarities) and dictionary-encoded
+    # task/biome codes plus a float time column for filters. Until
+    # ``train_size`` episodes have arrived, queries scan every row. Then an IVF
+    # index is trained once (spherical k-means over ``nlist`` centroids) and
+    # each later episode is appended to the inverted list of its nearest
+    # centroid, so inserts stay O(nlist * dim). A query scores the centroids,
+    # gathers the ``nprobe`` closest lists, masks them by metadata and ranks
+    # what is left. Filtered queries widen ``nprobe`` by the filter's estimated
+    # selectivity and switch to an exact scan of the matching rows when the
+    # filter is selective enough that probing would approach a full scan.
+    # Records, embeddings included, are appended to ``backend``; a persistent
+    # backend is replayed into the index on first use after a restart.
+    def __init__(
+        self,
+        dim: Optional[int] = None,
+        nlist: int = 1024,
+        nprobe: int = 8,
+        train_size: Optional[int] = None,
+        train_iters: int = 8,
+        capacity: int = 1024,
+        embedder: Optional[Callable[[EpisodicMemoryRecord], Any]] = None,
+        seed: int = 0,
+        backend: Optional[MemoryBackend] = None,
+        namespace: str = "episodic",
+    ) -> None:
+        if nlist < 1 or nprobe < 1:
+            raise ValueError("nlist and nprobe must be >= 1")
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size if train_size is not None else 32 * nlist
+        if self.train_size < nlist:
+            raise ValueError("train_size must be >= nlist")
+        self.train_iters = train_iters
+        self.embedder = embedder
+        self.backend = backend if backend is not None else InMemoryBackend()
+        self.namespace = namespace
+        self.stats = EpisodicStats()
+        self._capacity = max(1, capacity)
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.RLock()
+        self._records: List[EpisodicMemoryRecord] = []
+        self._vectors: Optional[np.ndarray] = None
+        self._tasks = np.empty(self._capacity, dtype=np.int32)
+        self._biomes = np.empty(self._capacity, dtype=np.int32)
+        self._times = np.empty(self._capacity, dtype=np.float64)
+        self._task_codes: Dict[str, int] = {}
+        self._biome_codes: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._list_sizes = np.zeros(0, dtype=np.int64)
+        self._loaded = False
+
+    def __len__(self) -> int:
+        self._load()
+        return len(self._records)
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def get(self, episode_id: int) -> EpisodicMemoryRecord:
+        self._load()
+        return self._records[episode_id]
+
+    def embedding(self, episode_id: int) -> np.ndarray:
+        self._load()
+        if self._vectors is None or not 0 <= episode_id < len(self._records):
+            raise IndexError("episode id out of range")
+        return self._vectors[episode_id]
+
+    def store(self, episode: EpisodicMemoryRecord) -> int:
+        return self.extend([episode])[0]
+
+    def extend(
+        self, episodes: Iterable[EpisodicMemoryRecord], embeddings: Optional[Any] = None
+    ) -> List[int]:
+        records = list(episodes)
+        if not records:
+            return []
+        if embeddings is None:
+            embeddings = [self._embed(record) for record in records]
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(records):
+            raise ValueError("expected one embedding per episode")
+        self._load()
+        with self._lock:
+            ids = self._index(records, vectors)
+            for record, vector in zip(records, vectors):
+                # Persist the embedding even when the embedder computed it.
+                if record.embedding is None:
+                    record = replace(record, embedding=vector)
+                self.backend.append(self.namespace, record)
+            return ids
+
+    def train(self) -> None:
+        # Spherical k-means on a sample of what is stored, then every stored
+        # row is assigned. Later rows are assigned as they arrive; calling this
+        # again rebuilds the index, e.g. after the episode distribution drifts.
+        self._load()
+        with self._lock:
+            size = len(self._records)
+            if self._vectors is None or size < self.nlist:
+                raise ValueError("need at least nlist episodes to train the index")
+            vectors = self._vectors[:size]
+            sample_size = min(size, 16 * self.nlist)
+            sample = vectors[self._rng.choice(size, sample_size, replace=False)]
+            centroids = sample[self._rng.choice(sample_size, self.nlist, replace=False)].copy()
+            for _ in range(self.train_iters):
+                nearest = self._nearest(sample, centroids)
+                order = np.argsort(nearest, kind="stable")
+                lists, first = np.unique(nearest[order], return_index=True)
+                sums = sample[self._rng.choice(sample_size, self.nlist)]
+                # Dead centroids are reseeded on random samples.
+                sums[lists] = np.add.reduceat(sample[order], first, axis=0)
+                centroids = _normalize(sums)
+            self._centroids = centroids.astype(np.float32)
+            self._lists = [np.empty(0, dtype=np.int64) for _ in range(self.nlist)]
+            self._list_sizes = np.zeros(self.nlist, dtype=np.int64)
+            self.stats.trained = True
+            self._assign(0, size)
+
+    def query(self, query: Union[EpisodeQuery, Any]) -> List[EpisodeMatch]:
+        if not isinstance(query, EpisodeQuery):
+            query = EpisodeQuery(embedding=query)
+        if query.k < 1:
+            return []
+        vector = _normalize(np.asarray(query.embedding, dtype=np.float32).reshape(-1))
+        self._load()
+        with self._lock:
+            size = len(self._records)
+            if self._vectors is None or not size:
+                return []
+            if vector.shape[0] != self.dim:
+                raise ValueError(f"embedding dim {vector.shape[0]} != {self.dim}")
+            self.stats.queries += 1
+            tasks = self._codes(self._task_codes, query.task_id)
+            biomes = self._codes(self._biome_codes, query.biome)
+            if (tasks is not None and not tasks) or (biomes is not None and not biomes):
+                return []
+            filtered = any(
+                value is not None for value in (tasks, biomes, query.since, query.until)
+            )
+            ids = self._candidates(vector, size, filtered, tasks, biomes, query)
+            if ids is None:
+                scores = self._vectors[:size] @ vector
+            else:
+                scores = np.take(self._vectors, ids, axis=0) @ vector
+            if not len(scores):
+                return []
+            k = min(query.k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            rows = top if ids is None else ids[top]
+            return [
+                EpisodeMatch(int(row), float(scores[index]), self._records[row])
+                for index, row in zip(top, rows)
+            ]
+
+    def similar(self, embedding: Any, k: int = 5, **filters: Any) -> List[EpisodeMatch]:
+        return self.query(EpisodeQuery(embedding=embedding, k=k, **filters))
+
+    def _candidates(
+        self,
+        vector: np.ndarray,
+        size: int,
+        filtered: bool,
+        tasks: Optional[List[int]],
+        biomes: Optional[List[int]],
+        query: EpisodeQuery,
+    ) -> Optional[np.ndarray]:
+        # Row ids to score, or None for every row.
+        nprobe = self.nlist
+        if self._centroids is not None:
+            nprobe = min(self.nlist, query.nprobe or self.nprobe)
+            if filtered:
+                # Probe enough lists that about as many rows survive the
+                # filter as an unfiltered query would score; when that
+                # approaches a full scan, filter every row instead.
+                selectivity = self._selectivity(size, tasks, biomes, query)
+                wanted = nprobe / selectivity if selectivity else math.inf
+                nprobe = self.nlist if wanted * 4 >= self.nlist else int(math.ceil(wanted))
+        if nprobe < self.nlist:
+            ids = self._filter(self._probe(vector, nprobe), tasks, biomes, query)
+            if not filtered or len(ids) >= query.k:
+                return ids
+        if not filtered:
+            return None
+        self.stats.exact_scans += 1
+        return self._filter(slice(0, size), tasks, biomes, query)
+
+    def _index(self, records: List[EpisodicMemoryRecord], vectors: np.ndarray) -> List[int]:
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"embedding dim {vectors.shape[1]} != {self.dim}")
+        start = len(self._records)
+        end = start + len(records)
+        if self._vectors is None:
+            self._vectors = np.empty((max(self._capacity, end), self.dim), dtype=np.float32)
+        self._vectors = _grow(self._vectors, end)
+        self._tasks = _grow(self._tasks, end)
+        self._biomes = _grow(self._biomes, end)
+        self._times = _grow(self._times, end)
+        self._vectors[start:end] = _normalize(vectors)
+        for offset, record in enumerate(records):
+            row = start + offset
+            self._tasks[row] = self._encode(self._task_codes, record.task_id)
+            self._biomes[row] = self._encode(self._biome_codes, record.biome)
+            self._times[row] = record_time(record)
+        self._records.extend(records)
+        self.stats.stored += len(records)
+        if self._centroids is not None:
+            self._assign(start, end)
+        elif end >= self.train_size:
+            self.train()
+        return list(range(start, end))
+
+    def _load(self) -> None:
+        # Episodes persisted by an earlier process are indexed on first use,
+        # not when the memory is constructed.
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            batch: List[EpisodicMemoryRecord] = []
+            for _, value in self.backend.scan(self.namespace):
+                batch.append(restore(EpisodicMemoryRecord, value))
+                if len(batch) >= 65536:
+                    self._index(batch, self._batch_vectors(batch))
+                    batch = []
+            if batch:
+                self._index(batch, self._batch_vectors(batch))
+
+    def _batch_vectors(self, records: List[EpisodicMemoryRecord]) -> np.ndarray:
+        return np.asarray([record.embedding for record in records], dtype=np.float32)
+
+    def _embed(self, record: EpisodicMemoryRecord) -> Any:
+        if record.embedding is not None:
+            return record.embedding
+        if self.embedder is None:
+            raise ValueError("episode has no embedding and no embedder is configured")
+        return self.embedder(record)
+
+    def _encode(self, codes: Dict[str, int], label: Optional[str]) -> int:
+        if label is None:
+            return _NO_LABEL
+        return codes.setdefault(label, len(codes))
+
+    def _codes(self, codes: Dict[str, int], labels: Labels) -> Optional[List[int]]:
+        if labels is None:
+            return None
+        if isinstance(labels, str):
+            labels = [labels]
+        return [codes[label] for label in labels if label in codes]
+
+    def _filter(
+        self,
+        ids: Union[np.ndarray, slice],
+        tasks: Optional[List[int]],
+        biomes: Optional[List[int]],
+        query: EpisodeQuery,
+    ) -> np.ndarray:
+        mask: Optional[np.ndarray] = None
+        for column, codes in ((self._tasks, tasks), (self._biomes, biomes)):
+            if codes is None:
+                continue
+            values = column[ids] if isinstance(ids, slice) else np.take(column, ids)
+            keep = values == codes[0] if len(codes) == 1 else np.isin(values, codes)
+            mask = keep if mask is None else mask & keep
+        if query.since is not None or query.until is not None:
+            times = self._times[ids] if isinstance(ids, slice) else np.take(self._times, ids)
+            # NaN compares false, so undated episodes never match a range.
+            if query.since is not None:
+                keep = times >= query.since
+                mask = keep if mask is None else mask & keep
+            if query.until is not None:
+                keep = times <= query.until
+                mask = keep if mask is None else mask & keep
+        if isinstance(ids, slice):
+            # A leading slice filters column views without a gather.
+            rows = np.arange(ids.stop)
+            return rows if mask is None else np.flatnonzero(mask)
+        return ids if mask is None else ids[mask]
+
+    def _selectivity(
+        self,
+        size: int,
+        tasks: Optional[List[int]],
+        biomes: Optional[List[int]],
+        query: EpisodeQuery,
+    ) -> float:
+        # Fraction of an evenly strided sample of rows that passes the filter.
+        step = max(1, size // 1024)
+        sample = np.arange(0, size, step)
+        return len(self._filter(sample, tasks, biomes, query)) / len(sample)
+
+    def _probe(self, vector: np.ndarray, nprobe: int) -> np.ndarray:
+        assert self._centroids is not None
+        scores = self._centroids @ vector
+        probed = np.argpartition(-scores, nprobe - 1)[:nprobe]
+        ids = np.concatenate([self._lists[index][: self._list_sizes[index]] for index in probed])
+        self.stats.probed += len(ids)
+        return ids
 
-    def store(self, episode: Any) -> None:
-        raise NotImplementedError("Episodic memory storage not implemented.")
+    def _nearest(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        # Chunked so a large batch never materializes a full score matrix.
+        nearest = np.empty(len(vectors), dtype=np.int64)
+        chunk = max(1, (1 << 22) // len(centroids))
+        for start in range(0, len(vectors), chunk):
+            block = vectors[start : start + chunk] @ centroids.T
+            nearest[start : start + chunk] = np.argmax(block, axis=1)
+        return nearest
 
-    def query(self, query: Any) -> Any:
-        raise NotImplementedError("Episodic memory query not implemented.")
+    def _assign(self, start: int, end: int) -> None:
+        assert self._vectors is not None and self._centroids is not None
+        nearest = self._nearest(self._vectors[start:end], self._centroids)
+        order = np.argsort(nearest, kind="stable")
+        lists, first, counts = np.unique(nearest[order], return_index=True, return_counts=True)
+        rows = order + start
+        for index, offset, count in zip(lists.tolist(), first.tolist(), counts.tolist()):
+            used = int(self._list_sizes[index])
+            self._lists[index] = _grow(self._lists[index], used + count)
+            self._lists[index][used : used + count] = rows[offset : offset + count]
+            self._list_sizes[index] = used + count
@@ -8,7 +8,16 @@ from core.memory.prediction_error import PredictionErrorHistory
 from core.memory.procedural import ProceduralMemory
 from core.memory.semantic import SemanticMemory
 from core.memory.self_state import SelfStateMemory
+from core.memory.storage import MemoryBackend
 from core.memory.working_memory import WorkingMemoryBuffer
+from core.models.memory_records import (
+    EpisodicMemoryRecord,
+    PolicyTraceRecord,
+    PredictionErrorRecord,
+    ProceduralSkill,
+    SelfStateSnapshot,
+    SemanticMemoryEntry,
+)
 from core.observability.logger import RunLogger
 
 
@@ -23,17 +32,26 @@ class MemoryManager:
         semantic: Optional[SemanticMemory] = None,
         procedural: Optional[ProceduralMemory] = None,
         logger: Optional[RunLogger] = None,
+        backend: Optional[MemoryBackend] = None,
     ) -> None:
-        self.working_memory = working_memory or WorkingMemoryBuffer()
-        self.self_state = self_state or SelfStateMemory()
-        self.prediction_errors = prediction_errors or PredictionErrorHistory()
-        self.policy_traces = policy_traces or PolicyTraces()
-        self.episodic = episodic or EpisodicMemory()
-        self.semantic = semantic or SemanticMemory()
-        self.procedural = procedural or ProceduralMemory()
+        # Subsystems not passed in are built on ``backend`` (in-process when
+        # None), each in its own namespace. Explicit None checks: an empty
+        # buffer or store has len() == 0.
+        self.backend = backend
+        self.working_memory = (
+            working_memory if working_memory is not None else WorkingMemoryBuffer()
+        )
+        self.self_state = self_state if self_state is not None else SelfStateMemory(backend)
+        self.prediction_errors = (
+            prediction_errors if prediction_errors is not None else PredictionErrorHistory(backend)
+        )
+        self.policy_traces = policy_traces if policy_traces is not None else PolicyTraces(backend)
+        self.episodic = episodic if episodic is not None else EpisodicMemory(backend=backend)
+        self.semantic = semantic if semantic is not None else SemanticMemory(backend)
+        self.procedural = procedural if procedural is not None else ProceduralMemory(backend)
         self.logger = logger
 
-    def snapshot_self_state(self, snapshot: Any) -> None:
+    def snapshot_self_state(self, snapshot: SelfStateSnapshot) -> int:
         if self.logger is not None:
             self.logger.memory_event(
                 {
@@ -42,9 +60,9 @@ class MemoryManager:
                     "record": snapshot,
                 }
             )
-        raise NotImplementedError("Self-state snapshotting not implemented.")
+        return self.self_state.record(snapshot)
 
-    def record_prediction_error(self, error: Any) -> None:
+    def record_prediction_error(self, error: PredictionErrorRecord) -> int:
         if self.logger is not None:
             self.logger.memory_event(
                 {
@@ -53,9 +71,9 @@ class MemoryManager:
                     "record": error,
                 }
             )
-        raise NotImplementedError("Prediction error recording not implemented.")
+        return self.prediction_errors.record(error)
 
-    def record_policy_trace(self, trace: Any) -> None:
+    def record_policy_trace(self, trace: PolicyTraceRecord) -> int:
         if self.logger is not None:
             self.logger.memory_event(
                 {
@@ -64,9 +82,9 @@ class MemoryManager:
                     "record": trace,
                 }
             )
-        raise NotImplementedError("Policy trace recording not implemented.")
+        return self.policy_traces.record(trace)
 
-    def store_episode(self, episode: Any) -> None:
+    def store_episode(self, episode: EpisodicMemoryRecord) -> int:
         if self.logger is not None:
             self.logger.memory_event(
                 {
@@ -75,9 +93,9 @@ class MemoryManager:
                     "record": episode,
                 }
             )
-        raise NotImplementedError("Episodic memory storage not implemented.")
+        return self.episodic.store(episode)
 
-    def store_semantic(self, entry: Any) -> None:
+    def store_semantic(self, entry: SemanticMemoryEntry) -> int:
         if self.logger is not None:
             self.logger.memory_event(
                 {
@@ -86,9 +104,9 @@ class MemoryManager:
                     "record": entry,
                 }
             )
-        raise NotImplementedError("Semantic memory storage not implemented.")
+        return self.semantic.store(entry)
 
-    def store_procedural(self, skill: Any) -> None:
+    def store_procedural(self, skill: ProceduralSkill) -> int:
         if self.logger is not None:
             self.logger.memory_event(
                 {
@@ -97,7 +115,7 @@ class MemoryManager:
                     "record": skill,
                 }
             )
-        raise NotImplementedError("Procedural memory storage not implemented.")
+        return self.procedural.store(skill)
 
     def query(self, query: Any) -> Any:
         if self.logger is not None:
@@ -109,3 +127,11 @@ class MemoryManager:
                 }
             )
         raise NotImplementedError("Memory queries not implemented.")
+
+    def flush(self) -> None:
+        if self.backend is not None:
+            self.backend.flush()
+
+    def close(self) -> None:
+        if self.backend is not None:
+            self.backend.close()
@@ -1,14 +1,27 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import List, Optional
+
+from core.memory.storage import InMemoryBackend, MemoryBackend, restore
+from core.models.memory_records import PolicyTraceRecord
 
 
 class PolicyTraces:
-    def __init__(self) -> None:
-        pass
+    def __init__(
+        self, backend: Optional[MemoryBackend] = None, namespace: str = "policy_traces"
+    ) -> None:
+        self.backend = backend if backend is not None else InMemoryBackend()
+        self.namespace = namespace
+
+    def __len__(self) -> int:
+        return self.backend.count(self.namespace)
 
-    def record(self, trace: Any) -> None:
-        raise NotImplementedError("Policy trace recording not implemented.")
+    def record(self, trace: PolicyTraceRecord) -> int:
+        return self.backend.append(self.namespace, trace)
 
-    def query(self, query: Any) -> Any:
-        raise NotImplementedError("Policy trace query not implemented.")
+    def query(self, last: Optional[int] = None) -> List[PolicyTraceRecord]:
+        if last is None:
+            rows = list(self.backend.scan(self.namespace))
+        else:
+            rows = self.backend.tail(self.namespace, last)
+        return [restore(PolicyTraceRecord, value) for _, value in rows]
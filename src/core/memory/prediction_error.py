@@ -1,14 +1,491 @@
 from __future__ import annotations
 
-from typing import Any
+import bisect
+import math
+import random
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.memory.storage import InMemoryBackend, MemoryBackend, restore
+from core.models.memory_records import PredictionErrorRecord
+
+DEFAULT_SOURCE = "default"
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99)
+
+
+@dataclass
+class SurpriseSummary:
+    source: str
+    count: int
+    mean: float
+    std: float
+    ewma: float
+    ewm_std: float
+    last: float
+    # Percentile rank (0..1) of ``last`` among every magnitude seen.
+    percentile: float
+    quantiles: Dict[float, float]
+
+
+def error_magnitude(error: Any) -> Optional[float]:
+    # ``magnitude`` when set, else the distance between observed and
+    # expected; None when neither gives a finite number.
+    if error is None:
+        return None
+    if isinstance(error, (int, float)) and not isinstance(error, bool):
+        value: Any = abs(error)
+    else:
+        if isinstance(error, dict):
+            value = error.get("magnitude")
+            expected, observed = error.get("expected"), error.get("observed")
+        else:
+            value = getattr(error, "magnitude", None)
+            expected = getattr(error, "expected", None)
+            observed = getattr(error, "observed", None)
+        if value is None:
+            if expected is None or observed is None:
+                return None
+            try:
+                delta = np.asarray(observed, dtype=np.float64) - np.asarray(
+                    expected, dtype=np.float64
+                )
+            except (TypeError, ValueError):
+                return None
+            value = np.linalg.norm(delta) if delta.ndim else abs(delta)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+class TDigest:
+    # Merging t-digest: values are buffered and merged into weighted
+    # centroids ``buffer_size`` at a time under the k1 scale function, so at
+    # most about ``compression`` centroids are kept and the tails stay near
+    # exact. The merge is vectorized: centroids whose left cumulative quantile
+    # falls in the same unit of k are combined with one reduceat.
+    def __init__(self, compression: float = 200.0, buffer_size: int = 256) -> None:
+        if compression < 10 or buffer_size < 1:
+            raise ValueError("compression must be >= 10 and buffer_size >= 1")
+        self.compression = float(compression)
+        self.buffer_size = buffer_size
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._means = np.empty(0, dtype=np.float64)
+        self._weights = np.empty(0, dtype=np.float64)
+        self._buffer = np.empty(buffer_size, dtype=np.float64)
+        self._buffered = 0
+        self._cached: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._distinct: Optional[Tuple[List[float], List[float], List[float]]] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def centroids(self) -> int:
+        return len(self._means)
+
+    def add(self, value: float) -> None:
+        self._buffer[self._buffered] = value
+        self._buffered += 1
+        self.count += 1
+        if value < self.min:
+            self.min = value
+            self._cached = None
+        if value > self.max:
+            self.max = value
+            self._cached = None
+        if self._buffered >= self.buffer_size:
+            self._merge()
+
+    def cdf(self, value: float) -> float:
+        # Fraction of values below ``value``, counting ties as half. Buffered
+        # values are counted exactly, so this never forces a merge.
+        if not self.count:
+            return math.nan
+        if value < self.min:
+            return 0.0
+        if value > self.max:
+            return 1.0
+        below = 0.0
+        if len(self._means):
+            below = self._rank(value)
+        if self._buffered:
+            buffered = self._buffer[: self._buffered]
+            below += np.count_nonzero(buffered < value) + 0.5 * np.count_nonzero(buffered == value)
+        return min(1.0, max(0.0, below / self.count))
+
+    def quantile(self, q: float) -> float:
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("q must be in [0, 1]")
+        if not self.count:
+            return math.nan
+        if self._buffered:
+            self._merge()
+        grid, ranks = self._grid()
+        return float(np.interp(q * self.count, ranks, grid))
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "compression": self.compression,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "means": self._means.copy(),
+            "weights": self._weights.copy(),
+            "buffer": self._buffer[: self._buffered].copy(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], buffer_size: int = 256) -> "TDigest":
+        digest = cls(state["compression"], buffer_size)
+        digest.count = int(state["count"])
+        digest.min = float(state["min"])
+        digest.max = float(state["max"])
+        digest._means = np.asarray(state["means"], dtype=np.float64)
+        digest._weights = np.asarray(state["weights"], dtype=np.float64)
+        buffered = np.asarray(state["buffer"], dtype=np.float64)
+        if len(buffered) > len(digest._buffer):
+            digest._buffer = buffered.copy()
+        digest._buffer[: len(buffered)] = buffered
+        digest._buffered = len(buffered)
+        if digest._buffered >= buffer_size:
+            digest._merge()
+        return digest
+
+    def _grid(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Piecewise-linear CDF: each centroid holds half its weight on either
+        # side of its mean, with the observed min and max as the end points.
+        if self._cached is None:
+            ranks = np.cumsum(self._weights) - self._weights / 2.0
+            grid = np.concatenate(([self.min], self._means, [self.max]))
+            merged = float(self._weights.sum())
+            self._cached = grid, np.concatenate(([0.0], ranks, [merged]))
+        return self._cached
+
+    def _rank(self, value: float) -> float:
+        # Merged weight below ``value`` plus half of any centroids whose mean
+        # equals it. Between distinct means each one's rank sits at the
+        # middle of its weight, interpolated linearly, so heavily tied values
+        # (many centroids at one mean) keep their true mid-rank.
+        if self._distinct is None:
+            starts = np.flatnonzero(np.r_[True, self._means[1:] != self._means[:-1]])
+            weights = np.add.reduceat(self._weights, starts)
+            mids = np.cumsum(weights) - weights / 2.0
+            self._distinct = self._means[starts].tolist(), mids.tolist(), weights.tolist()
+        means, mids, weights = self._distinct
+        index = bisect.bisect_left(means, value)
+        if index < len(means) and means[index] == value:
+            return mids[index]
+        if index == 0:
+            x0, r0 = self.min, 0.0
+        else:
+            x0, r0 = means[index - 1], mids[index - 1]
+        if index == len(means):
+            x1, r1 = self.max, mids[-1] + weights[-1] / 2.0
+        else:
+            x1, r1 = means[index], mids[index]
+        if x1 <= x0:
+            return r1
+        return r0 + (r1 - r0) * (value - x0) / (x1 - x0)
+
+    def _merge(self) -> None:
+        incoming = self._buffer[: self._buffered]
+        self._buffered = 0
+        self._cached = None
+        self._distinct = None
+        means = np.concatenate((self._means, incoming))
+        weights = np.concatenate((self._weights, np.ones(len(incoming))))
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        left = (cumulative - weights) / cumulative[-1]
+        scale = self.compression / (2.0 * math.pi)
+        units = np.floor(scale * np.arcsin(2.0 * left - 1.0))
+        breaks = np.r_[True, units[1:] != units[:-1]]
+        ties = means[1:] == means[:-1]
+        if not ties.any():
+            starts = np.flatnonzero(breaks)
+            merged = np.add.reduceat(weights, starts)
+            self._means = np.add.reduceat(means * weights, starts) / merged
+            self._weights = merged
+            return
+        # A value repeated often enough to hold 1/compression of the weight
+        # is never merged with its neighbours, so its ties stay exact in cdf.
+        runs = np.flatnonzero(np.r_[True, ~ties])
+        run_weights = np.add.reduceat(weights, runs)
+        lengths = np.diff(np.r_[runs, len(means)])
+        heavy = (lengths > 1) & (run_weights * self.compression >= cumulative[-1])
+        breaks[runs[1:][heavy[1:] | heavy[:-1]]] = True
+        starts = np.flatnonzero(breaks)
+        merged = np.add.reduceat(weights, starts)
+        lows = means[starts]
+        highs = means[np.r_[starts[1:], len(means)] - 1]
+        # Groups of one repeated value keep it exactly rather than re-averaged.
+        self._means = np.where(
+            lows == highs, lows, np.add.reduceat(means * weights, starts) / merged
+        )
+        self._weights = merged
+
+
+class ErrorStatistics:
+    # O(1)-memory statistics of one source's error magnitudes: Welford mean
+    # and variance, an exponentially weighted mean and variance (``alpha``),
+    # a t-digest for percentiles, and a uniform reservoir sample (Algorithm R)
+    # of up to ``reservoir_size`` raw records.
+    def __init__(
+        self,
+        alpha: float = 0.05,
+        compression: float = 200.0,
+        reservoir_size: int = 256,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.reservoir_size = reservoir_size
+        self.count = 0
+        self.mean = 0.0
+        self.last = math.nan
+        self.ewma = math.nan
+        self.ewm_var = 0.0
+        self.digest = TDigest(compression)
+        self.reservoir: List[PredictionErrorRecord] = []
+        self.seen = 0
+        self._m2 = 0.0
+        self._rng = rng if rng is not None else random.Random(0)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def ewm_std(self) -> float:
+        return math.sqrt(self.ewm_var)
+
+    def update(self, magnitude: float) -> None:
+        self.count += 1
+        delta = magnitude - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (magnitude - self.mean)
+        if self.count == 1:
+            self.ewma = magnitude
+        else:
+            delta = magnitude - self.ewma
+            self.ewma += self.alpha * delta
+            self.ewm_var = (1.0 - self.alpha) * (self.ewm_var + self.alpha * delta * delta)
+        self.last = magnitude
+        self.digest.add(magnitude)
+
+    def sample(self, record: PredictionErrorRecord) -> None:
+        self.seen += 1
+        if len(self.reservoir) < self.reservoir_size:
+            self.reservoir.append(record)
+            return
+        slot = self._rng.randrange(self.seen)
+        if slot < self.reservoir_size:
+            self.reservoir[slot] = record
+
+    def percentile(self, magnitude: float) -> float:
+        return self.digest.cdf(magnitude)
+
+    def quantile(self, q: float) -> float:
+        return self.digest.quantile(q)
+
+    def summary(
+        self, source: str, quantiles: Sequence[float] = SUMMARY_QUANTILES
+    ) -> SurpriseSummary:
+        return SurpriseSummary(
+            source=source,
+            count=self.count,
+            mean=self.mean if self.count else math.nan,
+            std=self.std,
+            ewma=self.ewma,
+            ewm_std=self.ewm_std,
+            last=self.last,
+            percentile=self.percentile(self.last) if self.count else math.nan,
+            quantiles={q: self.quantile(q) for q in quantiles},
+        )
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self._m2,
+            "last": self.last,
+            "ewma": self.ewma,
+            "ewm_var": self.ewm_var,
+            "digest": self.digest.state(),
+            "reservoir": list(self.reservoir),
+            "seen": self.seen,
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        self.count = int(state["count"])
+        self.mean = float(state["mean"])
+        self._m2 = float(state["m2"])
+        self.last = float(state["last"])
+        self.ewma = float(state["ewma"])
+        self.ewm_var = float(state["ewm_var"])
+        self.digest = TDigest.from_state(state["digest"], self.digest.buffer_size)
+        self.reservoir = [restore(PredictionErrorRecord, item) for item in state["reservoir"]]
+        self.seen = int(state["seen"])
 
 
 class PredictionErrorHistory:
-    def __init__(self) -> None:
-        pass
+    # Records are appended to ``backend``; each record's magnitude also
+    # updates the ErrorStatistics of its ``source``, so surprise percentiles
+    # are O(1) per step however long the run. Every ``checkpoint_every``
+    # records the statistics are stored under ``<namespace>.stats``; a restart
+    # loads that checkpoint and replays only the records after it. The record
+    # log is kept only when a backend is passed (``keep_log``); otherwise just
+    # the statistics, their checkpoints and the newest ``checkpoint_every``
+    # records (for ``query``) stay in process.
+    def __init__(
+        self,
+        backend: Optional[MemoryBackend] = None,
+        namespace: str = "prediction_errors",
+        alpha: float = 0.05,
+        compression: float = 200.0,
+        reservoir_size: int = 256,
+        checkpoint_every: int = 1000,
+        seed: int = 0,
+        keep_log: Optional[bool] = None,
+    ) -> None:
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be >= 1")
+        self.keep_log = backend is not None if keep_log is None else keep_log
+        self.backend = backend if backend is not None else InMemoryBackend()
+        self.namespace = namespace
+        self.alpha = alpha
+        self.compression = compression
+        self.reservoir_size = reservoir_size
+        self.checkpoint_every = checkpoint_every
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._stats: Dict[str, ErrorStatistics] = {}
+        self._pending = 0
+        self._recent: Deque[Tuple[int, PredictionErrorRecord]] = deque(maxlen=checkpoint_every)
+        self._next_seq = 0
+        self._loaded = False
+
+    def __len__(self) -> int:
+        if not self.keep_log:
+            self._load()
+            return self._next_seq
+        return self.backend.count(self.namespace)
+
+    def record(self, error: PredictionErrorRecord) -> int:
+        with self._lock:
+            self._load()
+            if self.keep_log:
+                seq = self.backend.append(self.namespace, error)
+            else:
+                seq = self._next_seq
+                self._recent.append((seq, error))
+            self._next_seq = seq + 1
+            self._observe(error)
+            self._pending += 1
+            if self._pending >= self.checkpoint_every:
+                self._checkpoint(seq + 1)
+            return seq
+
+    def query(self, last: Optional[int] = None) -> List[PredictionErrorRecord]:
+        if not self.keep_log:
+            with self._lock:
+                rows = list(self._recent)
+            if last is not None:
+                rows = rows[-last:] if last > 0 else []
+        elif last is None:
+            rows = list(self.backend.scan(self.namespace))
+        else:
+            rows = self.backend.tail(self.namespace, last)
+        return [restore(PredictionErrorRecord, value) for _, value in rows]
+
+    def sources(self) -> List[str]:
+        self._load()
+        return list(self._stats)
+
+    def statistics(self, source: Optional[str] = None) -> Optional[ErrorStatistics]:
+        self._load()
+        return self._stats.get(source or DEFAULT_SOURCE)
+
+    def surprise(self, magnitude: float, source: Optional[str] = None) -> float:
+        # Percentile rank (0..1) of ``magnitude`` among the source's errors so
+        # far; NaN before any have been recorded.
+        with self._lock:
+            stats = self.statistics(source)
+            return stats.percentile(float(magnitude)) if stats is not None else math.nan
+
+    def quantile(self, q: float, source: Optional[str] = None) -> float:
+        with self._lock:
+            stats = self.statistics(source)
+            return stats.quantile(q) if stats is not None else math.nan
+
+    def summary(
+        self, source: Optional[str] = None, quantiles: Sequence[float] = SUMMARY_QUANTILES
+    ) -> Optional[SurpriseSummary]:
+        with self._lock:
+            stats = self.statistics(source)
+            if stats is None:
+                return None
+            return stats.summary(source or DEFAULT_SOURCE, quantiles)
+
+    def sample(self, source: Optional[str] = None) -> List[PredictionErrorRecord]:
+        with self._lock:
+            stats = self.statistics(source)
+            return list(stats.reservoir) if stats is not None else []
+
+    def _source_stats(self, source: Optional[str]) -> ErrorStatistics:
+        name = source or DEFAULT_SOURCE
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = ErrorStatistics(
+                self.alpha, self.compression, self.reservoir_size, rng=self._rng
+            )
+            self._stats[name] = stats
+        return stats
+
+    def _observe(self, error: PredictionErrorRecord) -> None:
+        stats = self._source_stats(error.source)
+        stats.sample(error)
+        magnitude = error_magnitude(error.error)
+        if magnitude is not None:
+            stats.update(magnitude)
+
+    @property
+    def _stats_namespace(self) -> str:
+        return f"{self.namespace}.stats"
 
-    def record(self, error: Any) -> None:
-        raise NotImplementedError("Prediction error recording not implemented.")
+    def _checkpoint(self, seq_stop: int) -> None:
+        # ``seq_stop`` is the first record seq the checkpoint does not cover.
+        state = {name: stats.state() for name, stats in self._stats.items()}
+        self.backend.put(self._stats_namespace, "checkpoint", {"seq": seq_stop, "sources": state})
+        self._pending = 0
 
-    def query(self, query: Any) -> Any:
-        raise NotImplementedError("Prediction error query not implemented.")
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            checkpoint = self.backend.get(self._stats_namespace, "checkpoint")
+            seq_stop = 0
+            if checkpoint is not None:
+                seq_stop = self._next_seq = int(checkpoint["seq"])
+                for name, state in checkpoint["sources"].items():
+                    self._source_stats(name).load_state(state)
+            for _, value in self.backend.scan(self.namespace, start=seq_stop):
+                self._observe(restore(PredictionErrorRecord, value))
+                self._pending += 1
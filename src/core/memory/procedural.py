@@ -1,14 +1,32 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import List, Optional
+
+from core.memory.storage import InMemoryBackend, MemoryBackend, restore
+from core.models.memory_records import ProceduralSkill
 
 
 class ProceduralMemory:
-    def __init__(self) -> None:
-        pass
+    def __init__(
+        self, backend: Optional[MemoryBackend] = None, namespace: str = "procedural"
+    ) -> None:
+        self.backend = backend if backend is not None else InMemoryBackend()
+        self.namespace = namespace
+
+    def __len__(self) -> int:
+        return self.backend.count(self.namespace)
+
+    def store(self, skill: ProceduralSkill) -> int:
+        if skill.name is None:
+            raise ValueError("procedural skills need a name")
+        return self.backend.put(self.namespace, skill.name, skill)
+
+    def query(self, name: str) -> Optional[ProceduralSkill]:
+        value = self.backend.get(self.namespace, name)
+        return None if value is None else restore(ProceduralSkill, value)
 
-    def store(self, skill: Any) -> None:
-        raise NotImplementedError("Procedural memory storage not implemented.")
+    def keys(self) -> List[str]:
+        return self.backend.keys(self.namespace)
 
-    def query(self, query: Any) -> Any:
-        raise NotImplementedError("Procedural memory query not implemented.")
+    def forget(self, name: str) -> bool:
+        return self.backend.delete(self.namespace, name)
@@ -1,14 +1,552 @@
 from __future__ import annotations
 
-from typing import Any
+import bisect
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass, fields, replace
+from operator import attrgetter
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.memory.storage import InMemoryBackend, MemoryBackend, restore
+from core.models.memory_records import SelfStateSnapshot
+from core.models.state import HomeostasisState, PositionState
+
+# Numeric self-state columns, in order: every homeostasis and position field,
+# with booleans stored as 0/1 and missing values as NaN.
+SERIES_GROUPS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("homeostasis", tuple(f.name for f in fields(HomeostasisState))),
+    ("position", tuple(f.name for f in fields(PositionState))),
+)
+SERIES_FIELDS: Tuple[str, ...] = tuple(name for _, names in SERIES_GROUPS for name in names)
+WINDOW_STATS = ("min", "max", "mean", "sum", "count")
+
+_COLUMNS = {name: column for column, name in enumerate(SERIES_FIELDS)}
+_GETTERS = tuple(
+    (group, attrgetter(*names), names, len(names)) for group, names in SERIES_GROUPS
+)
+
+# (step of each piece, mins, maxs, sums, counts): a raw row is a piece of one
+# step; a rollup bucket is a piece covering ``width`` steps.
+Pieces = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+Columns = Union[slice, np.ndarray]
+
+
+@dataclass
+class SeriesSlice:
+    steps: np.ndarray
+    values: np.ndarray
+
+
+@dataclass
+class FieldSummary:
+    min: float
+    max: float
+    mean: float
+    count: int
+
+
+@dataclass
+class _Chunk:
+    index: int
+    steps: np.ndarray
+    values: np.ndarray
+
+
+def _number(value: Any) -> float:
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def state_row(state: Any, out: np.ndarray) -> None:
+    # Accepts an AgentState, its ``to_dict()``/decoded form, or a flat dict
+    # of field names.
+    column = 0
+    for group, getter, names, width in _GETTERS:
+        if isinstance(state, dict):
+            part = state.get(group, state)
+            values = [part.get(name) for name in names] if isinstance(part, dict) else ()
+        else:
+            part = getattr(state, group, None)
+            values = getter(part) if part is not None else ()
+        if values:
+            out[column : column + width] = [_number(value) for value in values]
+        else:
+            out[column : column + width] = math.nan
+        column += width
+
+
+def _raw_pieces(steps: np.ndarray, values: np.ndarray) -> Pieces:
+    missing = np.isnan(values)
+    return (
+        steps,
+        values,
+        values,
+        np.where(missing, 0.0, values).astype(np.float64),
+        (~missing).astype(np.int64),
+    )
+
+
+def _reduce(ids: np.ndarray, pieces: Pieces) -> Tuple[np.ndarray, Pieces]:
+    # Merges runs of equal ``ids`` (sorted) into one piece each.
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    _, mins, maxs, sums, counts = pieces
+    return starts, (
+        ids[starts],
+        np.fmin.reduceat(mins, starts, axis=0),
+        np.fmax.reduceat(maxs, starts, axis=0),
+        np.add.reduceat(sums, starts, axis=0),
+        np.add.reduceat(counts, starts, axis=0),
+    )
+
+
+def _grow(array: np.ndarray, needed: int) -> np.ndarray:
+    if needed <= len(array):
+        return array
+    grown = np.empty((max(needed, 2 * len(array)),) + array.shape[1:], dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+class _Rollup:
+    # Per-bucket min/max/sum/count of every column over ``width``-step buckets,
+    # in growable row-aligned arrays. ``retain`` caps the buckets kept; the
+    # oldest are dropped and queries that far back fall to a coarser tier.
+    def __init__(self, width: int, columns: int, retain: Optional[int]) -> None:
+        self.width = width
+        self.retain = retain
+        self.buckets = np.empty(0, dtype=np.int64)
+        self.mins = np.empty((0, columns), dtype=np.float32)
+        self.maxs = np.empty((0, columns), dtype=np.float32)
+        self.sums = np.empty((0, columns), dtype=np.float64)
+        self.counts = np.empty((0, columns), dtype=np.int64)
+        self.start = 0
+        self.stop = 0
+        self.floor = -math.inf
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def extend(self, block: Pieces) -> None:
+        buckets, mins, maxs, sums, counts = block
+        last = self.stop - 1
+        if self.stop > self.start and len(buckets) and buckets[0] == self.buckets[last]:
+            # A bucket wider than a chunk continues across the chunk boundary.
+            self.mins[last] = np.fmin(self.mins[last], mins[0])
+            self.maxs[last] = np.fmax(self.maxs[last], maxs[0])
+            self.sums[last] += sums[0]
+            self.counts[last] += counts[0]
+            buckets, mins, maxs, sums, counts = (part[1:] for part in block)
+        size = len(buckets)
+        if not size:
+            return
+        stop = self.stop + size
+        self.buckets = _grow(self.buckets, stop)
+        self.mins = _grow(self.mins, stop)
+        self.maxs = _grow(self.maxs, stop)
+        self.sums = _grow(self.sums, stop)
+        self.counts = _grow(self.counts, stop)
+        self.buckets[self.stop : stop] = buckets
+        self.mins[self.stop : stop] = mins
+        self.maxs[self.stop : stop] = maxs
+        self.sums[self.stop : stop] = sums
+        self.counts[self.stop : stop] = counts
+        self.stop = stop
+        if self.retain is not None and len(self) > self.retain:
+            self.start = self.stop - self.retain
+            self.floor = float(self.buckets[self.start] * self.width)
+            if self.start > self.retain:
+                self._compact()
+
+    def select(self, start: Optional[int], stop: Optional[int], columns: Columns) -> Pieces:
+        # Buckets overlapping [start, stop); edge buckets come whole.
+        buckets = self.buckets[self.start : self.stop]
+        lo = 0 if start is None else int(np.searchsorted(buckets, start // self.width))
+        hi = len(buckets)
+        if stop is not None:
+            hi = int(np.searchsorted(buckets, -(-stop // self.width)))
+        rows = slice(self.start + lo, self.start + hi)
+        return (
+            self.buckets[rows] * self.width,
+            self.mins[rows, columns],
+            self.maxs[rows, columns],
+            self.sums[rows, columns],
+            self.counts[rows, columns],
+        )
+
+    def _compact(self) -> None:
+        rows = slice(self.start, self.stop)
+        self.buckets = self.buckets[rows].copy()
+        self.mins = self.mins[rows].copy()
+        self.maxs = self.maxs[rows].copy()
+        self.sums = self.sums[rows].copy()
+        self.counts = self.counts[rows].copy()
+        self.stop -= self.start
+        self.start = 0
 
 
 class SelfStateMemory:
-    def __init__(self) -> None:
-        pass
+    # Snapshots are appended to ``backend`` as they arrive, and their numeric
+    # fields (SERIES_FIELDS) go into a columnar time series: float32 rows
+    # chunked by step range (``chunk_steps`` steps per chunk). When a chunk
+    # fills it is sealed and rolled up into min/max/sum/count tiers of
+    # ``rollups`` step widths. Only the newest ``retain_chunks`` raw chunks are
+    # kept; older history is answered from the tiers, of which all but the
+    # coarsest keep ``retain_rollups`` buckets. Window queries read the
+    # coarsest tier whose width divides the window, plus the raw rows of the
+    # unsealed chunk, so their cost scales with the number of windows rather
+    # than the steps covered. Sealed chunks and their rollups are persisted to
+    # their own namespaces; a restart loads those and replays only the
+    # snapshots of the unsealed chunk. The snapshot log is kept only when a
+    # backend is passed (``keep_log``); otherwise just the newest
+    # ``chunk_steps`` snapshots stay in process for ``query``.
+    def __init__(
+        self,
+        backend: Optional[MemoryBackend] = None,
+        namespace: str = "self_state",
+        chunk_steps: int = 10_000,
+        retain_chunks: int = 32,
+        rollups: Sequence[int] = (100, 1_000, 10_000),
+        retain_rollups: int = 100_000,
+        keep_log: Optional[bool] = None,
+    ) -> None:
+        if chunk_steps < 1 or retain_chunks < 1 or retain_rollups < 1:
+            raise ValueError("chunk_steps, retain_chunks and retain_rollups must be >= 1")
+        widths = sorted(set(int(width) for width in rollups))
+        if widths and widths[0] < 2:
+            raise ValueError("rollup widths must be >= 2")
+        self.keep_log = backend is not None if keep_log is None else keep_log
+        self.backend = backend if backend is not None else InMemoryBackend()
+        self.namespace = namespace
+        self.chunk_steps = chunk_steps
+        self.retain_chunks = retain_chunks
+        columns = len(SERIES_FIELDS)
+        self._tiers = [
+            _Rollup(width, columns, retain_rollups if width != widths[-1] else None)
+            for width in widths
+        ]
+        self._lock = threading.RLock()
+        self._chunks: List[_Chunk] = []
+        self._chunk_ids: List[int] = []
+        self._raw_floor = -math.inf
+        self._chunk: Optional[int] = None
+        self._steps = np.empty(chunk_steps, dtype=np.int64)
+        self._values = np.empty((chunk_steps, columns), dtype=np.float32)
+        self._size = 0
+        self._last_step: Optional[int] = None
+        self._recent: Deque[Tuple[int, SelfStateSnapshot]] = deque(maxlen=chunk_steps)
+        self._next_seq = 0
+        self._loaded = False
+
+    def __len__(self) -> int:
+        if not self.keep_log:
+            return self._next_seq
+        return self.backend.count(self.namespace)
+
+    @property
+    def latest_step(self) -> Optional[int]:
+        self._load()
+        return self._last_step
+
+    @property
+    def rollup_widths(self) -> List[int]:
+        return [tier.width for tier in self._tiers]
+
+    def record(self, snapshot: SelfStateSnapshot) -> int:
+        with self._lock:
+            self._load()
+            if snapshot.step is None:
+                step = 0 if self._last_step is None else self._last_step + 1
+                snapshot = replace(snapshot, step=step)
+            step = int(snapshot.step)
+            if self._last_step is not None and step <= self._last_step:
+                raise ValueError(f"self-state step {step} is not after {self._last_step}")
+            if self.keep_log:
+                seq = self.backend.append(self.namespace, snapshot)
+            else:
+                seq = self._next_seq
+                self._recent.append((seq, snapshot))
+            self._next_seq = seq + 1
+            self._add(step, snapshot.state, seq)
+            return seq
+
+    def query(self, last: Optional[int] = None) -> List[SelfStateSnapshot]:
+        if not self.keep_log:
+            with self._lock:
+                rows = list(self._recent)
+            if last is not None:
+                rows = rows[-last:] if last > 0 else []
+        elif last is None:
+            rows = list(self.backend.scan(self.namespace))
+        else:
+            rows = self.backend.tail(self.namespace, last)
+        return [restore(SelfStateSnapshot, value) for _, value in rows]
+
+    def series(
+        self,
+        field: str,
+        last: Optional[int] = None,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+    ) -> SeriesSlice:
+        # Raw values of ``field`` at steps in [start, stop), or over the last
+        # ``last`` steps; only steps still held as raw chunks are returned.
+        column = self._column(field)
+        with self._lock:
+            self._load()
+            lo, hi = self._range(last, start, stop)
+            steps, values = self._raw(lo, hi)
+            return SeriesSlice(steps, values[:, column].copy())
+
+    def windows(
+        self,
+        field: str,
+        width: int,
+        stat: str = "mean",
+        last: Optional[int] = None,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+    ) -> SeriesSlice:
+        # ``stat`` of ``field`` per ``width``-step window (aligned to multiples
+        # of ``width``; the range is widened to whole windows). ``steps`` holds
+        # each window's first step; windows without data are left out.
+        if width < 1:
+            raise ValueError("width must be >= 1")
+        if stat not in WINDOW_STATS:
+            raise ValueError(f"stat must be one of {WINDOW_STATS}")
+        column = self._column(field)
+        with self._lock:
+            self._load()
+            lo, hi = self._range(last, start, stop)
+            if lo is not None:
+                lo = lo // width * width
+            if hi is not None:
+                hi = -(-hi // width) * width
+            tiers = [tier for tier in self._tiers if width % tier.width == 0]
+            pieces = self._pieces(lo, hi, tiers, slice(column, column + 1), coarse=True)
+            if not len(pieces[0]):
+                return SeriesSlice(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+            _, (ids, mins, maxs, sums, counts) = _reduce(pieces[0] // width, pieces)
+            return SeriesSlice(ids * width, _stat(stat, mins, maxs, sums, counts)[:, 0])
+
+    def aggregate(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        last: Optional[int] = None,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+    ) -> Dict[str, FieldSummary]:
+        # Min/max/mean/count per field over the range, from raw rows while they
+        # cover it; older ranges use the finest tier that does, widened to
+        # whole buckets.
+        names = list(SERIES_FIELDS) if fields is None else list(fields)
+        columns = np.array([self._column(name) for name in names], dtype=np.intp)
+        with self._lock:
+            self._load()
+            lo, hi = self._range(last, start, stop)
+            pieces = self._pieces(lo, hi, self._tiers, columns, coarse=False)
+        _, mins, maxs, sums, counts = pieces
+        if not len(mins):
+            return {name: FieldSummary(math.nan, math.nan, math.nan, 0) for name in names}
+        mins, maxs = np.fmin.reduce(mins, axis=0), np.fmax.reduce(maxs, axis=0)
+        sums, counts = sums.sum(axis=0), counts.sum(axis=0)
+        return {
+            name: FieldSummary(
+                float(mins[index]),
+                float(maxs[index]),
+                float(sums[index] / counts[index]) if counts[index] else math.nan,
+                int(counts[index]),
+            )
+            for index, name in enumerate(names)
+        }
+
+    def _column(self, field: str) -> int:
+        column = _COLUMNS.get(field)
+        if column is None:
+            raise ValueError(f"unknown self-state field {field!r}")
+        return column
+
+    def _range(
+        self, last: Optional[int], start: Optional[int], stop: Optional[int]
+    ) -> Tuple[Optional[int], Optional[int]]:
+        if last is None:
+            return start, stop
+        if last < 1:
+            raise ValueError("last must be >= 1")
+        if self._last_step is None:
+            return start, stop
+        lo = self._last_step - last + 1
+        return (lo if start is None else max(start, lo)), stop
+
+    def _add(self, step: int, state: Any, seq: int) -> None:
+        chunk = step // self.chunk_steps
+        if self._chunk is not None and chunk != self._chunk:
+            self._seal(seq)
+        self._chunk = chunk
+        self._steps[self._size] = step
+        state_row(state, self._values[self._size])
+        self._size += 1
+        self._last_step = step
+
+    def _seal(self, seq_stop: int) -> None:
+        # ``seq_stop`` is the first snapshot seq past this chunk, where a
+        # restart resumes replaying the snapshot log.
+        size = self._size
+        chunk = _Chunk(self._chunk, self._steps[:size].copy(), self._values[:size].copy())
+        pieces = _raw_pieces(chunk.steps, chunk.values)
+        blocks = []
+        for tier in self._tiers:
+            block = _reduce(chunk.steps // tier.width, pieces)[1]
+            tier.extend(block)
+            blocks.append([tier.width, *block])
+        self.backend.put(
+            self._chunk_namespace,
+            _chunk_key(chunk.index),
+            {"chunk": chunk.index, "steps": chunk.steps, "values": chunk.values, "seq": seq_stop},
+        )
+        self.backend.append(self._rollup_namespace, {"chunk": chunk.index, "tiers": blocks})
+        self._retain(chunk)
+        for expired in self._expire():
+            self.backend.delete(self._chunk_namespace, _chunk_key(expired))
+        self._chunk = None
+        self._size = 0
+
+    def _retain(self, chunk: _Chunk) -> None:
+        self._chunks.append(chunk)
+        self._chunk_ids.append(chunk.index)
+
+    def _expire(self) -> List[int]:
+        excess = len(self._chunks) - self.retain_chunks
+        if excess <= 0:
+            return []
+        expired = self._chunk_ids[:excess]
+        del self._chunks[:excess]
+        del self._chunk_ids[:excess]
+        self._raw_floor = float(self._chunk_ids[0] * self.chunk_steps)
+        return expired
+
+    def _raw(self, lo: Optional[int], hi: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        steps: List[np.ndarray] = []
+        values: List[np.ndarray] = []
+        first = 0 if lo is None else bisect.bisect_left(self._chunk_ids, lo // self.chunk_steps)
+        last = len(self._chunks)
+        if hi is not None:
+            last = bisect.bisect_right(self._chunk_ids, (hi - 1) // self.chunk_steps)
+        parts = [(chunk.steps, chunk.values) for chunk in self._chunks[first:last]]
+        parts.append((self._steps[: self._size], self._values[: self._size]))
+        for chunk_steps, chunk_values in parts:
+            begin = 0 if lo is None else int(np.searchsorted(chunk_steps, lo))
+            end = len(chunk_steps) if hi is None else int(np.searchsorted(chunk_steps, hi))
+            if end > begin:
+                steps.append(chunk_steps[begin:end])
+                values.append(chunk_values[begin:end])
+        if not steps:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(SERIES_FIELDS)), np.float32)
+        if len(steps) == 1:
+            return steps[0], values[0]
+        return np.concatenate(steps), np.concatenate(values)
+
+    def _pieces(
+        self,
+        lo: Optional[int],
+        hi: Optional[int],
+        tiers: Sequence[_Rollup],
+        columns: Columns,
+        coarse: bool,
+    ) -> Pieces:
+        # Picks one source for the sealed part of [lo, hi): with ``coarse``
+        # the widest of ``tiers`` that reaches back to ``lo``, otherwise raw
+        # rows if they do and the finest such tier if not. With nothing
+        # reaching that far, the source reaching furthest back is used.
+        start = -math.inf if lo is None else lo
+        sources: List[Tuple[float, int, Optional[_Rollup]]] = [(self._raw_floor, 1, None)]
+        sources.extend((tier.floor, tier.width, tier) for tier in tiers if len(tier))
+        covering = [source for source in sources if source[0] <= start]
+        if covering:
+            pick = max if coarse else min
+            tier = pick(covering, key=lambda source: source[1])[2]
+        else:
+            tier = min(sources, key=lambda source: (source[0], -source[1]))[2]
+        if tier is None:
+            steps, values = self._raw(lo, hi)
+            return _raw_pieces(steps, values[:, columns])
+        sealed = tier.select(lo, hi, columns)
+        active_steps = self._steps[: self._size]
+        begin = 0 if lo is None else int(np.searchsorted(active_steps, lo))
+        end = self._size if hi is None else int(np.searchsorted(active_steps, hi))
+        active = _raw_pieces(active_steps[begin:end], self._values[begin:end, columns])
+        if not len(active[0]):
+            return sealed
+        return tuple(np.concatenate(parts) for parts in zip(sealed, active))  # type: ignore
+
+    @property
+    def _chunk_namespace(self) -> str:
+        return f"{self.namespace}.chunks"
+
+    @property
+    def _rollup_namespace(self) -> str:
+        return f"{self.namespace}.rollups"
+
+    def _load(self) -> None:
+        # Sealed chunks and rollups persisted by an earlier process are read on
+        # first use; the unsealed chunk is rebuilt from the snapshot log.
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            seq_stop = 0
+            for _, value in self.backend.scan(self._chunk_namespace):
+                steps = np.asarray(value["steps"], dtype=np.int64)
+                values = np.asarray(value["values"], dtype=np.float32)
+                self._retain(_Chunk(int(value["chunk"]), steps, values))
+                seq_stop = max(seq_stop, int(value["seq"]))
+            self._expire()
+            first_rollup: Optional[int] = None
+            for _, value in self.backend.scan(self._rollup_namespace):
+                if first_rollup is None:
+                    first_rollup = int(value["chunk"])
+                stored = {int(block[0]): block[1:] for block in value["tiers"]}
+                for tier in self._tiers:
+                    block = stored.get(tier.width)
+                    if block is not None:
+                        tier.extend(tuple(np.asarray(part) for part in block))  # type: ignore
+            if self._chunks:
+                if first_rollup is not None and first_rollup < self._chunk_ids[0]:
+                    self._raw_floor = float(self._chunk_ids[0] * self.chunk_steps)
+                self._last_step = int(self._chunks[-1].steps[-1])
+            for seq, value in self.backend.scan(self.namespace, start=seq_stop):
+                snapshot = restore(SelfStateSnapshot, value)
+                step = snapshot.step
+                if step is None:
+                    step = 0 if self._last_step is None else self._last_step + 1
+                step = int(step)
+                if self._last_step is not None and step <= self._last_step:
+                    continue
+                self._add(step, snapshot.state, seq)
+
+
+def _chunk_key(index: int) -> str:
+    return f"{index:016d}"
 
-    def record(self, snapshot: Any) -> None:
-        raise NotImplementedError("Self-state recording not implemented.")
 
-    def query(self, query: Any) -> Any:
-        raise NotImplementedError("Self-state query not implemented.")
+def _stat(
+    stat: str, mins: np.ndarray, maxs: np.ndarray, sums: np.ndarray, counts: np.ndarray
+) -> np.ndarray:
+    if stat == "min":
+        return mins.astype(np.float64)
+    if stat == "max":
+        return maxs.astype(np.float64)
+    if stat == "sum":
+        return sums
+    if stat == "count":
+        return counts.astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
@@ -1,14 +1,32 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import List, Optional
+
+from core.memory.storage import InMemoryBackend, MemoryBackend, restore
+from core.models.memory_records import SemanticMemoryEntry
 
 
 class SemanticMemory:
-    def __init__(self) -> None:
-        pass
+    def __init__(
+        self, backend: Optional[MemoryBackend] = None, namespace: str = "semantic"
+    ) -> None:
+        self.backend = backend if backend is not None else InMemoryBackend()
+        self.namespace = namespace
+
+    def __len__(self) -> int:
+        return self.backend.count(self.namespace)
+
+    def store(self, entry: SemanticMemoryEntry) -> int:
+        if entry.key is None:
+            raise ValueError("semantic entries need a key")
+        return self.backend.put(self.namespace, entry.key, entry)
+
+    def query(self, key: str) -> Optional[SemanticMemoryEntry]:
+        value = self.backend.get(self.namespace, key)
+        return None if value is None else restore(SemanticMemoryEntry, value)
 
-    def store(self, entry: Any) -> None:
-        raise NotImplementedError("Semantic memory storage not implemented.")
+    def keys(self) -> List[str]:
+        return self.backend.keys(self.namespace)
 
-    def query(self, query: Any) -> Any:
-        raise NotImplementedError("Semantic memory query not implemented.")
+    def forget(self, key: str) -> bool:
+        return self.backend.delete(self.namespace, key)
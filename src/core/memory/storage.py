@@ -0,0 +1,879 @@
+from __future__ import annotations
+
+import base64
+import bisect
+import dataclasses
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Tuple, Type, TypeVar, Union
+
+import numpy as np
+
+try:
+    import fcntl
+except Exception:  # pragma: no cover - fcntl is POSIX only
+    fcntl = None  # type: ignore[assignment]
+
+PathLike = Union[str, Path]
+R = TypeVar("R")
+
+_NDARRAY_TAG = "__ndarray__"
+
+
+class MemoryBackend(Protocol):
+    # Namespaced record storage shared by the memory subsystems. A namespace
+    # is an append log (``append``) or a key-value map (``put``/``delete``);
+    # both hand out per-namespace sequence numbers that only grow, and
+    # ``scan``/``tail`` yield live records in write order as (seq, value).
+    def append(self, namespace: str, value: Any) -> int:
+        ...
+
+    def put(self, namespace: str, key: str, value: Any) -> int:
+        ...
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        ...
+
+    def delete(self, namespace: str, key: str) -> bool:
+        ...
+
+    def keys(self, namespace: str) -> List[str]:
+        ...
+
+    def count(self, namespace: str) -> int:
+        ...
+
+    def scan(
+        self, namespace: str, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[Tuple[int, Any]]:
+        ...
+
+    def tail(self, namespace: str, n: int) -> List[Tuple[int, Any]]:
+        ...
+
+    def flush(self) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+def _default(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: getattr(value, f.name) for f in dataclasses.fields(value)}
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        return {
+            _NDARRAY_TAG: base64.b64encode(data.tobytes()).decode("ascii"),
+            "dtype": data.dtype.str,
+            "shape": list(data.shape),
+        }
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return repr(value)
+
+
+def _object_hook(value: Dict[str, Any]) -> Any:
+    if _NDARRAY_TAG in value:
+        data = base64.b64decode(value[_NDARRAY_TAG])
+        return np.frombuffer(data, dtype=value["dtype"]).reshape(value["shape"])
+    return value
+
+
+def encode_value(value: Any) -> bytes:
+    # Dataclasses become dicts of their fields and arrays round-trip exactly;
+    # anything else JSON cannot hold is stored as its repr.
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def decode_value(payload: bytes) -> Any:
+    return json.loads(payload.decode("utf-8"), object_hook=_object_hook)
+
+
+def restore(cls: Type[R], value: Any) -> R:
+    # Backends that serialize return plain dicts; the in-memory one returns
+    # the stored object itself.
+    if isinstance(value, cls) or not isinstance(value, dict):
+        return value
+    names = {f.name for f in dataclasses.fields(cls)}  # type: ignore[arg-type]
+    return cls(**{name: item for name, item in value.items() if name in names})
+
+
+class InMemoryBackend(MemoryBackend):
+    # Process-local default; values are kept as the objects passed in.
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._seqs: Dict[str, List[int]] = {}
+        self._values: Dict[str, List[Any]] = {}
+        self._keys: Dict[str, Dict[str, int]] = {}
+        self._next: Dict[str, int] = {}
+
+    def append(self, namespace: str, value: Any) -> int:
+        with self._lock:
+            return self._write(namespace, value)
+
+    def put(self, namespace: str, key: str, value: Any) -> int:
+        with self._lock:
+            self.delete(namespace, key)
+            seq = self._write(namespace, value)
+            self._keys.setdefault(namespace, {})[key] = seq
+            return seq
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            seq = self._keys.get(namespace, {}).get(key)
+            if seq is None:
+                return None
+            return self._values[namespace][self._position(namespace, seq)]
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            seq = self._keys.get(namespace, {}).pop(key, None)
+            if seq is None:
+                return False
+            position = self._position(namespace, seq)
+            del self._seqs[namespace][position]
+            del self._values[namespace][position]
+            return True
+
+    def keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            keyed = self._keys.get(namespace, {})
+            return sorted(keyed, key=keyed.__getitem__)
+
+    def count(self, namespace: str) -> int:
+        return len(self._seqs.get(namespace, ()))
+
+    def scan(
+        self, namespace: str, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[Tuple[int, Any]]:
+        with self._lock:
+            seqs = self._seqs.get(namespace, [])
+            first = bisect.bisect_left(seqs, start)
+            last = len(seqs) if stop is None else bisect.bisect_left(seqs, stop)
+            rows = list(zip(seqs[first:last], self._values[namespace][first:last])) if seqs else []
+        return iter(rows)
+
+    def tail(self, namespace: str, n: int) -> List[Tuple[int, Any]]:
+        with self._lock:
+            seqs = self._seqs.get(namespace, [])
+            if n <= 0 or not seqs:
+                return []
+            return list(zip(seqs[-n:], self._values[namespace][-n:]))
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def _write(self, namespace: str, value: Any) -> int:
+        seq = self._next.get(namespace, 0)
+        self._next[namespace] = seq + 1
+        self._seqs.setdefault(namespace, []).append(seq)
+        self._values.setdefault(namespace, []).append(value)
+        return seq
+
+    def _position(self, namespace: str, seq: int) -> int:
+        seqs = self._seqs[namespace]
+        return bisect.bisect_left(seqs, seq)
+
+
+class SQLiteBackend(MemoryBackend):
+    # One WAL-mode database; other processes can open the same path and read
+    # while this one writes. Nothing is loaded up front: every call is a
+    # query against the (namespace, seq) primary key or the (namespace, key)
+    # index.
+    def __init__(self, path: PathLike, synchronous: str = "NORMAL") -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS memory_records ("
+            " namespace TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " key TEXT,"
+            " value BLOB NOT NULL,"
+            " PRIMARY KEY (namespace, seq)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS memory_records_key"
+            " ON memory_records (namespace, key) WHERE key IS NOT NULL"
+        )
+        # Next seq per namespace, so seqs are never reused after deletes.
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS memory_sequences ("
+            " namespace TEXT PRIMARY KEY,"
+            " next_seq INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    def append(self, namespace: str, value: Any) -> int:
+        return self._insert(namespace, None, encode_value(value))
+
+    def put(self, namespace: str, key: str, value: Any) -> int:
+        return self._insert(namespace, key, encode_value(value))
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM memory_records WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        return None if row is None else decode_value(row[0])
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM memory_records WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM memory_records WHERE namespace = ? AND key IS NOT NULL"
+                " ORDER BY seq",
+                (namespace,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM memory_records WHERE namespace = ?", (namespace,)
+            ).fetchone()[0]
+
+    def scan(
+        self, namespace: str, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[Tuple[int, Any]]:
+        # Pages through the primary key so a long scan never holds the lock.
+        batch = 1024
+        while stop is None or start < stop:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT seq, value FROM memory_records WHERE namespace = ? AND seq >= ?"
+                    " AND seq < ? ORDER BY seq LIMIT ?",
+                    (namespace, start, stop if stop is not None else 2**63 - 1, batch),
+                ).fetchall()
+            for seq, payload in rows:
+                yield seq, decode_value(payload)
+            if len(rows) < batch:
+                return
+            start = rows[-1][0] + 1
+
+    def tail(self, namespace: str, n: int) -> List[Tuple[int, Any]]:
+        if n <= 0:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, value FROM memory_records WHERE namespace = ?"
+                " ORDER BY seq DESC LIMIT ?",
+                (namespace, n),
+            ).fetchall()
+        return [(seq, decode_value(payload)) for seq, payload in reversed(rows)]
+
+    def flush(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _insert(self, namespace: str, key: Optional[str], payload: bytes) -> int:
+        # One transaction: a failed write is rolled back so the connection is
+        # not left inside BEGIN IMMEDIATE and the seq is not consumed.
+        with self._lock:
+            try:
+                seq = self._allocate(namespace)
+                if key is not None:
+                    self._conn.execute(
+                        "DELETE FROM memory_records WHERE namespace = ? AND key = ?",
+                        (namespace, key),
+                    )
+                self._conn.execute(
+                    "INSERT INTO memory_records (namespace, seq, key, value) VALUES (?, ?, ?, ?)",
+                    (namespace, seq, key, payload),
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return seq
+
+    def _allocate(self, namespace: str) -> int:
+        # Taking the write lock first keeps seqs unique across processes.
+        self._conn.execute("BEGIN IMMEDIATE")
+        row = self._conn.execute(
+            "SELECT next_seq FROM memory_sequences WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        if row is None:
+            # Databases written before the counter existed continue after
+            # their highest seq.
+            row = self._conn.execute(
+                "SELECT MAX(seq) + 1 FROM memory_records WHERE namespace = ?", (namespace,)
+            ).fetchone()
+        seq = row[0] or 0
+        self._conn.execute(
+            "INSERT OR REPLACE INTO memory_sequences (namespace, next_seq) VALUES (?, ?)",
+            (namespace, seq + 1),
+        )
+        return seq
+
+
+
+
+# Record header: payload length, crc32 of everything after these first two
+# fields, sequence number, flags and key length. The key and payload follow.
+_HEADER = struct.Struct("<IIqBH")
+_TOMBSTONE = 1
+_SEGMENT_SUFFIX = ".seg"
+_HINT_SUFFIX = ".hint"
+_KEYS_SUFFIX = ".keys"
+_LOCK_NAME = "LOCK"
+_COMPACTING_NAME = "COMPACTING"
+# Next seq of a namespace, written by compaction: the records and tombstones
+# it drops may have held the highest seqs.
+_NEXT_SEQ_NAME = "NEXT_SEQ"
+# One fixed-size hint row per record of a sealed segment.
+_HINT_DTYPE = np.dtype([("seq", "<i8"), ("offset", "<i8"), ("size", "<i8"), ("flags", "u1")])
+
+
+def _pack(seq: int, flags: int, key: Optional[str], payload: bytes) -> bytes:
+    key_bytes = key.encode("utf-8") if key is not None else b""
+    body = struct.pack("<qBH", seq, flags, len(key_bytes)) + key_bytes + payload
+    return struct.pack("<II", len(payload), zlib.crc32(body)) + body
+
+
+class _SegmentIndex:
+    # Location of every record of one namespace, in seq order. Replaced or
+    # deleted entries stay in place with ``live`` = 0 until compaction.
+    def __init__(self) -> None:
+        self.seqs = array("q")
+        self.segments = array("q")
+        self.offsets = array("q")
+        self.sizes = array("q")
+        self.live = bytearray()
+        self.keys: Dict[str, int] = {}
+        self.live_count = 0
+        self.dead_bytes = 0
+        self.total_bytes = 0
+        self.next_seq = 0
+
+    def add(self, seq: int, segment: int, offset: int, size: int, key: Optional[str]) -> None:
+        if key is not None:
+            self.kill(key)
+            self.keys[key] = len(self.seqs)
+        self.seqs.append(seq)
+        self.segments.append(segment)
+        self.offsets.append(offset)
+        self.sizes.append(size)
+        self.live.append(1)
+        self.live_count += 1
+        self.total_bytes += size
+        self.next_seq = max(self.next_seq, seq + 1)
+
+    def extend(self, rows: np.ndarray, segment: int, keyed: List[Tuple[int, str]]) -> None:
+        # Bulk add of one segment's hint rows. Within a segment only the last
+        # row of a key can be live, so overwrites resolve in one dict pass.
+        tombstones = (rows["flags"] & _TOMBSTONE) != 0
+        live = ~tombstones
+        last: Dict[str, int] = {}
+        for row, key in keyed:
+            previous = last.get(key)
+            if previous is not None:
+                live[previous] = False
+            last[key] = row
+        kept = rows[~tombstones]
+        positions = np.cumsum(~tombstones) - 1 + len(self.seqs)
+        self.seqs.frombytes(kept["seq"].astype(np.int64).tobytes())
+        self.segments.frombytes(np.full(len(kept), segment, dtype=np.int64).tobytes())
+        self.offsets.frombytes(kept["offset"].astype(np.int64).tobytes())
+        self.sizes.frombytes(kept["size"].astype(np.int64).tobytes())
+        self.live.extend(live[~tombstones].astype(np.uint8).tobytes())
+        self.live_count += int(live.sum())
+        self.total_bytes += int(rows["size"].sum())
+        self.dead_bytes += int(rows["size"][~live].sum())
+        for key, row in last.items():
+            # Supersedes whatever an earlier segment held for the key.
+            self.kill(key)
+            if not tombstones[row]:
+                self.keys[key] = int(positions[row])
+        if len(rows):
+            self.next_seq = max(self.next_seq, int(rows["seq"].max()) + 1)
+
+    def tombstone(self, seq: int, key: str, size: int) -> None:
+        self.kill(key)
+        self.dead_bytes += size
+        self.total_bytes += size
+        self.next_seq = max(self.next_seq, seq + 1)
+
+    def kill(self, key: str) -> bool:
+        position = self.keys.pop(key, None)
+        if position is None:
+            return False
+        self.live[position] = 0
+        self.live_count -= 1
+        self.dead_bytes += self.sizes[position]
+        return True
+
+    def bound(self, seq: int) -> int:
+        return bisect.bisect_left(self.seqs, seq)
+
+
+class _Namespace:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.index: Optional[_SegmentIndex] = None
+        self.active: Optional[int] = None
+        self.active_fd: Optional[int] = None
+        self.active_size = 0
+        self.maps: Dict[int, mmap.mmap] = {}
+        # Hint rows of the active segment: those loaded from its hint file,
+        # then those written since, and (row, key) pairs across both.
+        self.hint_base = np.zeros(0, dtype=_HINT_DTYPE)
+        self.hint_rows: List[Tuple[int, int, int, int]] = []
+        self.hint_keys: List[Tuple[int, str]] = []
+
+    def segment_path(self, segment: int) -> Path:
+        return self.root / f"{segment:08d}{_SEGMENT_SUFFIX}"
+
+    def segment_ids(self) -> List[int]:
+        if not self.root.exists():
+            return []
+        return sorted(int(path.stem) for path in self.root.glob(f"*{_SEGMENT_SUFFIX}"))
+
+
+class SegmentFileBackend(MemoryBackend):
+    # Append-only segment files, one directory per namespace. Each record is
+    # a single os.write to the active segment. Past ``segment_bytes`` the
+    # segment is sealed: a hint file with its (seq, offset, size, flags) rows
+    # is written beside it and later reads go through mmap. Opening the store
+    # reads nothing; a namespace's index is loaded the first time it is used,
+    # from hint files in bulk plus a scan of the unsealed tail (a torn record
+    # left by a crash is truncated). When a segment seals and replaced or
+    # deleted records make up ``compact_ratio`` of the namespace, its live
+    # records are rewritten into fresh segments; ``close()`` does the same and
+    # hints the unsealed segment, so a clean restart reads only hint files. A
+    # COMPACTING marker lets a restart finish or roll back an interrupted
+    # rewrite. One process writes
+    # (a lock file enforces it); others open with ``readonly=True`` and call
+    # ``refresh()`` to pick up new records.
+    def __init__(
+        self,
+        root: PathLike,
+        segment_bytes: int = 64 * 1024 * 1024,
+        compact_ratio: float = 0.5,
+        fsync: bool = False,
+        readonly: bool = False,
+    ) -> None:
+        self.root = Path(root)
+        self.segment_bytes = segment_bytes
+        self.compact_ratio = compact_ratio
+        self.fsync = fsync
+        self.readonly = readonly
+        self.compactions = 0
+        self._lock = threading.RLock()
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock_fd: Optional[int] = None
+        if not readonly:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._acquire_writer_lock()
+
+    def append(self, namespace: str, value: Any) -> int:
+        return self._write(namespace, None, encode_value(value), 0)
+
+    def put(self, namespace: str, key: str, value: Any) -> int:
+        return self._write(namespace, key, encode_value(value), 0)
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            space = self._load(namespace)
+            position = space.index.keys.get(key)  # type: ignore[union-attr]
+            if position is None:
+                return None
+            payload = self._read(space, position)[1]
+        return decode_value(payload)
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            space = self._load(namespace)
+            if key not in space.index.keys:  # type: ignore[union-attr]
+                return False
+            self._write(namespace, key, b"", _TOMBSTONE)
+            return True
+
+    def keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            keyed = self._load(namespace).index.keys  # type: ignore[union-attr]
+            return sorted(keyed, key=keyed.__getitem__)
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            return self._load(namespace).index.live_count  # type: ignore[union-attr]
+
+    def scan(
+        self, namespace: str, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[Tuple[int, Any]]:
+        with self._lock:
+            space = self._load(namespace)
+            index = space.index
+            assert index is not None
+            first = index.bound(start)
+            last = len(index.seqs) if stop is None else index.bound(stop)
+        for position in range(first, last):
+            with self._lock:
+                if space.index is not index:
+                    # Compacted while iterating: resume by seq on the new index.
+                    resume = index.seqs[position]
+                    break
+                if not index.live[position]:
+                    continue
+                seq, payload = self._read(space, position)
+            yield seq, decode_value(payload)
+        else:
+            return
+        yield from self.scan(namespace, resume, stop)
+
+    def tail(self, namespace: str, n: int) -> List[Tuple[int, Any]]:
+        rows: List[Tuple[int, bytes]] = []
+        with self._lock:
+            space = self._load(namespace)
+            index = space.index
+            assert index is not None
+            position = len(index.seqs) - 1
+            while position >= 0 and len(rows) < n:
+                if index.live[position]:
+                    rows.append(self._read(space, position))
+                position -= 1
+        return [(seq, decode_value(payload)) for seq, payload in reversed(rows)]
+
+    def namespaces(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(path.name for path in self.root.iterdir() if path.is_dir())
+
+    def compact(self, namespace: Optional[str] = None, force: bool = True) -> int:
+        # Without ``force`` only namespaces past ``compact_ratio`` are rewritten.
+        if self.readonly:
+            raise ValueError("cannot compact a read-only store")
+        compacted = 0
+        for name in [namespace] if namespace is not None else self.namespaces():
+            with self._lock:
+                space = self._load(name)
+                index = space.index
+                assert index is not None
+                if not index.dead_bytes:
+                    continue
+                if not force and index.dead_bytes < self.compact_ratio * index.total_bytes:
+                    continue
+                self._rewrite(name, space)
+                compacted += 1
+        return compacted
+
+    def refresh(self) -> None:
+        # Drop loaded indexes so the next access sees other writers' records.
+        with self._lock:
+            for space in self._namespaces.values():
+                self._release(space)
+            self._namespaces.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            for space in self._namespaces.values():
+                if space.active_fd is not None:
+                    os.fsync(space.active_fd)
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            if not self.readonly:
+                # Compact what this process loaded and write a hint for the
+                # unsealed segment too, so a clean restart reads only hints.
+                for name, space in list(self._namespaces.items()):
+                    if space.index is not None:
+                        self.compact(name, force=False)
+                for space in self._namespaces.values():
+                    if space.index is not None and space.active is not None and space.hint_rows:
+                        self._write_hint(space, space.active)
+            self.refresh()
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+    def _acquire_writer_lock(self) -> None:
+        self._lock_fd = os.open(str(self.root / _LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is None:  # pragma: no cover - POSIX only
+            return
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError as exc:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+            raise RuntimeError(f"{self.root} is already open for writing") from exc
+
+    def _load(self, namespace: str) -> _Namespace:
+        if not namespace or "/" in namespace or namespace.startswith("."):
+            raise ValueError(f"invalid namespace {namespace!r}")
+        space = self._namespaces.get(namespace)
+        if space is None:
+            space = self._namespaces[namespace] = _Namespace(self.root / namespace)
+        if space.index is not None:
+            return space
+        index = _SegmentIndex()
+        segments = self._recover(space)
+        for position, segment in enumerate(segments):
+            last = position == len(segments) - 1
+            start = 0
+            space.hint_base = space.hint_base[:0]
+            space.hint_rows = []
+            space.hint_keys = []
+            if space.segment_path(segment).with_suffix(_HINT_SUFFIX).exists():
+                start = self._load_hint(index, space, segment)
+                if not last:
+                    continue
+            # Only bytes past the hint need a record-by-record scan.
+            end = self._scan_segment(index, space, segment, start)
+            if last:
+                space.active = segment
+                space.active_size = end
+            elif not self.readonly:
+                # Sealed but its hint never landed (crash); write it now.
+                self._write_hint(space, segment)
+        next_seq = space.root / _NEXT_SEQ_NAME
+        if next_seq.exists():
+            index.next_seq = max(index.next_seq, int(next_seq.read_text(encoding="utf-8")))
+        space.index = index
+        return space
+
+    def _recover(self, space: _Namespace) -> List[int]:
+        # Segments numbered from the marker on are the rewrite's output: kept
+        # (and the old ones dropped) only if the rewrite finished.
+        segments = space.segment_ids()
+        marker = space.root / _COMPACTING_NAME
+        if not marker.exists():
+            return segments
+        state = json.loads(marker.read_text(encoding="utf-8"))
+        first, done = int(state["first"]), bool(state.get("done"))
+        stale = [segment for segment in segments if (segment < first) == done]
+        if self.readonly:
+            return [segment for segment in segments if segment not in stale]
+        for segment in stale:
+            self._unlink_segment(space, segment)
+        marker.unlink()
+        return [segment for segment in segments if segment not in stale]
+
+    def _load_hint(self, index: _SegmentIndex, space: _Namespace, segment: int) -> int:
+        # Returns the byte offset the hint covers up to.
+        hint = space.segment_path(segment).with_suffix(_HINT_SUFFIX)
+        rows = np.fromfile(hint, dtype=_HINT_DTYPE)
+        keys_path = hint.with_suffix(_KEYS_SUFFIX)
+        keyed: List[Tuple[int, str]] = []
+        if keys_path.exists():
+            # A keys file newer than its hint may list rows past its end.
+            pairs = json.loads(keys_path.read_text(encoding="utf-8"))
+            keyed = [(row, key) for row, key in pairs if row < len(rows)]
+        index.extend(rows, segment, keyed)
+        space.hint_base = rows
+        space.hint_keys = keyed
+        if not len(rows):
+            return 0
+        return int(rows["offset"][-1] + rows["size"][-1])
+
+    def _scan_segment(
+        self, index: _SegmentIndex, space: _Namespace, segment: int, start: int = 0
+    ) -> int:
+        path = space.segment_path(segment)
+        with path.open("rb") as fh:
+            fh.seek(start)
+            data = fh.read()
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            length, crc, seq, flags, key_len = _HEADER.unpack_from(data, offset)
+            end = offset + _HEADER.size + key_len + length
+            if end > len(data) or zlib.crc32(data[offset + 8 : end]) != crc:
+                break
+            key = data[offset + _HEADER.size : offset + _HEADER.size + key_len].decode("utf-8")
+            size = end - offset
+            self._track(space, seq, start + offset, size, flags, key if key_len else None)
+            if flags & _TOMBSTONE:
+                index.tombstone(seq, key, size)
+            else:
+                index.add(seq, segment, start + offset, size, key if key_len else None)
+            offset = end
+        if offset < len(data) and not self.readonly:
+            # Torn write from a crash: drop the partial record.
+            with path.open("r+b") as fh:
+                fh.truncate(start + offset)
+        return start + offset
+
+    def _read(self, space: _Namespace, position: int) -> Tuple[int, bytes]:
+        index = space.index
+        assert index is not None
+        segment = index.segments[position]
+        offset = index.offsets[position]
+        size = index.sizes[position]
+        if segment == space.active:
+            fd = space.active_fd
+            if fd is None:
+                space.active_fd = fd = self._open_active(space)
+            record = os.pread(fd, size, offset)
+            length, _, seq, _, key_len = _HEADER.unpack_from(record)
+            return seq, record[_HEADER.size + key_len :]
+        view = space.maps.get(segment)
+        if view is None:
+            with space.segment_path(segment).open("rb") as fh:
+                view = space.maps[segment] = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        length, _, seq, _, key_len = _HEADER.unpack_from(view, offset)
+        start = offset + _HEADER.size + key_len
+        # Slicing an mmap copies just this payload, without a syscall.
+        return seq, view[start : start + length]
+
+    def _open_active(self, space: _Namespace) -> int:
+        assert space.active is not None
+        if self.readonly:
+            return os.open(str(space.segment_path(space.active)), os.O_RDONLY)
+        space.root.mkdir(parents=True, exist_ok=True)
+        return os.open(
+            str(space.segment_path(space.active)), os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644
+        )
+
+    def _write(self, namespace: str, key: Optional[str], payload: bytes, flags: int) -> int:
+        if self.readonly:
+            raise ValueError("store is read-only")
+        with self._lock:
+            space = self._load(namespace)
+            index = space.index
+            assert index is not None
+            if space.active is None:
+                segments = space.segment_ids()
+                space.active = (segments[-1] + 1) if segments else 1
+                space.active_size = 0
+            elif space.active_size >= self.segment_bytes:
+                self._seal(space)
+                if index.dead_bytes and index.dead_bytes >= self.compact_ratio * index.total_bytes:
+                    self._rewrite(namespace, space)
+                    space = self._namespaces[namespace]
+                    index = space.index
+                    assert index is not None
+            if space.active_fd is None:
+                space.active_fd = self._open_active(space)
+            seq = index.next_seq
+            record = _pack(seq, flags, key, payload)
+            os.write(space.active_fd, record)
+            if self.fsync:
+                os.fsync(space.active_fd)
+            self._track(space, seq, space.active_size, len(record), flags, key)
+            if flags & _TOMBSTONE:
+                index.tombstone(seq, key or "", len(record))
+            else:
+                index.add(seq, space.active, space.active_size, len(record), key)
+            space.active_size += len(record)
+            return seq
+
+    def _seal(self, space: _Namespace) -> None:
+        assert space.active is not None
+        if space.active_fd is not None:
+            os.fsync(space.active_fd)
+            os.close(space.active_fd)
+            space.active_fd = None
+        self._write_hint(space, space.active)
+        space.active += 1
+        space.active_size = 0
+
+    def _write_hint(self, space: _Namespace, segment: int) -> None:
+        hint = space.segment_path(segment).with_suffix(_HINT_SUFFIX)
+        keys_path = hint.with_suffix(_KEYS_SUFFIX)
+        if space.hint_keys:
+            keys_path.write_text(json.dumps(space.hint_keys), encoding="utf-8")
+        elif keys_path.exists():
+            keys_path.unlink()
+        tmp = hint.with_suffix(".tmp")
+        rows = np.array(space.hint_rows, dtype=_HINT_DTYPE)
+        np.concatenate([space.hint_base, rows]).tofile(str(tmp))
+        # The hint appears last, so a present hint always has its keys file.
+        os.replace(tmp, hint)
+        space.hint_base = space.hint_base[:0]
+        space.hint_rows = []
+        space.hint_keys = []
+
+    def _rewrite(self, namespace: str, space: _Namespace) -> None:
+        # Copy the live records, keeping their seqs, into segments numbered
+        # after the current ones; then drop the old files.
+        index = space.index
+        assert index is not None
+        old = space.segment_ids()
+        first = (max(old) + 1) if old else 1
+        marker = space.root / _COMPACTING_NAME
+        marker.write_text(json.dumps({"first": first}), encoding="utf-8")
+        fresh = _Namespace(space.root)
+        fresh.index = _SegmentIndex()
+        fresh.active = first
+        fresh.active_fd = self._open_active(fresh)
+        keys_at = {position: key for key, position in index.keys.items()}
+        for position, flag in enumerate(index.live):
+            if not flag:
+                continue
+            seq, payload = self._read(space, position)
+            if fresh.active_size >= self.segment_bytes:
+                self._seal(fresh)
+                fresh.active_fd = self._open_active(fresh)
+            key = keys_at.get(position)
+            record = _pack(seq, 0, key, payload)
+            os.write(fresh.active_fd, record)
+            self._track(fresh, seq, fresh.active_size, len(record), 0, key)
+            fresh.index.add(seq, fresh.active, fresh.active_size, len(record), key)
+            fresh.active_size += len(record)
+        fresh.index.next_seq = index.next_seq
+        os.fsync(fresh.active_fd)
+        tmp = space.root / f"{_NEXT_SEQ_NAME}.tmp"
+        tmp.write_text(str(index.next_seq), encoding="utf-8")
+        os.replace(tmp, space.root / _NEXT_SEQ_NAME)
+        tmp = marker.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"first": first, "done": True}), encoding="utf-8")
+        os.replace(tmp, marker)
+        self._release(space)
+        for segment in old:
+            self._unlink_segment(space, segment)
+        marker.unlink()
+        self._namespaces[namespace] = fresh
+        self.compactions += 1
+
+    def _track(
+        self, space: _Namespace, seq: int, offset: int, size: int, flags: int, key: Optional[str]
+    ) -> None:
+        if key is not None:
+            space.hint_keys.append((len(space.hint_base) + len(space.hint_rows), key))
+        space.hint_rows.append((seq, offset, size, flags))
+
+    def _unlink_segment(self, space: _Namespace, segment: int) -> None:
+        path = space.segment_path(segment)
+        for suffix in (_HINT_SUFFIX, _KEYS_SUFFIX, _SEGMENT_SUFFIX):
+            target = path.with_suffix(suffix)
+            if target.exists():
+                target.unlink()
+
+    def _release(self, space: _Namespace) -> None:
+        for view in space.maps.values():
+            view.close()
+        space.maps.clear()
+        if space.active_fd is not None:
+            os.close(space.active_fd)
+            space.active_fd = None
+        space.index = None
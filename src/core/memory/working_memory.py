@@ -1,17 +1,237 @@
 from __future__ import annotations
 
-from typing import Any, List
+import heapq
+from array import array
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, overload
+
+from core.models.signals import ActionProposal, Goal, Prediction
+
+KIND_OTHER = 0
+KIND_GOAL = 1
+KIND_PREDICTION = 2
+KIND_ACTION = 3
+
+_NIL = -1
+
+
+def item_kind(item: Any) -> int:
+    if isinstance(item, Goal):
+        return KIND_GOAL
+    if isinstance(item, Prediction):
+        return KIND_PREDICTION
+    if isinstance(item, ActionProposal):
+        return KIND_ACTION
+    return KIND_OTHER
+
+
+def default_salience(item: Any) -> float:
+    if isinstance(item, Goal):
+        value = item.priority
+    elif isinstance(item, Prediction):
+        value = item.confidence
+    elif isinstance(item, ActionProposal):
+        value = None if item.cost is None else -item.cost
+    else:
+        value = getattr(item, "salience", None)
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class WorkingMemoryView(Sequence[Any]):
+    # Read-only live view in insertion order (oldest first). Like a dict view
+    # it reflects the buffer as it is now; iterating across a mutation raises.
+    __slots__ = ("_buffer", "_kind")
+
+    def __init__(self, buffer: "WorkingMemoryBuffer", kind: Optional[int] = None) -> None:
+        self._buffer = buffer
+        self._kind = kind
+
+    def __len__(self) -> int:
+        if self._kind is None:
+            return self._buffer._size
+        return self._buffer._kind_counts[self._kind]
+
+    def __iter__(self) -> Iterator[Any]:
+        buffer = self._buffer
+        version = buffer._version
+        slot = buffer._head
+        while slot != _NIL:
+            if buffer._version != version:
+                raise RuntimeError("WorkingMemoryBuffer changed during iteration")
+            if self._kind is None or buffer._kinds[slot] == self._kind:
+                yield buffer._items[slot]
+            slot = buffer._next[slot]
+
+    @overload
+    def __getitem__(self, index: int) -> Any:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Any]:
+        ...
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return list(self)[index]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("working memory index out of range")
+        for position, item in enumerate(self):
+            if position == index:
+                return item
+        raise IndexError("working memory index out of range")  # pragma: no cover
+
+    def __repr__(self) -> str:
+        return f"WorkingMemoryView({list(self)!r})"
 
 
 class WorkingMemoryBuffer:
-    def __init__(self) -> None:
-        self.items: List[Any] = []
+    # Fixed-capacity store over preallocated slots: item references plus typed
+    # arrays for kind, salience, insertion sequence and the prev/next links of
+    # an insertion-ordered list. Free slots are a stack, so push and evict do
+    # not allocate. When full, the least salient item (oldest on ties) is
+    # evicted via a min-heap with lazy deletion; an incoming item less salient
+    # than everything held is rejected instead.
+    def __init__(self, capacity: int = 32) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self._items: List[Any] = [None] * capacity
+        self._kinds = bytearray(capacity)
+        self._salience = array("d", [0.0]) * capacity
+        self._seq = array("q", [_NIL]) * capacity
+        self._prev = array("l", [_NIL]) * capacity
+        self._next = array("l", [_NIL]) * capacity
+        self._kind_counts = [0, 0, 0, 0]
+        self._heap: List[Tuple[float, int, int]] = []
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        self._head = _NIL
+        self._tail = _NIL
+        self._size = 0
+        self._tick = 0
+        self._version = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def items(self) -> WorkingMemoryView:
+        return WorkingMemoryView(self)
 
-    def push(self, item: Any) -> None:
-        raise NotImplementedError("Working memory push not implemented.")
+    def push(self, item: Any, salience: Optional[float] = None) -> Optional[Any]:
+        # Returns the evicted item, the rejected ``item`` itself, or None.
+        score = default_salience(item) if salience is None else float(salience)
+        if not self._free:
+            victim = self._peek_victim()
+            if score < self._salience[victim]:
+                return item
+            evicted = self._items[victim]
+            self._release(victim)
+            self.evictions += 1
+        else:
+            evicted = None
+        slot = self._free.pop()
+        kind = item_kind(item)
+        self._items[slot] = item
+        self._kinds[slot] = kind
+        self._salience[slot] = score
+        self._seq[slot] = self._tick
+        self._prev[slot] = self._tail
+        self._next[slot] = _NIL
+        if self._tail != _NIL:
+            self._next[self._tail] = slot
+        else:
+            self._head = slot
+        self._tail = slot
+        self._kind_counts[kind] += 1
+        self._size += 1
+        heapq.heappush(self._heap, (score, self._tick, slot))
+        self._tick += 1
+        self._version += 1
+        if len(self._heap) > 2 * self.capacity:
+            self._compact_heap()
+        return evicted
+
+    def pop_least_salient(self) -> Optional[Any]:
+        if not self._size:
+            return None
+        victim = self._peek_victim()
+        item = self._items[victim]
+        self._release(victim)
+        return item
+
+    def remove(self, item: Any) -> bool:
+        slot = self._head
+        while slot != _NIL:
+            if self._items[slot] is item:
+                self._release(slot)
+                return True
+            slot = self._next[slot]
+        return False
 
     def clear(self) -> None:
-        raise NotImplementedError("Working memory clear not implemented.")
+        for slot in range(self.capacity):
+            self._items[slot] = None
+            self._seq[slot] = _NIL
+        self._kind_counts = [0, 0, 0, 0]
+        self._heap.clear()
+        self._free = list(range(self.capacity - 1, -1, -1))
+        self._head = self._tail = _NIL
+        self._size = 0
+        self._version += 1
+
+    def snapshot(self) -> WorkingMemoryView:
+        return WorkingMemoryView(self)
+
+    def goals(self) -> WorkingMemoryView:
+        return WorkingMemoryView(self, KIND_GOAL)
+
+    def predictions(self) -> WorkingMemoryView:
+        return WorkingMemoryView(self, KIND_PREDICTION)
+
+    def actions(self) -> WorkingMemoryView:
+        return WorkingMemoryView(self, KIND_ACTION)
+
+    def salience_of(self, item: Any) -> Optional[float]:
+        slot = self._head
+        while slot != _NIL:
+            if self._items[slot] is item:
+                return self._salience[slot]
+            slot = self._next[slot]
+        return None
+
+    def _peek_victim(self) -> int:
+        heap = self._heap
+        while heap:
+            score, seq, slot = heap[0]
+            if self._seq[slot] == seq:
+                return slot
+            heapq.heappop(heap)
+        raise RuntimeError("working memory heap out of sync")  # pragma: no cover
+
+    def _release(self, slot: int) -> None:
+        prev, nxt = self._prev[slot], self._next[slot]
+        if prev != _NIL:
+            self._next[prev] = nxt
+        else:
+            self._head = nxt
+        if nxt != _NIL:
+            self._prev[nxt] = prev
+        else:
+            self._tail = prev
+        self._kind_counts[self._kinds[slot]] -= 1
+        self._items[slot] = None
+        # A cleared sequence marks the slot's heap entry as stale.
+        self._seq[slot] = _NIL
+        self._free.append(slot)
+        self._size -= 1
+        self._version += 1
 
-    def snapshot(self) -> List[Any]:
-        raise NotImplementedError("Working memory snapshot not implemented.")
+    def _compact_heap(self) -> None:
+        self._heap = [entry for entry in self._heap if self._seq[entry[2]] == entry[1]]
+        heapq.heapify(self._heap)
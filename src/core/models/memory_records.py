@@ -8,12 +8,18 @@ from typing import Any, Optional
 class SelfStateSnapshot:
     timestamp: Optional[str] = None
     state: Optional[Any] = None
+    # Agent step the snapshot was taken at; when unset, the step after the
+    # previous snapshot's.
+    step: Optional[int] = None
 
 
 @dataclass
 class PredictionErrorRecord:
     timestamp: Optional[str] = None
     error: Optional[Any] = None
+    # What produced the prediction (a layer, sensor or model); statistics are
+    # kept per source.
+    source: Optional[str] = None
 
 
 @dataclass
@@ -28,6 +34,12 @@ class EpisodicMemoryRecord:
     timestamp: Optional[str] = None
     summary: Optional[str] = None
     details: Optional[Any] = None
+    task_id: Optional[str] = None
+    biome: Optional[str] = None
+    # Numeric time used for range filters (world ticks or epoch seconds);
+    # falls back to the parsed ISO ``timestamp`` when unset.
+    time: Optional[float] = None
+    embedding: Optional[Any] = None
 
 
 @dataclass
@@ -24,12 +24,19 @@ class Goal:
     priority: Optional[float] = None
 
 
+@dataclass
+class MacroAction:
+    actions: List[Any] = field(default_factory=list)
+    repeat: int = 1
+
+
 @dataclass
 class ActionProposal:
     action_id: Optional[str] = None
     action: Optional[Any] = None
     expected_outcome: Optional[str] = None
     cost: Optional[float] = None
+    repeat: Optional[int] = None
 
 
 @dataclass
@@ -1,9 +1,26 @@
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass, field
-from typing import Any, Dict, Optional
+from dataclasses import dataclass, field, fields
+from operator import attrgetter
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar
 
+_T = TypeVar("_T")
 
+
+def _slotted(cls: Type[_T]) -> Type[_T]:
+    # Equivalent of ``@dataclass(slots=True)``, which needs Python 3.10; the
+    # MineDojo venv is pinned to 3.9.
+    names = tuple(f.name for f in fields(cls))
+    body = dict(cls.__dict__)
+    for name in names:
+        body.pop(name, None)
+    body.pop("__dict__", None)
+    body.pop("__weakref__", None)
+    body["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, body)
+
+
+@_slotted
 @dataclass
 class HomeostasisState:
     life: Optional[float] = None
@@ -17,6 +34,7 @@ class HomeostasisState:
     is_dead: Optional[bool] = None
 
 
+@_slotted
 @dataclass
 class PositionState:
     xpos: Optional[float] = None
@@ -26,6 +44,7 @@ class PositionState:
     yaw: Optional[float] = None
 
 
+@_slotted
 @dataclass
 class BiomeState:
     biome_name: Optional[str] = None
@@ -35,6 +54,7 @@ class BiomeState:
     sea_level: Optional[float] = None
 
 
+@_slotted
 @dataclass
 class LightingWeatherState:
     light_level: Optional[float] = None
@@ -44,18 +64,21 @@ class LightingWeatherState:
     can_see_sky: Optional[bool] = None
 
 
+@_slotted
 @dataclass
 class WorldTimeState:
     world_time: Optional[float] = None
     total_time: Optional[float] = None
 
 
+@_slotted
 @dataclass
 class NearbyState:
     nearby_furnace: Optional[bool] = None
     nearby_crafting_table: Optional[bool] = None
 
 
+@_slotted
 @dataclass
 class InventoryState:
     inventory: Optional[Any] = None
@@ -63,6 +86,7 @@ class InventoryState:
     current_item_index: Optional[int] = None
 
 
+@_slotted
 @dataclass
 class MiscState:
     distance_travelled_cm: Optional[float] = None
@@ -73,6 +97,7 @@ class MiscState:
     name: Optional[str] = None
 
 
+@_slotted
 @dataclass
 class AgentState:
     homeostasis: HomeostasisState = field(default_factory=HomeostasisState)
@@ -87,63 +112,42 @@ class AgentState:
 
     @staticmethod
     def from_info(info: Dict[str, Any]) -> "AgentState":
-        state = AgentState()
         if not isinstance(info, dict):
-            return state
-
-        state.homeostasis.life = info.get("life")
-        state.homeostasis.armor = info.get("armor")
-        state.homeostasis.food = info.get("food")
-        state.homeostasis.saturation = info.get("saturation")
-        state.homeostasis.xp = info.get("xp")
-        state.homeostasis.air = info.get("air")
-        state.homeostasis.is_sleeping = info.get("is_sleeping")
-        state.homeostasis.is_alive = info.get("is_alive")
-        state.homeostasis.is_dead = info.get("is_dead")
-
-        state.position.xpos = info.get("xpos")
-        state.position.ypos = info.get("ypos")
-        state.position.zpos = info.get("zpos")
-        state.position.pitch = info.get("pitch")
-        state.position.yaw = info.get("yaw")
-
-        state.biome.biome_name = info.get("biome_name")
-        state.biome.biome_id = info.get("biome_id")
-        state.biome.biome_temperature = info.get("biome_temperature")
-        state.biome.biome_rainfall = info.get("biome_rainfall")
-        state.biome.sea_level = info.get("sea_level")
-
-        state.lighting_weather.light_level = info.get("light_level")
-        state.lighting_weather.sky_light_level = info.get("sky_light_level")
-        state.lighting_weather.sun_brightness = info.get("sun_brightness")
-        state.lighting_weather.is_raining = info.get("is_raining")
-        state.lighting_weather.can_see_sky = info.get("can_see_sky")
-
-        state.world_time.world_time = info.get("world_time")
-        state.world_time.total_time = info.get("total_time")
-
-        state.nearby.nearby_furnace = info.get("nearby_furnace")
-        state.nearby.nearby_crafting_table = info.get("nearby_crafting_table")
-
-        state.inventory_state.inventory = info.get("inventory")
-        state.inventory_state.inventories_available = info.get("inventories_available")
-        state.inventory_state.current_item_index = info.get("current_item_index")
-
-        state.misc.distance_travelled_cm = info.get("distance_travelled_cm")
-        state.misc.stat = info.get("stat")
-        state.misc.achievement = info.get("achievement")
-        state.misc.damage_source = info.get("damage_source")
-        state.misc.score = info.get("score")
-        state.misc.name = info.get("name")
-
-        state.voxels = info.get("voxels")
-        return state
+            return AgentState()
+        values = list(map(info.get, _INFO_KEYS))
+        return AgentState(
+            *[group(*values[start:stop]) for group, start, stop in _GROUP_SLICES],
+            values[-1],
+        )
 
     def to_dict(self, include_inventory: bool = False, include_voxels: bool = False) -> Dict[str, Any]:
-        data = asdict(self)
+        data: Dict[str, Any] = {}
+        for attr, names, getter in _GROUP_GETTERS:
+            data[attr] = dict(zip(names, getter(getattr(self, attr))))
         if not include_inventory:
             data["inventory_state"]["inventory"] = None
             data["inventory_state"]["inventories_available"] = None
-        if not include_voxels:
-            data["voxels"] = None
+        data["voxels"] = self.voxels if include_voxels else None
         return data
+
+
+# Field-to-slot map shared by ``from_info``/``to_dict``: every group field is
+# read from the ``info`` key of the same name, in declaration order, followed
+# by ``voxels``.
+def _build_slot_map() -> Tuple[Tuple[str, ...], Tuple[Any, ...], Tuple[Any, ...]]:
+    keys = []
+    slices = []
+    getters = []
+    for group_field in fields(AgentState):
+        if group_field.name == "voxels":
+            continue
+        group = group_field.default_factory  # type: ignore[misc]
+        names = tuple(f.name for f in fields(group))
+        slices.append((group, len(keys), len(keys) + len(names)))
+        getters.append((group_field.name, names, attrgetter(*names)))
+        keys.extend(names)
+    keys.append("voxels")
+    return tuple(keys), tuple(slices), tuple(getters)
+
+
+_INFO_KEYS, _GROUP_SLICES, _GROUP_GETTERS = _build_slot_map()
@@ -1,5 +1,13 @@
 from core.observability.config import LoggingConfig
 from core.observability.exceptions import install_exception_hooks
 from core.observability.logger import RunLogger
+from core.observability.state_stream import StateStreamReader
+from core.observability.summarizer import ObservationSummarizer
 
-__all__ = ["LoggingConfig", "RunLogger", "install_exception_hooks"]
+__all__ = [
+    "LoggingConfig",
+    "ObservationSummarizer",
+    "RunLogger",
+    "StateStreamReader",
+    "install_exception_hooks",
+]
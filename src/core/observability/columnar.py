@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.observability.state_stream import StateStreamReader
+
+COLUMNS_DIRNAME = "columns"
+SCHEMA_FILENAME = "schema.json"
+
+HOMEOSTASIS_FIELDS = ("life", "armor", "food", "saturation", "xp", "air")
+POSITION_FIELDS = ("xpos", "ypos", "zpos", "pitch", "yaw")
+
+# Column name -> numpy dtype. Missing numeric values are stored as NaN;
+# ``done`` defaults to False.
+TELEMETRY_SCHEMA: Dict[str, str] = {
+    "episode": "int32",
+    "step": "int64",
+    "reward": "float64",
+    "done": "bool",
+    **{name: "float32" for name in HOMEOSTASIS_FIELDS},
+    **{name: "float64" for name in POSITION_FIELDS},
+    "latency_ms": "float64",
+}
+
+PathLike = Union[str, Path]
+
+
+def _as_float(value: Any) -> float:
+    if value is None or isinstance(value, (dict, list, str)):
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    if not path.exists():
+        return
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                yield record
+
+
+class _RowBuilder:
+    def __init__(self) -> None:
+        self.rows: Dict[Tuple[int, int], Dict[str, Any]] = {}
+
+    def row(self, episode: int, step: int) -> Dict[str, Any]:
+        key = (episode, step)
+        row = self.rows.get(key)
+        if row is None:
+            row = {"episode": episode, "step": step}
+            self.rows[key] = row
+        return row
+
+    def add_state(self, row: Dict[str, Any], state: Any) -> None:
+        if not isinstance(state, dict):
+            return
+        homeostasis = state.get("homeostasis") or {}
+        position = state.get("position") or {}
+        for name in HOMEOSTASIS_FIELDS:
+            row[name] = homeostasis.get(name)
+        for name in POSITION_FIELDS:
+            row[name] = position.get(name)
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        ordered = [self.rows[key] for key in sorted(self.rows)]
+        columns: Dict[str, np.ndarray] = {}
+        for name, dtype in TELEMETRY_SCHEMA.items():
+            if dtype == "bool":
+                values: List[Any] = [bool(row.get(name)) for row in ordered]
+            elif dtype.startswith("int"):
+                values = [int(row.get(name) or 0) for row in ordered]
+            else:
+                values = [_as_float(row.get(name)) for row in ordered]
+            columns[name] = np.asarray(values, dtype=dtype)
+        return columns
+
+
+def _run_dir_columns(run_dir: Path) -> Dict[str, np.ndarray]:
+    builder = _RowBuilder()
+
+    state_path = run_dir / "state.jsonl"
+    if state_path.exists():
+        for step, state in StateStreamReader(state_path).iter_states():
+            if step is not None:
+                builder.add_state(builder.row(0, step), state)
+
+    for record in _iter_jsonl(run_dir / "events.jsonl"):
+        step = record.get("step")
+        payload = record.get("payload")
+        if step is None or not isinstance(payload, dict):
+            continue
+        if "reward" in payload or "done" in payload:
+            row = builder.row(0, step)
+            if "reward" in payload:
+                row["reward"] = payload["reward"]
+            if "done" in payload:
+                row["done"] = payload["done"]
+
+    for record in _iter_jsonl(run_dir / "llm.jsonl"):
+        step = record.get("step")
+        payload = record.get("payload")
+        if step is None or record.get("event") != "llm.response":
+            continue
+        latency = _as_float(payload.get("latency_ms")) if isinstance(payload, dict) else math.nan
+        if math.isnan(latency):
+            continue
+        # Several completions in one step add up to that step's LLM time.
+        row = builder.row(0, step)
+        row["latency_ms"] = _as_float(row.get("latency_ms") or 0.0) + latency
+
+    return builder.to_columns()
+
+
+def _telemetry_file_columns(path: Path) -> Dict[str, np.ndarray]:
+    builder = _RowBuilder()
+    episode = 0
+    last_step: Optional[int] = None
+    for record in _iter_jsonl(path):
+        step = record.get("step")
+        if not isinstance(step, int):
+            continue
+        # __main__.py appends every run to the same file; a step counter that
+        # goes backwards marks the start of the next episode.
+        if last_step is not None and step <= last_step:
+            episode += 1
+        last_step = step
+        row = builder.row(episode, step)
+        row["reward"] = record.get("reward")
+        row["done"] = record.get("done")
+        row["latency_ms"] = record.get("latency_ms")
+        builder.add_state(row, record.get("state"))
+    return builder.to_columns()
+
+
+def _write_columns(
+    out_dir: Path, columns: Mapping[str, np.ndarray], source: Path
+) -> Path:
+    col_dir = out_dir / COLUMNS_DIRNAME
+    col_dir.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    for name, values in columns.items():
+        np.save(col_dir / f"{name}.npy", np.ascontiguousarray(values))
+        rows = len(values)
+    schema = {
+        "source": str(source),
+        "rows": rows,
+        "columns": {name: str(values.dtype) for name, values in columns.items()},
+    }
+    (col_dir / SCHEMA_FILENAME).write_text(
+        json.dumps(schema, ensure_ascii=True, indent=2), encoding="utf-8"
+    )
+    return col_dir
+
+
+def is_run_finished(run_dir: PathLike) -> bool:
+    events = Path(run_dir) / "events.jsonl"
+    if not events.exists():
+        return False
+    with events.open("rb") as fh:
+        fh.seek(0, 2)
+        size = fh.tell()
+        fh.seek(max(0, size - 4096))
+        tail = fh.read().decode("utf-8", "replace")
+    return '"event": "run.end"' in tail
+
+
+def compact_run(run_dir: PathLike) -> Path:
+    run_dir = Path(run_dir)
+    return _write_columns(run_dir, _run_dir_columns(run_dir), run_dir)
+
+
+def compact_telemetry(path: PathLike, out_dir: Optional[PathLike] = None) -> Path:
+    path = Path(path)
+    target = Path(out_dir) if out_dir is not None else path.with_suffix("")
+    return _write_columns(target, _telemetry_file_columns(path), path)
+
+
+def compact_runs(log_root: PathLike, force: bool = False) -> List[Path]:
+    compacted: List[Path] = []
+    root = Path(log_root)
+    if not root.exists():
+        return compacted
+    for run_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        if (run_dir / COLUMNS_DIRNAME / SCHEMA_FILENAME).exists() and not force:
+            continue
+        if not force and not is_run_finished(run_dir):
+            continue
+        compacted.append(compact_run(run_dir))
+    return compacted
+
+
+class ColumnarTelemetry:
+    def __init__(self, root: PathLike) -> None:
+        self.root = Path(root)
+        self._schemas: Optional[Dict[str, Dict[str, Any]]] = None
+
+    @property
+    def schemas(self) -> Dict[str, Dict[str, Any]]:
+        if self._schemas is None:
+            self._schemas = {}
+            candidates: Iterable[Path]
+            if (self.root / SCHEMA_FILENAME).exists():
+                candidates = [self.root / SCHEMA_FILENAME]
+            else:
+                candidates = sorted(self.root.glob(f"**/{COLUMNS_DIRNAME}/{SCHEMA_FILENAME}"))
+            for schema_path in candidates:
+                col_dir = schema_path.parent
+                key = col_dir.parent.name if col_dir.name == COLUMNS_DIRNAME else col_dir.name
+                self._schemas[key] = {
+                    "dir": col_dir,
+                    **json.loads(schema_path.read_text(encoding="utf-8")),
+                }
+        return self._schemas
+
+    def runs(self) -> List[str]:
+        return list(self.schemas)
+
+    def column(self, run: str, name: str, mmap: bool = True) -> np.ndarray:
+        schema = self.schemas[run]
+        if name not in schema["columns"]:
+            raise KeyError(f"Unknown column {name!r} for run {run!r}")
+        return np.load(schema["dir"] / f"{name}.npy", mmap_mode="r" if mmap else None)
+
+    def read_run(self, run: str, columns: Sequence[str], mmap: bool = True) -> Dict[str, np.ndarray]:
+        return {name: self.column(run, name, mmap=mmap) for name in columns}
+
+    def read(
+        self,
+        columns: Sequence[str],
+        runs: Optional[Sequence[str]] = None,
+        with_run_index: bool = False,
+    ) -> Dict[str, np.ndarray]:
+        selected = list(runs) if runs is not None else self.runs()
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in columns}
+        run_index: List[np.ndarray] = []
+        for position, run in enumerate(selected):
+            for name in columns:
+                parts[name].append(self.column(run, name))
+            if with_run_index:
+                run_index.append(np.full(self.schemas[run]["rows"], position, dtype=np.int32))
+        out: Dict[str, np.ndarray] = {}
+        for name in columns:
+            dtype = TELEMETRY_SCHEMA.get(name, "float64")
+            out[name] = np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype=dtype)
+        if with_run_index:
+            out["run"] = np.concatenate(run_index) if run_index else np.empty(0, dtype=np.int32)
+        return out
+
+    def export_parquet(self, path: PathLike, columns: Optional[Sequence[str]] = None) -> Path:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except Exception as exc:  # pragma: no cover - optional dependency
+            raise ImportError("pyarrow package is required for Parquet export") from exc
+
+        names = list(columns) if columns is not None else list(TELEMETRY_SCHEMA)
+        data = self.read(names, with_run_index=True)
+        runs = self.runs()
+        table = pa.table(
+            {
+                "run": pa.DictionaryArray.from_arrays(
+                    pa.array(data.pop("run")), pa.array(runs)
+                ),
+                **{name: pa.array(np.asarray(values)) for name, values in data.items()},
+            }
+        )
+        path = Path(path)
+        pq.write_table(table, path)
+        return path
+
+
+if __name__ == "__main__":
+    import sys
+
+    for target in sys.argv[1:] or ["logs/runs"]:
+        target_path = Path(target)
+        if target_path.is_file():
+            print(compact_telemetry(target_path))
+        else:
+            for compacted_dir in compact_runs(target_path):
+                print(compacted_dir)
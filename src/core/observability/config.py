@@ -23,6 +23,15 @@ def _env_int(value: Optional[str], default: int) -> int:
         return default
 
 
+def _env_float(value: Optional[str], default: float) -> float:
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
 @dataclass
 class LoggingConfig:
     log_root: Path = Path("logs/runs")
@@ -31,6 +40,7 @@ class LoggingConfig:
     log_prompts: bool = True
     log_memory: bool = True
     log_state: bool = True
+    state_keyframe_interval: int = 1
     max_field_bytes: int = 20000
     redact_keys: Sequence[str] = field(
         default_factory=lambda: (
@@ -42,6 +52,11 @@ class LoggingConfig:
         )
     )
     include_raw_llm: bool = True
+    async_writes: bool = False
+    queue_size: int = 10000
+    flush_interval_s: float = 0.5
+    flush_batch_size: int = 256
+    backpressure: str = "block"
 
     @classmethod
     def from_env(cls) -> "LoggingConfig":
@@ -51,6 +66,7 @@ class LoggingConfig:
         log_prompts = _env_bool(os.getenv("LOG_PROMPTS"), True)
         log_memory = _env_bool(os.getenv("LOG_MEMORY"), True)
         log_state = _env_bool(os.getenv("LOG_STATE"), True)
+        state_keyframe_interval = _env_int(os.getenv("LOG_STATE_KEYFRAME_INTERVAL"), 1)
         max_field_bytes = _env_int(os.getenv("LOG_MAX_FIELD_BYTES"), 20000)
         redact_keys_raw = os.getenv("LOG_REDACT_KEYS")
         redact_keys = None
@@ -59,6 +75,11 @@ class LoggingConfig:
                 key.strip().lower() for key in redact_keys_raw.split(",") if key.strip()
             )
         include_raw_llm = _env_bool(os.getenv("LOG_INCLUDE_RAW_LLM"), True)
+        async_writes = _env_bool(os.getenv("LOG_ASYNC"), False)
+        queue_size = _env_int(os.getenv("LOG_QUEUE_SIZE"), 10000)
+        flush_interval_s = _env_float(os.getenv("LOG_FLUSH_INTERVAL_S"), 0.5)
+        flush_batch_size = _env_int(os.getenv("LOG_FLUSH_BATCH_SIZE"), 256)
+        backpressure = os.getenv("LOG_BACKPRESSURE", "block").strip().lower()
 
         return cls(
             log_root=log_root,
@@ -67,7 +88,13 @@ class LoggingConfig:
             log_prompts=log_prompts,
             log_memory=log_memory,
             log_state=log_state,
+            state_keyframe_interval=state_keyframe_interval,
             max_field_bytes=max_field_bytes,
             redact_keys=redact_keys or cls().redact_keys,
             include_raw_llm=include_raw_llm,
+            async_writes=async_writes,
+            queue_size=queue_size,
+            flush_interval_s=flush_interval_s,
+            flush_batch_size=flush_batch_size,
+            backpressure=backpressure,
         )
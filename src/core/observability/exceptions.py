@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import atexit
 import sys
 import threading
 from typing import Optional
@@ -20,10 +21,13 @@ def install_exception_hooks(logger: Optional[RunLogger]) -> None:
     except Exception:
         pass
 
+    atexit.register(logger.close)
+
     original_sys_hook = sys.excepthook
 
     def _sys_hook(exc_type, exc, tb):
         logger.exception(exc, context={"uncaught": True})
+        logger.flush(timeout=5.0)
         original_sys_hook(exc_type, exc, tb)
 
     sys.excepthook = _sys_hook
@@ -37,6 +41,7 @@ def install_exception_hooks(logger: Optional[RunLogger]) -> None:
                 args.exc_value,
                 context={"thread": thread_name, "uncaught": True},
             )
+            logger.flush(timeout=5.0)
             if original_thread_hook:
                 original_thread_hook(args)
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import faulthandler
 import json
 import os
 import platform
@@ -12,6 +13,8 @@ from typing import Any, Optional
 from core.observability.config import LoggingConfig
 from core.observability.paths import RunPaths, create_run_dir
 from core.observability.serializer import safe_serialize
+from core.observability.state_stream import StateDeltaEncoder
+from core.observability.writer import AsyncJsonlWriter
 
 
 def _utc_ts() -> str:
@@ -31,6 +34,16 @@ class RunLogger:
             "tracebacks_jsonl": self.paths.tracebacks_jsonl.open("a", encoding="utf-8"),
         }
         self._faulthandler_file = None
+        self._state_encoder = StateDeltaEncoder(config.state_keyframe_interval)
+        self._writer: Optional[AsyncJsonlWriter] = None
+        if config.async_writes:
+            self._writer = AsyncJsonlWriter(
+                self._files,
+                queue_size=config.queue_size,
+                flush_interval_s=config.flush_interval_s,
+                batch_size=config.flush_batch_size,
+                backpressure=config.backpressure,
+            )
         self._write_run_metadata()
 
     def _write_run_metadata(self) -> None:
@@ -46,30 +59,48 @@ class RunLogger:
                 "log_prompts": self.config.log_prompts,
                 "log_memory": self.config.log_memory,
                 "log_state": self.config.log_state,
+                "state_keyframe_interval": self.config.state_keyframe_interval,
                 "max_field_bytes": self.config.max_field_bytes,
                 "include_raw_llm": self.config.include_raw_llm,
                 "redact_keys": list(self.config.redact_keys),
+                "async_writes": self.config.async_writes,
+                "queue_size": self.config.queue_size,
+                "flush_interval_s": self.config.flush_interval_s,
+                "flush_batch_size": self.config.flush_batch_size,
+                "backpressure": self.config.backpressure,
             },
         }
         self.paths.run_json.write_text(
             json.dumps(metadata, ensure_ascii=True, indent=2), encoding="utf-8"
         )
 
+    def _serialize(self, payload: Any) -> Any:
+        return safe_serialize(
+            payload,
+            max_bytes=self.config.max_field_bytes,
+            redact_keys=self.config.redact_keys,
+        )
+
     def _emit(self, stream_key: str, event: str, payload: Any, step: Optional[int]) -> None:
+        self._emit_serialized(stream_key, event, self._serialize(payload), step)
+
+    def _emit_serialized(
+        self, stream_key: str, event: str, payload: Any, step: Optional[int]
+    ) -> bool:
+        # False when the async writer dropped the record (backpressure="drop").
         record = {
             "ts": _utc_ts(),
             "run_id": self.config.run_id,
             "step": step,
             "event": event,
-            "payload": safe_serialize(
-                payload,
-                max_bytes=self.config.max_field_bytes,
-                redact_keys=self.config.redact_keys,
-            ),
+            "payload": payload,
         }
+        if self._writer is not None:
+            return self._writer.submit(stream_key, record)
         fh = self._files[stream_key]
         fh.write(json.dumps(record, ensure_ascii=True) + "\n")
         fh.flush()
+        return True
 
     def event(self, name: str, payload: Any, step: Optional[int] = None) -> None:
         self._emit("events", name, payload, step)
@@ -103,7 +134,16 @@ class RunLogger:
                 data = agent_state.to_dict()
             except Exception:
                 data = agent_state
-        self._emit("state", "state.snapshot", {"state": data}, step)
+        if self.config.state_keyframe_interval <= 1:
+            self._emit("state", "state.snapshot", {"state": data}, step)
+            return
+        # Diff the serialized payload so keyframes and deltas describe exactly
+        # what a full snapshot would have written (see StateStreamReader).
+        event, payload = self._state_encoder.encode(self._serialize({"state": data}))
+        if not self._emit_serialized("state", event, payload, step):
+            # Later deltas would build on the dropped record; restart the
+            # chain so the next snapshot is a keyframe.
+            self._state_encoder.reset()
 
     def exception(self, exc: BaseException, context: Any = None, step: Optional[int] = None) -> None:
         tb = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
@@ -114,20 +154,42 @@ class RunLogger:
             "context": context,
         }
         self._emit("tracebacks_jsonl", "exception", payload, step)
+        if self._writer is not None:
+            self._writer.submit("tracebacks", tb)
+            return
         self._files["tracebacks"].write(tb + "\n")
         self._files["tracebacks"].flush()
 
+    @property
+    def dropped_events(self) -> int:
+        return self._writer.dropped if self._writer is not None else 0
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        if self._writer is not None:
+            self._writer.flush(timeout)
+            return
+        for fh in self._files.values():
+            try:
+                fh.flush()
+            except Exception:
+                pass
+
     def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
         for fh in self._files.values():
             try:
                 fh.close()
             except Exception:
                 pass
         if self._faulthandler_file is not None:
+            # A fatal error after this point must not write to a closed fd.
+            faulthandler.disable()
             try:
                 self._faulthandler_file.close()
             except Exception:
                 pass
+            self._faulthandler_file = None
 
     def __enter__(self) -> "RunLogger":
         return self
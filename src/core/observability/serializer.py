@@ -1,14 +1,31 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict, is_dataclass
-from typing import Any, Iterable, Mapping, Optional, Sequence
+from dataclasses import asdict, fields, is_dataclass
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Dict, FrozenSet, Mapping, Optional, Sequence, Tuple
 
 try:
     import numpy as np
 except Exception:  # pragma: no cover - numpy optional
     np = None  # type: ignore
 
+from core.observability.summarizer import array_stats
+
+MAX_DEPTH = 6
+MAX_SEQUENCE_ITEMS = 50
+SEQUENCE_SAMPLE_ITEMS = 10
+
+_MAX_DEPTH_MARKER = "<max_depth>"
+_REDACTED = "<redacted>"
+_MAX_DEPTH_SIZE = len(encode_basestring_ascii(_MAX_DEPTH_MARKER))
+_REDACTED_SIZE = len(encode_basestring_ascii(_REDACTED))
+
+# Every handler returns ``(value, size)`` where ``size`` is the length of
+# ``json.dumps(value, ensure_ascii=True)``. Carrying the size upwards lets a
+# mapping decide whether to truncate without re-encoding its children.
+Sized = Tuple[Any, int]
+
 
 def _summarize_numpy(array: Any) -> Mapping[str, Any]:
     summary: dict[str, Any] = {
@@ -16,10 +33,7 @@ def _summarize_numpy(array: Any) -> Mapping[str, Any]:
         "shape": list(getattr(array, "shape", ()) or ()),
         "dtype": str(getattr(array, "dtype", "")),
     }
-    if np is not None and isinstance(array, np.ndarray) and array.size:
-        if np.issubdtype(array.dtype, np.number):
-            summary["min"] = float(np.nanmin(array))
-            summary["max"] = float(np.nanmax(array))
+    summary.update(array_stats(array))
     return summary
 
 
@@ -29,71 +43,218 @@ def _truncate_string(value: str, max_bytes: int) -> str:
     return value[:max_bytes] + "...(truncated)"
 
 
-def _truncate_json(value: Any, max_bytes: int, obj_type: str) -> Any:
-    try:
-        encoded = json.dumps(value, ensure_ascii=True)
-    except Exception:
-        return _truncate_string(repr(value), max_bytes)
-    if len(encoded) <= max_bytes:
-        return value
-    return {"type": obj_type, "truncated": True, "bytes": len(encoded)}
+def _truncated_marker(obj_type: str, encoded_len: int) -> Sized:
+    marker = {"type": obj_type, "truncated": True, "bytes": encoded_len}
+    return marker, len(json.dumps(marker, ensure_ascii=True))
 
 
-def safe_serialize(
-    obj: Any,
-    max_bytes: int = 20000,
-    redact_keys: Optional[Sequence[str]] = None,
-    _depth: int = 0,
-) -> Any:
-    if redact_keys is None:
-        redact_keys = ()
-    redact_set = {key.lower() for key in redact_keys}
+def _float_size(value: float) -> int:
+    if value != value:
+        return 3  # NaN
+    if value == float("inf"):
+        return 8  # Infinity
+    if value == -float("inf"):
+        return 9  # -Infinity
+    return len(float.__repr__(value))
 
-    if _depth > 6:
-        return "<max_depth>"
 
-    if obj is None or isinstance(obj, (bool, int, float)):
-        return obj
+def _container_size(item_sizes: Sequence[int]) -> int:
+    if not item_sizes:
+        return 2
+    return 2 + sum(item_sizes) + 2 * (len(item_sizes) - 1)
 
-    if isinstance(obj, str):
-        return _truncate_string(obj, max_bytes)
 
-    if isinstance(obj, bytes):
-        return {"type": "bytes", "len": len(obj)}
+class _Serializer:
+    __slots__ = ("max_bytes", "redact_set")
 
-    if np is not None and isinstance(obj, np.ndarray):
-        return _summarize_numpy(obj)
+    def __init__(self, max_bytes: int, redact_set: FrozenSet[str]) -> None:
+        self.max_bytes = max_bytes
+        self.redact_set = redact_set
 
-    if is_dataclass(obj):
-        return safe_serialize(asdict(obj), max_bytes, redact_keys, _depth + 1)
+    # ``flat`` mirrors ``dataclasses.asdict``: inside a dataclass, nested
+    # dataclasses reached through dicts, lists and tuples are already plain
+    # dicts and therefore do not consume an extra depth level.
+    def serialize(self, obj: Any, depth: int, flat: bool = False) -> Sized:
+        if depth > MAX_DEPTH:
+            return _MAX_DEPTH_MARKER, _MAX_DEPTH_SIZE
+        handler = _HANDLERS.get(type(obj))
+        if handler is None:
+            handler = _resolve_handler(type(obj))
+        return handler(self, obj, depth, flat)
 
-    if isinstance(obj, Mapping):
-        out: dict[str, Any] = {}
-        for key, value in obj.items():
+    def mapping_items(
+        self, items: Any, depth: int, flat: bool, obj_type: str
+    ) -> Sized:
+        out: Dict[str, Any] = {}
+        sizes: Dict[str, int] = {}
+        child_depth = depth + 1
+        redact_set = self.redact_set
+        for key, value in items:
             key_str = str(key)
             if key_str.lower() in redact_set:
-                out[key_str] = "<redacted>"
+                out[key_str] = _REDACTED
+                sizes[key_str] = _REDACTED_SIZE
             else:
-                out[key_str] = safe_serialize(value, max_bytes, redact_keys, _depth + 1)
-        return _truncate_json(out, max_bytes, type(obj).__name__)
+                out[key_str], sizes[key_str] = self.serialize(value, child_depth, flat)
+        size = _container_size(
+            [len(encode_basestring_ascii(key)) + 2 + size for key, size in sizes.items()]
+        )
+        if size <= self.max_bytes:
+            return out, size
+        return _truncated_marker(obj_type, size)
 
-    if isinstance(obj, (list, tuple, set)):
+    def sequence(self, obj: Any, depth: int, flat: bool) -> Sized:
         seq = list(obj)
-        if len(seq) > 50:
-            sample = [
-                safe_serialize(item, max_bytes, redact_keys, _depth + 1)
-                for item in seq[:10]
-            ]
-            return {
-                "type": type(obj).__name__,
-                "len": len(seq),
-                "sample": sample,
-            }
-        return [
-            safe_serialize(item, max_bytes, redact_keys, _depth + 1) for item in seq
-        ]
+        child_depth = depth + 1
+        if len(seq) > MAX_SEQUENCE_ITEMS:
+            sample = []
+            sample_sizes = []
+            for item in seq[:SEQUENCE_SAMPLE_ITEMS]:
+                value, size = self.serialize(item, child_depth, flat)
+                sample.append(value)
+                sample_sizes.append(size)
+            type_name = type(obj).__name__
+            out = {"type": type_name, "len": len(seq), "sample": sample}
+            size = _container_size(
+                [
+                    8 + len(encode_basestring_ascii(type_name)),
+                    7 + len(str(len(seq))),
+                    10 + _container_size(sample_sizes),
+                ]
+            )
+            return out, size
+        values = []
+        sizes = []
+        for item in seq:
+            value, size = self.serialize(item, child_depth, flat)
+            values.append(value)
+            sizes.append(size)
+        return values, _container_size(sizes)
+
+    def repr_fallback(self, obj: Any) -> Sized:
+        text = repr(obj)
+        size = len(encode_basestring_ascii(text))
+        if size <= self.max_bytes:
+            return text, size
+        return _truncated_marker(type(obj).__name__, size)
+
+
+def _handle_none(ctx: _Serializer, obj: Any, depth: int, flat: bool) -> Sized:
+    return obj, 4
+
+
+def _handle_bool(ctx: _Serializer, obj: Any, depth: int, flat: bool) -> Sized:
+    return obj, 4 if obj else 5
+
+
+def _handle_int(ctx: _Serializer, obj: Any, depth: int, flat: bool) -> Sized:
+    return obj, len(int.__repr__(obj))
+
+
+def _handle_float(ctx: _Serializer, obj: Any, depth: int, flat: bool) -> Sized:
+    return obj, _float_size(obj)
+
+
+def _handle_str(ctx: _Serializer, obj: Any, depth: int, flat: bool) -> Sized:
+    value = _truncate_string(obj, ctx.max_bytes)
+    return value, len(encode_basestring_ascii(value))
+
+
+def _handle_bytes(ctx: _Serializer, obj: Any, depth: int, flat: bool) -> Sized:
+    value = {"type": "bytes", "len": len(obj)}
+    return value, 26 + len(str(len(obj)))
 
+
+def _handle_ndarray(ctx: _Serializer, obj: Any, depth: int, flat: bool) -> Sized:
+    value = _summarize_numpy(obj)
+    return value, len(json.dumps(value, ensure_ascii=True))
+
+
+def _handle_dataclass(ctx: _Serializer, obj: Any, depth: int, flat: bool) -> Sized:
+    names = _DATACLASS_FIELDS.get(type(obj))
+    if names is None:
+        names = tuple(f.name for f in fields(obj))
+        _DATACLASS_FIELDS[type(obj)] = names
+    items = [(name, getattr(obj, name)) for name in names]
+    if flat:
+        return ctx.mapping_items(items, depth, True, "dict")
+    if depth + 1 > MAX_DEPTH:
+        return _MAX_DEPTH_MARKER, _MAX_DEPTH_SIZE
+    return ctx.mapping_items(items, depth + 1, True, "dict")
+
+
+def _handle_mapping(ctx: _Serializer, obj: Any, depth: int, flat: bool) -> Sized:
+    return ctx.mapping_items(obj.items(), depth, flat, type(obj).__name__)
+
+
+def _handle_sequence(ctx: _Serializer, obj: Any, depth: int, flat: bool) -> Sized:
+    return ctx.sequence(obj, depth, flat)
+
+
+def _handle_set(ctx: _Serializer, obj: Any, depth: int, flat: bool) -> Sized:
+    # ``asdict`` copies sets verbatim, so dataclasses inside them are not flattened.
+    return ctx.sequence(obj, depth, False)
+
+
+def _handle_object(ctx: _Serializer, obj: Any, depth: int, flat: bool) -> Sized:
+    if is_dataclass(obj):
+        # Dataclass *types* land here; keep the historical asdict() behaviour.
+        return ctx.serialize(asdict(obj), depth + 1)
     if hasattr(obj, "__dict__"):
-        return safe_serialize(vars(obj), max_bytes, redact_keys, _depth + 1)
+        return ctx.serialize(vars(obj), depth + 1)
+    return ctx.repr_fallback(obj)
 
-    return _truncate_json(repr(obj), max_bytes, type(obj).__name__)
+
+Handler = Callable[[_Serializer, Any, int, bool], Sized]
+
+_HANDLERS: Dict[type, Handler] = {
+    type(None): _handle_none,
+    bool: _handle_bool,
+    int: _handle_int,
+    float: _handle_float,
+    str: _handle_str,
+    bytes: _handle_bytes,
+    dict: _handle_mapping,
+    list: _handle_sequence,
+    tuple: _handle_sequence,
+    set: _handle_set,
+}
+_DATACLASS_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+
+def _resolve_handler(obj_type: type) -> Handler:
+    if issubclass(obj_type, bool):
+        handler: Handler = _handle_bool
+    elif issubclass(obj_type, int):
+        handler = _handle_int
+    elif issubclass(obj_type, float):
+        handler = _handle_float
+    elif issubclass(obj_type, str):
+        handler = _handle_str
+    elif issubclass(obj_type, bytes):
+        handler = _handle_bytes
+    elif np is not None and issubclass(obj_type, np.ndarray):
+        handler = _handle_ndarray
+    elif is_dataclass(obj_type):
+        handler = _handle_dataclass
+    elif issubclass(obj_type, Mapping):
+        handler = _handle_mapping
+    elif issubclass(obj_type, set):
+        handler = _handle_set
+    elif issubclass(obj_type, (list, tuple)):
+        handler = _handle_sequence
+    else:
+        handler = _handle_object
+    _HANDLERS[obj_type] = handler
+    return handler
+
+
+def safe_serialize(
+    obj: Any,
+    max_bytes: int = 20000,
+    redact_keys: Optional[Sequence[str]] = None,
+    _depth: int = 0,
+) -> Any:
+    redact_set = frozenset(key.lower() for key in redact_keys or ())
+    value, _ = _Serializer(max_bytes, redact_set).serialize(obj, _depth)
+    return value
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import copy
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+KEYFRAME_EVENT = "state.snapshot"
+DELTA_EVENT = "state.delta"
+
+_MISSING = object()
+_RECORD_HEAD = re.compile(
+    r'"step": (null|-?\d+), "event": "(state\.snapshot|state\.delta)"'
+)
+
+KeyPath = List[str]
+
+
+def diff_state(previous: Any, current: Any) -> Dict[str, Any]:
+    changes: List[List[Any]] = []
+    removed: List[KeyPath] = []
+    _diff(previous, current, [], changes, removed)
+    delta: Dict[str, Any] = {"set": changes}
+    if removed:
+        delta["unset"] = removed
+    return delta
+
+
+def _diff(
+    previous: Any,
+    current: Any,
+    path: KeyPath,
+    changes: List[List[Any]],
+    removed: List[KeyPath],
+) -> None:
+    if isinstance(previous, dict) and isinstance(current, dict):
+        for key, value in current.items():
+            old = previous.get(key, _MISSING)
+            if old is _MISSING:
+                changes.append([path + [key], value])
+            else:
+                _diff(old, value, path + [key], changes, removed)
+        for key in previous:
+            if key not in current:
+                removed.append(path + [key])
+        return
+    if type(previous) is not type(current) or previous != current:
+        changes.append([path, current])
+
+
+def apply_state_delta(state: Any, delta: Dict[str, Any]) -> Any:
+    for path, value in delta.get("set", ()):
+        if not path:
+            state = value
+            continue
+        node = state
+        for key in path[:-1]:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = {}
+                node[key] = child
+            node = child
+        node[path[-1]] = value
+    for path in delta.get("unset", ()):
+        node = state
+        for key in path[:-1]:
+            node = node.get(key) if isinstance(node, dict) else None
+            if node is None:
+                break
+        if isinstance(node, dict):
+            node.pop(path[-1], None)
+    return state
+
+
+class StateDeltaEncoder:
+    def __init__(self, keyframe_interval: int = 1) -> None:
+        self.keyframe_interval = max(1, keyframe_interval)
+        self._previous: Any = None
+        self._count = 0
+
+    def encode(self, payload: Any) -> Tuple[str, Any]:
+        keyframe = self._count % self.keyframe_interval == 0 or self._previous is None
+        self._count += 1
+        previous, self._previous = self._previous, payload
+        if keyframe:
+            return KEYFRAME_EVENT, payload
+        return DELTA_EVENT, diff_state(previous, payload)
+
+    def reset(self) -> None:
+        self._previous = None
+        self._count = 0
+
+
+class StateStreamReader:
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._index: Optional[List[Tuple[int, Optional[int], bool]]] = None
+
+    def _build_index(self) -> List[Tuple[int, Optional[int], bool]]:
+        index: List[Tuple[int, Optional[int], bool]] = []
+        with self.path.open("rb") as fh:
+            offset = 0
+            for raw in fh:
+                match = _RECORD_HEAD.search(raw[:256].decode("ascii", "replace"))
+                if match is not None:
+                    step = None if match.group(1) == "null" else int(match.group(1))
+                    index.append((offset, step, match.group(2) == KEYFRAME_EVENT))
+                offset += len(raw)
+        return index
+
+    @property
+    def index(self) -> List[Tuple[int, Optional[int], bool]]:
+        if self._index is None:
+            self._index = self._build_index()
+        return self._index
+
+    def steps(self) -> List[Optional[int]]:
+        return [step for _, step, _ in self.index]
+
+    def state_at(self, step: int) -> Optional[Dict[str, Any]]:
+        index = self.index
+        target = None
+        for position, (_, record_step, _) in enumerate(index):
+            if record_step is not None and record_step <= step:
+                target = position
+            elif record_step is not None:
+                break
+        if target is None:
+            return None
+        start = target
+        while start >= 0 and not index[start][2]:
+            start -= 1
+        if start < 0:
+            raise ValueError(f"No keyframe precedes step {step} in {self.path}")
+        payload: Any = None
+        with self.path.open("rb") as fh:
+            for offset, _, _ in index[start : target + 1]:
+                fh.seek(offset)
+                payload = self._apply(payload, json.loads(fh.readline()))
+        return _state_of(payload)
+
+    def iter_states(self) -> Iterator[Tuple[Optional[int], Dict[str, Any]]]:
+        payload: Any = None
+        with self.path.open("rb") as fh:
+            for raw in fh:
+                record = json.loads(raw)
+                if record.get("event") not in (KEYFRAME_EVENT, DELTA_EVENT):
+                    continue
+                payload = self._apply(payload, record)
+                yield record.get("step"), copy.deepcopy(_state_of(payload))
+
+    @staticmethod
+    def _apply(payload: Any, record: Dict[str, Any]) -> Any:
+        if record.get("event") == KEYFRAME_EVENT:
+            return record.get("payload")
+        if payload is None:
+            raise ValueError("State delta encountered before any keyframe.")
+        return apply_state_delta(payload, record.get("payload") or {})
+
+
+def _state_of(payload: Any) -> Any:
+    return payload.get("state") if isinstance(payload, dict) else payload
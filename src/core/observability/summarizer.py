@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - numpy optional
+    np = None  # type: ignore
+
+# Arrays larger than this are reduced block by block so that min/max (and the
+# optional moments) are computed while each block is still cache-resident,
+# i.e. a single pass over main memory instead of one pass per statistic.
+BLOCK_BYTES = 256 * 1024
+
+Reducer = Callable[[Any], Dict[str, float]]
+Summarizer = Callable[[Any], Any]
+
+
+def _int_minmax(flat: Any) -> Tuple[Any, Any]:
+    return flat.min(), flat.max()
+
+
+def _float_minmax(flat: Any) -> Tuple[Any, Any]:
+    # fmin/fmax ignore NaN like nanmin/nanmax but skip their wrapper and the
+    # all-NaN warning; an all-NaN input still yields NaN.
+    return np.fmin.reduce(flat), np.fmax.reduce(flat)
+
+
+def _complex_minmax(flat: Any) -> Tuple[Any, Any]:
+    return np.nanmin(flat), np.nanmax(flat)
+
+
+def _minmax_kernel(dtype: Any) -> Callable[[Any], Tuple[Any, Any]]:
+    if np.issubdtype(dtype, np.integer):
+        return _int_minmax
+    if np.issubdtype(dtype, np.floating):
+        return _float_minmax
+    return _complex_minmax
+
+
+def _make_reducer(dtype: Any, include_moments: bool) -> Optional[Reducer]:
+    if np is None or not np.issubdtype(dtype, np.number):
+        return None
+    minmax = _minmax_kernel(dtype)
+    moments = include_moments and not np.issubdtype(dtype, np.complexfloating)
+    nan_aware = np.issubdtype(dtype, np.floating)
+    block_items = max(1, BLOCK_BYTES // max(1, np.dtype(dtype).itemsize))
+
+    def reduce(array: Any) -> Dict[str, float]:
+        flat = array.reshape(-1)
+        size = flat.size
+        if size <= block_items:
+            lo, hi = minmax(flat)
+            stats = {"min": float(lo), "max": float(hi)}
+            if moments:
+                _add_moments(stats, *_block_moments(flat, nan_aware))
+            return stats
+        lows: List[Any] = []
+        highs: List[Any] = []
+        total = total_sq = 0.0
+        count = 0
+        for start in range(0, size, block_items):
+            block = flat[start : start + block_items]
+            block_lo, block_hi = minmax(block)
+            lows.append(block_lo)
+            highs.append(block_hi)
+            if moments:
+                block_total, block_sq, block_count = _block_moments(block, nan_aware)
+                total += block_total
+                total_sq += block_sq
+                count += block_count
+        lo = minmax(np.array(lows, dtype=flat.dtype))[0]
+        hi = minmax(np.array(highs, dtype=flat.dtype))[1]
+        stats = {"min": float(lo), "max": float(hi)}
+        if moments:
+            _add_moments(stats, total, total_sq, count)
+        return stats
+
+    return reduce
+
+
+def _block_moments(block: Any, nan_aware: bool) -> Tuple[float, float, int]:
+    values = block.astype(np.float64, copy=False)
+    if nan_aware:
+        mask = ~np.isnan(values)
+        if not mask.all():
+            values = values[mask]
+    return float(values.sum()), float(np.dot(values, values)), int(values.size)
+
+
+def _add_moments(stats: Dict[str, float], total: float, total_sq: float, count: int) -> None:
+    if count == 0:
+        stats["mean"] = float("nan")
+        stats["std"] = float("nan")
+        return
+    mean = total / count
+    variance = max(0.0, total_sq / count - mean * mean)
+    stats["mean"] = mean
+    stats["std"] = variance ** 0.5
+
+
+_REDUCERS: Dict[Tuple[Any, bool], Optional[Reducer]] = {}
+
+
+def array_reducer(dtype: Any, include_moments: bool = False) -> Optional[Reducer]:
+    key = (dtype, include_moments)
+    if key not in _REDUCERS:
+        _REDUCERS[key] = _make_reducer(dtype, include_moments)
+    return _REDUCERS[key]
+
+
+def array_stats(array: Any, include_moments: bool = False) -> Dict[str, float]:
+    if np is None or not isinstance(array, np.ndarray) or not array.size:
+        return {}
+    reducer = array_reducer(array.dtype, include_moments)
+    return reducer(array) if reducer is not None else {}
+
+
+def _summarize_value(obj: Any) -> Any:
+    if isinstance(obj, (list, tuple)):
+        return {"type": type(obj).__name__, "len": len(obj)}
+    if isinstance(obj, (int, float, str, bool)) or obj is None:
+        return obj
+    return {"type": type(obj).__name__}
+
+
+def _plain_array(value: Any) -> Any:
+    # Subclasses (memmap, matrix, masked arrays) are reduced as plain arrays;
+    # masked entries are left out, as np.nanmin/np.nanmax would.
+    if isinstance(value, np.ma.MaskedArray):
+        return value.compressed()
+    return value.view(np.ndarray)
+
+
+class ObservationSummarizer:
+    # Learns a per-key schema on the first observation (dict layout, dtype,
+    # shape, reducer) and replays it on later steps, so steady-state summaries
+    # skip isinstance/dtype dispatch and only run the reductions. A schema is
+    # bound to the exact container types it was compiled from; an observation
+    # that mismatches a freshly compiled schema is summarized uncached.
+    def __init__(self, include_moments: bool = False, tag_ndarrays: bool = False) -> None:
+        self.include_moments = include_moments
+        self.tag_ndarrays = tag_ndarrays
+        self._root: Optional[Summarizer] = None
+        self.recompiles = 0
+
+    def reset(self) -> None:
+        self._root = None
+
+    def summarize(self, obs: Any) -> Any:
+        if self._root is not None:
+            try:
+                return self._root(obs)
+            except _SchemaMismatch:
+                pass
+        self._root = self._compile(obs)
+        self.recompiles += 1
+        try:
+            return self._root(obs)
+        except _SchemaMismatch:
+            self._root = None
+            return self._summarize_uncached(obs)
+
+    __call__ = summarize
+
+    def _compile(self, obs: Any) -> Summarizer:
+        if isinstance(obs, dict):
+            return self._compile_dict(obs)
+        if np is not None and isinstance(obs, np.ndarray):
+            return self._compile_array(obs)
+        obs_type = type(obs)
+
+        def leaf(value: Any) -> Any:
+            if type(value) is not obs_type:
+                raise _SchemaMismatch()
+            return _summarize_value(value)
+
+        return leaf
+
+    def _compile_dict(self, obs: Dict[Any, Any]) -> Summarizer:
+        dict_type = type(obs)
+        children: List[Tuple[Any, Summarizer]] = [
+            (key, self._compile(value)) for key, value in obs.items()
+        ]
+        keys = tuple(key for key, _ in children)
+
+        def summarize_dict(value: Any) -> Any:
+            if type(value) is not dict_type or tuple(value) != keys:
+                raise _SchemaMismatch()
+            return {key: child(value[key]) for key, child in children}
+
+        return summarize_dict
+
+    def _compile_array(self, obs: Any) -> Summarizer:
+        array_type = type(obs)
+        plain = array_type is np.ndarray
+        dtype = obs.dtype
+        shape = obs.shape
+        template = self._array_template(dtype)
+        reducer = array_reducer(dtype, self.include_moments) if obs.size else None
+
+        def summarize_array(value: Any) -> Any:
+            if type(value) is not array_type or value.dtype != dtype or value.shape != shape:
+                raise _SchemaMismatch()
+            summary = dict(template)
+            summary["shape"] = list(shape)
+            if reducer is not None:
+                values = value if plain else _plain_array(value)
+                if values.size:
+                    summary.update(reducer(values))
+            return summary
+
+        return summarize_array
+
+    def _array_template(self, dtype: Any) -> Dict[str, Any]:
+        template: Dict[str, Any] = {}
+        if self.tag_ndarrays:
+            template["type"] = "ndarray"
+        template["shape"] = None
+        template["dtype"] = str(dtype)
+        return template
+
+    def _summarize_uncached(self, obs: Any) -> Any:
+        if isinstance(obs, dict):
+            return {key: self._summarize_uncached(value) for key, value in obs.items()}
+        if np is not None and isinstance(obs, np.ndarray):
+            summary = self._array_template(obs.dtype)
+            summary["shape"] = list(obs.shape)
+            values = _plain_array(obs)
+            if values.size:
+                summary.update(array_stats(values, self.include_moments))
+            return summary
+        return _summarize_value(obs)
+
+
+class _SchemaMismatch(Exception):
+    pass
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+BACKPRESSURE_POLICIES = ("block", "drop")
+
+_STOP = object()
+
+
+class _FlushMarker:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class AsyncJsonlWriter:
+    def __init__(
+        self,
+        files: Dict[str, TextIO],
+        queue_size: int = 10000,
+        flush_interval_s: float = 0.5,
+        batch_size: int = 256,
+        backpressure: str = "block",
+    ) -> None:
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"backpressure must be one of {BACKPRESSURE_POLICIES}, got {backpressure!r}"
+            )
+        self._files = files
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(0, queue_size))
+        self._flush_interval_s = max(0.001, flush_interval_s)
+        self._batch_size = max(1, batch_size)
+        self._backpressure = backpressure
+        self._closed = False
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.write_errors = 0
+        self._thread = threading.Thread(
+            target=self._run, name="RunLogger-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, stream_key: str, record: Any) -> bool:
+        if self._closed:
+            return False
+        item = (stream_key, record)
+        if self._backpressure == "drop":
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+                return False
+            return True
+        self._queue.put(item)
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        if self._closed or not self._thread.is_alive():
+            return False
+        marker = _FlushMarker()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        pending: List[Tuple[str, Any]] = []
+        dirty: set = set()
+        last_flush = time.monotonic()
+        stop = False
+        while not stop:
+            timeout = max(0.0, self._flush_interval_s - (time.monotonic() - last_flush))
+            markers: List[_FlushMarker] = []
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            while item is not None:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, _FlushMarker):
+                    markers.append(item)
+                else:
+                    pending.append(item)
+                if stop or len(pending) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+
+            if pending:
+                self._write_batch(pending, dirty)
+                pending = []
+
+            now = time.monotonic()
+            if dirty and (
+                stop
+                or markers
+                or now - last_flush >= self._flush_interval_s
+                or self._queue.qsize() >= self._batch_size
+            ):
+                self._flush_files(dirty)
+                dirty = set()
+            if not dirty:
+                last_flush = now
+            for marker in markers:
+                marker.done.set()
+
+        # Drain anything queued after the stop sentinel (e.g. racing producers).
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _FlushMarker):
+                item.done.set()
+            elif item is not _STOP:
+                pending.append(item)
+        if pending:
+            self._write_batch(pending, dirty)
+        self._flush_files(dirty)
+
+    def _write_batch(self, batch: List[Tuple[str, Any]], dirty: set) -> None:
+        chunks: Dict[str, List[str]] = {}
+        for stream_key, record in batch:
+            try:
+                if isinstance(record, str):
+                    line = record
+                else:
+                    line = json.dumps(record, ensure_ascii=True)
+            except Exception:
+                self.write_errors += 1
+                continue
+            chunks.setdefault(stream_key, []).append(line + "\n")
+        for stream_key, lines in chunks.items():
+            fh = self._files.get(stream_key)
+            if fh is None:
+                self.write_errors += len(lines)
+                continue
+            try:
+                fh.write("".join(lines))
+                dirty.add(stream_key)
+            except Exception:
+                self.write_errors += len(lines)
+
+    def _flush_files(self, dirty: set) -> None:
+        for stream_key in dirty:
+            try:
+                self._files[stream_key].flush()
+            except Exception:
+                self.write_errors += 1
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core.adapters.minedojo.action_mapper import iter_macro, macro_length
+from core.models.signals import MacroAction
+
+EnvStep = Callable[[Any], Any]
+# (info before the step, reward, done, info after the step) -> reason or None
+InterruptTrigger = Callable[[Dict[str, Any], Any, bool, Dict[str, Any]], Optional[str]]
+
+
+def _number(info: Dict[str, Any], key: str) -> Optional[float]:
+    value = info.get(key)
+    try:
+        return float(value.item() if hasattr(value, "item") else value)
+    except (TypeError, ValueError):
+        return None
+
+
+def life_drop(threshold: float = 0.0) -> InterruptTrigger:
+    def trigger(before: Dict[str, Any], reward: Any, done: bool, after: Dict[str, Any]) -> Optional[str]:
+        old, new = _number(before, "life"), _number(after, "life")
+        if old is not None and new is not None and old - new > threshold:
+            return "life_drop"
+        return None
+
+    return trigger
+
+
+def reward_received(min_abs: float = 0.0) -> InterruptTrigger:
+    def trigger(before: Dict[str, Any], reward: Any, done: bool, after: Dict[str, Any]) -> Optional[str]:
+        try:
+            value = float(reward or 0.0)
+        except (TypeError, ValueError):
+            return None
+        return "reward" if abs(value) > min_abs else None
+
+    return trigger
+
+
+def episode_done() -> InterruptTrigger:
+    def trigger(before: Dict[str, Any], reward: Any, done: bool, after: Dict[str, Any]) -> Optional[str]:
+        return "done" if done else None
+
+    return trigger
+
+
+TRIGGERS: Dict[str, Callable[[], InterruptTrigger]] = {
+    "life_drop": life_drop,
+    "reward": reward_received,
+    "done": episode_done,
+}
+
+
+def triggers_from_names(names: Sequence[str]) -> List[InterruptTrigger]:
+    selected: List[InterruptTrigger] = []
+    for name in names:
+        name = name.strip()
+        if not name:
+            continue
+        if name not in TRIGGERS:
+            raise ValueError(f"Unknown macro interrupt trigger: {name!r}")
+        selected.append(TRIGGERS[name]())
+    return selected
+
+
+@dataclass
+class Transition:
+    action: Any
+    reward: Any
+    done: bool
+    info: Dict[str, Any]
+
+
+@dataclass
+class MacroResult:
+    obs: Any = None
+    reward: float = 0.0
+    done: bool = False
+    info: Dict[str, Any] = field(default_factory=dict)
+    transitions: List[Transition] = field(default_factory=list)
+    interrupted: Optional[str] = None
+
+    @property
+    def steps(self) -> int:
+        return len(self.transitions)
+
+
+class MacroExecutor:
+    # Runs a MacroAction primitive by primitive without consulting the policy,
+    # stopping early when any trigger fires. ``done`` always ends the macro.
+    def __init__(self, triggers: Optional[Sequence[InterruptTrigger]] = None) -> None:
+        self.triggers: List[InterruptTrigger] = (
+            list(triggers) if triggers is not None else triggers_from_names(list(TRIGGERS))
+        )
+
+    def run(
+        self,
+        env_step: EnvStep,
+        macro: MacroAction,
+        info: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+    ) -> MacroResult:
+        result = MacroResult(info=info or {})
+        total = macro_length(macro) if limit is None else min(limit, macro_length(macro))
+        for action in iter_macro(macro):
+            if result.steps >= total:
+                break
+            before = result.info
+            obs, reward, done, after = env_step(action)
+            after = after if isinstance(after, dict) else {}
+            result.obs = obs
+            result.info = after
+            result.done = bool(done)
+            try:
+                result.reward += float(reward or 0.0)
+            except (TypeError, ValueError):
+                pass
+            result.transitions.append(Transition(action=action, reward=reward, done=result.done, info=after))
+            if result.done:
+                if result.steps < total:
+                    result.interrupted = "done"
+                break
+            if result.steps < total:
+                # Only an early stop counts as an interrupt.
+                for trigger in self.triggers:
+                    reason = trigger(before, reward, result.done, after)
+                    if reason is not None:
+                        result.interrupted = reason
+                        return result
+        return result
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Optional, Sequence, Tuple, TypeVar
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - numpy optional
+    np = None  # type: ignore
+
+T = TypeVar("T")
+
+Decide = Callable[[Any], T]
+StateMatch = Callable[[Any, Any], bool]
+
+_MISSING = object()
+
+
+def values_equal(a: Any, b: Any) -> bool:
+    # Structural equality that tolerates arrays anywhere in the value, where
+    # ``==`` would be elementwise (and ``bool()`` of it ambiguous).
+    if np is not None and (isinstance(a, np.ndarray) or isinstance(b, np.ndarray)):
+        try:
+            return bool(np.array_equal(np.asarray(a), np.asarray(b)))
+        except (TypeError, ValueError):
+            return False
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(values_equal(a[key], b[key]) for key in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(values_equal(x, y) for x, y in zip(a, b))
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+def _lookup(value: Any, path: Sequence[str]) -> Any:
+    for key in path:
+        if not isinstance(value, dict):
+            return _MISSING
+        value = value.get(key, _MISSING)
+    return value
+
+
+def state_matcher(paths: Sequence[Sequence[str]], index: int = 0) -> StateMatch:
+    # Compares only the listed key paths of ``context[index]`` (a state dict),
+    # so fields that change every tick, like world time, do not count.
+    def matches(old: Any, new: Any) -> bool:
+        return all(
+            values_equal(_lookup(old[index], path), _lookup(new[index], path)) for path in paths
+        )
+
+    return matches
+
+
+@dataclass
+class PipelineReport:
+    step: int
+    speculative: bool
+    committed: bool
+    matched: bool
+    staleness: int
+    env_ms: float
+    decide_ms: float
+    wait_ms: float
+    overlap_ms: float
+    wall_ms: float
+
+    @property
+    def overlap_ratio(self) -> float:
+        # Share of the shorter of the two phases that ran concurrently; 1.0
+        # means wall time approached max(env, decide).
+        shorter = min(self.env_ms, self.decide_ms)
+        return self.overlap_ms / shorter if shorter > 0 else 0.0
+
+
+def _overlap(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    return max(0.0, min(a[1], b[1]) - max(a[0], b[0]))
+
+
+class _Pending:
+    def __init__(self, context: Any, future: "Future[Tuple[Any, float, float]]") -> None:
+        self.context = context
+        self.future = future
+
+
+class DecisionPipeline(Generic[T]):
+    # Overlaps decision making (the LLM call) with env.step. While the env
+    # executes action t, the next decision is computed speculatively from the
+    # last known context. After the step it is committed if the new context
+    # matches the one it was computed from; otherwise it is discarded and
+    # recomputed from the fresh context. ``max_staleness`` > 0 (``None``: no
+    # limit) instead commits up to that many unverified decisions in a row,
+    # trading correctness for latency. A discarded decision's call is not
+    # interrupted: it finishes in the worker thread and its result is dropped.
+    def __init__(
+        self,
+        decide: Decide[T],
+        max_staleness: Optional[int] = 0,
+        matches: Optional[StateMatch] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ) -> None:
+        if max_staleness is not None and max_staleness < 0:
+            raise ValueError("max_staleness must be >= 0")
+        self.decide = decide
+        self.max_staleness = max_staleness
+        self.matches = matches
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="speculative-decide"
+        )
+        self._owns_executor = executor is None
+        self._pending: Optional[_Pending] = None
+        self._env_interval: Tuple[float, float] = (0.0, 0.0)
+        self._last_resolved: Optional[float] = None
+        self._staleness = 0
+        self._step = 0
+        self.last_report: Optional[PipelineReport] = None
+
+    def _timed(self, context: Any) -> Tuple[T, float, float]:
+        start = time.perf_counter()
+        decision = self.decide(context)
+        return decision, start, time.perf_counter()
+
+    def first(self, context: Any) -> T:
+        decision, _, end = self._timed(context)
+        self._last_resolved = end
+        return decision
+
+    def step(self, env_step: Callable[[Any], Any], action: Any, context: Any) -> Any:
+        # ``context`` is what the next decision would be based on if the env
+        # did not change it; the speculative call starts before the env step.
+        self._pending = _Pending(context, self._executor.submit(self._timed, context))
+        start = time.perf_counter()
+        try:
+            return env_step(action)
+        finally:
+            self._env_interval = (start, time.perf_counter())
+
+    def resolve(self, context: Any) -> Tuple[T, PipelineReport]:
+        pending, self._pending = self._pending, None
+        env_ms = (self._env_interval[1] - self._env_interval[0]) * 1000.0
+        wait_start = time.perf_counter()
+        matched = False
+        committed = False
+        if pending is not None:
+            matched = self.matches is not None and bool(self.matches(pending.context, context))
+            committed = (
+                matched or self.max_staleness is None or self._staleness < self.max_staleness
+            )
+        if committed:
+            assert pending is not None
+            decision, decide_start, decide_end = pending.future.result()
+            self._staleness = 0 if matched else self._staleness + 1
+            overlap = _overlap((decide_start, decide_end), self._env_interval)
+        else:
+            if pending is not None:
+                # Only stops a call that has not started yet.
+                pending.future.cancel()
+            decision, decide_start, decide_end = self._timed(context)
+            self._staleness = 0
+            overlap = 0.0
+        now = time.perf_counter()
+        previous = self._last_resolved if self._last_resolved is not None else self._env_interval[0]
+        report = PipelineReport(
+            step=self._step,
+            speculative=pending is not None,
+            committed=committed,
+            matched=matched,
+            staleness=self._staleness,
+            env_ms=env_ms,
+            decide_ms=(decide_end - decide_start) * 1000.0,
+            wait_ms=(now - wait_start) * 1000.0,
+            overlap_ms=overlap * 1000.0,
+            wall_ms=(now - previous) * 1000.0,
+        )
+        self._last_resolved = now
+        self._step += 1
+        self.last_report = report
+        return decision, report
+
+    def close(self) -> None:
+        if self._pending is not None:
+            self._pending.future.cancel()
+            self._pending = None
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+    def __enter__(self) -> "DecisionPipeline[T]":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
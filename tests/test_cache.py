@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from core.llm.cache import CachingLLMClient, SQLiteCacheTier
+from core.llm.client import LLMClient
+from core.llm.types import LLMMessage, LLMRequest, LLMResponse
+
+
+class _ModelClient(LLMClient):
+    def __init__(self, default_model: str) -> None:
+        self.default_model = default_model
+        self.calls = 0
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        self.calls += 1
+        return LLMResponse(text=request.model or self.default_model, model=self.default_model)
+
+
+class _Wrapper(LLMClient):
+    def __init__(self, client: LLMClient) -> None:
+        self.client = client
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        return self.client.generate(request)
+
+
+def _request() -> LLMRequest:
+    return LLMRequest(messages=[LLMMessage(role="user", content="hi")], temperature=0.0)
+
+
+def test_shared_disk_cache_keeps_default_models_apart(tmp_path):
+    path = tmp_path / "llm_cache.db"
+    first = CachingLLMClient(_ModelClient("model-a"), disk=SQLiteCacheTier(path))
+    assert first.generate(_request()).text == "model-a"
+    assert first.generate(_request()).text == "model-a"
+    assert first.client.calls == 1
+
+    inner = _ModelClient("model-b")
+    second = CachingLLMClient(_Wrapper(inner), disk=SQLiteCacheTier(path))
+    assert second.generate(_request()).text == "model-b"
+    assert inner.calls == 1
+
+    explicit = LLMRequest(messages=_request().messages, model="model-a", temperature=0.0)
+    assert second.generate(explicit).text == "model-a"
+    assert inner.calls == 1
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.llm.client import AsyncLLMClient, LLMClient
+from core.llm.concurrency import generate_many, generate_many_sync
+from core.llm.types import LLMMessage, LLMRequest, LLMResponse
+
+
+def _requests(count: int):
+    return [LLMRequest(messages=[LLMMessage(role="user", content=str(i))]) for i in range(count)]
+
+
+class _AsyncFake(AsyncLLMClient):
+    # Later requests answer sooner; "3" fails.
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, request: LLMRequest) -> LLMResponse:
+        index = int(request.messages[0].content)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01 * (6 - index))
+            if index == 3:
+                raise RuntimeError("upstream failed")
+            return LLMResponse(text=f"answer {index}")
+        finally:
+            self.active -= 1
+
+
+class _SyncFake(LLMClient):
+    def __init__(self) -> None:
+        self.threads = set()
+
+    def generate(self, request: LLMRequest) -> LLMResponse:
+        self.threads.add(threading.get_ident())
+        time.sleep(0.01)
+        return LLMResponse(text="sync " + request.messages[0].content)
+
+
+def test_generate_many_keeps_request_order_and_isolates_errors():
+    client = _AsyncFake()
+    results = asyncio.run(
+        generate_many(client, _requests(6), max_concurrency=2, return_exceptions=True)
+    )
+    assert [getattr(result, "text", None) for result in results] == [
+        "answer 0",
+        "answer 1",
+        "answer 2",
+        None,
+        "answer 4",
+        "answer 5",
+    ]
+    assert isinstance(results[3], RuntimeError)
+    assert client.peak == 2
+
+
+def test_generate_many_raises_the_first_error_without_return_exceptions():
+    with pytest.raises(RuntimeError):
+        asyncio.run(generate_many(_AsyncFake(), _requests(6)))
+
+
+def test_generate_many_sync_runs_sync_clients_in_worker_threads():
+    client = _SyncFake()
+    results = generate_many_sync(client, _requests(4), max_concurrency=4, timeout=5.0)
+    assert [result.text for result in results] == ["sync 0", "sync 1", "sync 2", "sync 3"]
+    assert threading.get_ident() not in client.threads
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from core.memory.episodic import EpisodicMemory, record_time
+from core.models.memory_records import EpisodicMemoryRecord
+
+
+def test_utc_designator_and_naive_timestamps_parse_as_utc():
+    assert record_time(EpisodicMemoryRecord(timestamp="2024-05-01T12:00:00Z")) == 1714564800.0
+    assert record_time(EpisodicMemoryRecord(timestamp="2024-05-01T12:00:00")) == 1714564800.0
+    assert record_time(EpisodicMemoryRecord(timestamp="2024-05-01T14:00:00+02:00")) == 1714564800.0
+    assert math.isnan(record_time(EpisodicMemoryRecord(timestamp="yesterday")))
+
+
+def test_time_filters_keep_episodes_with_z_timestamps():
+    memory = EpisodicMemory()
+    for index in range(3):
+        memory.store(
+            EpisodicMemoryRecord(
+                timestamp=f"2024-05-0{index + 1}T00:00:00Z",
+                embedding=np.eye(4, dtype=np.float32)[index],
+            )
+        )
+    query = np.ones(4, dtype=np.float32)
+    assert len(memory.similar(query, k=5, since=0.0)) == 3
+    assert len(memory.similar(query, k=5, since=1714608000.0)) == 2
+    assert len(memory.similar(query, k=5, until=1714607999.0)) == 1
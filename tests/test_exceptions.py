@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import faulthandler
+import sys
+import threading
+
+from core.observability.config import LoggingConfig
+from core.observability.exceptions import install_exception_hooks
+from core.observability.logger import RunLogger
+
+
+def test_closing_the_logger_disables_faulthandler_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "excepthook", sys.excepthook)
+    monkeypatch.setattr(threading, "excepthook", threading.excepthook)
+    logger = RunLogger(LoggingConfig(log_root=tmp_path))
+    try:
+        install_exception_hooks(logger)
+        handler_file = logger._faulthandler_file
+        assert faulthandler.is_enabled()
+        logger.close()
+        assert handler_file.closed
+        assert not faulthandler.is_enabled()
+        logger.close()
+    finally:
+        faulthandler.enable(file=sys.__stderr__)
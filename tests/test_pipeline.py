@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from core.runtime.pipeline import DecisionPipeline, state_matcher
+
+MATCHES = state_matcher([("homeostasis", "life")])
+
+
+def _context(life: float, time: int) -> tuple:
+    return ({"homeostasis": {"life": life}, "world_time": time},)
+
+
+def _run(pipeline, contexts):
+    reports = []
+    context = contexts[0]
+    pipeline.first(context)
+    for fresh in contexts[1:]:
+        pipeline.step(lambda action: None, None, context)
+        decision, report = pipeline.resolve(fresh)
+        assert decision == fresh[0]["homeostasis"]["life"]
+        reports.append(report)
+        context = fresh
+    return reports
+
+
+def _decide(context):
+    return context[0]["homeostasis"]["life"]
+
+
+def test_mismatched_speculation_is_discarded_by_default():
+    contexts = [_context(20.0, 0), _context(20.0, 1), _context(15.0, 2), _context(15.0, 3)]
+    with DecisionPipeline(_decide, matches=MATCHES) as pipeline:
+        reports = _run(pipeline, contexts)
+    assert [(report.matched, report.committed) for report in reports] == [
+        (True, True),
+        (False, False),
+        (True, True),
+    ]
+
+
+def test_max_staleness_commits_unverified_decisions_when_opted_in():
+    decisions = []
+    contexts = [_context(20.0 - step, step) for step in range(4)]
+    with DecisionPipeline(_decide, max_staleness=2, matches=MATCHES) as pipeline:
+        pipeline.first(contexts[0])
+        for previous, fresh in zip(contexts, contexts[1:]):
+            pipeline.step(lambda action: None, None, previous)
+            decision, report = pipeline.resolve(fresh)
+            decisions.append((decision, report.committed))
+    # Two stale decisions are committed, then the third is recomputed.
+    assert decisions == [(20.0, True), (19.0, True), (17.0, False)]
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from core.memory.prediction_error import PredictionErrorHistory, TDigest
+from core.memory.storage import InMemoryBackend
+from core.models.memory_records import PredictionErrorRecord
+from core.models.signals import PredictionError
+
+
+def _digest(values) -> TDigest:
+    digest = TDigest()
+    for value in values:
+        digest.add(float(value))
+    return digest
+
+
+def _record(magnitude: float) -> PredictionErrorRecord:
+    return PredictionErrorRecord(error=PredictionError(magnitude=magnitude), source="motor")
+
+
+def _mid_rank(values: np.ndarray, value: float) -> float:
+    return float(np.mean(values < value) + 0.5 * np.mean(values == value))
+
+
+def test_cdf_gives_tied_values_their_mid_rank():
+    rng = np.random.default_rng(0)
+    zeros = np.where(rng.random(100_000) < 0.9, 0.0, rng.uniform(1.0, 2.0, 100_000))
+    assert _digest(zeros).cdf(0.0) == pytest.approx(_mid_rank(zeros, 0.0), abs=0.005)
+
+    assert _digest(np.full(10_000, 0.1)).cdf(0.1) == 0.5
+
+    integers = rng.integers(0, 4, 100_000)
+    digest = _digest(integers)
+    for value in range(4):
+        assert digest.cdf(value) == pytest.approx(_mid_rank(integers, value), abs=0.005)
+
+
+def test_cdf_of_continuous_values_stays_accurate():
+    values = np.random.default_rng(1).lognormal(0.0, 1.0, 100_000)
+    digest = _digest(values)
+    for q in (0.01, 0.5, 0.99):
+        point = float(np.quantile(values, q))
+        assert digest.cdf(point) == pytest.approx(np.mean(values < point), abs=0.005)
+    assert digest.centroids <= 200
+
+
+def test_default_history_keeps_no_record_log():
+    history = PredictionErrorHistory(checkpoint_every=100)
+    for index in range(1000):
+        history.record(_record(float(index)))
+    assert history.backend.count(history.namespace) == 0
+    assert len(history) == 1000
+    assert len(history.query()) == 100
+    assert [record.error.magnitude for record in history.query(last=2)] == [998.0, 999.0]
+    assert history.summary("motor").count == 1000
+    assert len(history.sample("motor")) == 256
+
+
+def test_explicit_backend_keeps_the_log_and_replays_after_the_checkpoint():
+    backend = InMemoryBackend()
+    history = PredictionErrorHistory(backend, checkpoint_every=100)
+    for index in range(250):
+        history.record(_record(float(index)))
+    assert backend.count(history.namespace) == 250
+    restarted = PredictionErrorHistory(backend, checkpoint_every=100)
+    assert restarted.summary("motor").count == 250
+    assert len(restarted.query()) == 250
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from core.llm.ratelimit import LANE_BACKGROUND, LANE_MOTOR, RateLimiter
+
+
+def test_async_acquire_admits_motor_lane_first_under_load():
+    # 600 rpm with a one-request burst: one admission per 100 ms.
+    limiter = RateLimiter(rpm=600, burst_s=0.1)
+    limiter.acquire()
+    order = []
+
+    async def request(lane, name):
+        await limiter.aacquire(lane)
+        order.append(name)
+
+    async def main():
+        background = [
+            asyncio.ensure_future(request(LANE_BACKGROUND, f"background-{index}"))
+            for index in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(request(LANE_MOTOR, "motor"), timeout=1.0)
+        await asyncio.gather(*background)
+
+    asyncio.run(main())
+    assert order[0] == "motor"
+    assert len(order) == 4
+
+
+def test_cancelled_async_acquire_leaves_the_queue():
+    limiter = RateLimiter(rpm=60, burst_s=1.0)
+    limiter.acquire()
+
+    async def main():
+        waiter = asyncio.ensure_future(limiter.aacquire(LANE_MOTOR))
+        await asyncio.sleep(0.01)
+        assert len(limiter._queue) == 1
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    assert limiter._queue == []
+    assert limiter._waiters == {}
+
+
+def test_async_and_threaded_waiters_share_one_limiter_across_loops():
+    limiter = RateLimiter(rpm=1200, burst_s=0.05)
+    admitted = []
+
+    def worker():
+        async def main():
+            for _ in range(3):
+                admitted.append(await limiter.aacquire())
+
+        asyncio.run(main())
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    threads.append(
+        threading.Thread(target=lambda: admitted.extend(limiter.acquire() for _ in range(3)))
+    )
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5.0)
+    assert len(admitted) == 9
+    assert limiter._queue == []
+
+
+def test_interrupted_sync_acquire_leaves_the_queue():
+    limiter = RateLimiter(rpm=60, burst_s=1.0)
+    limiter.acquire()
+
+    def interrupted(timeout=None):
+        raise KeyboardInterrupt
+
+    limiter._cond.wait = interrupted
+    with pytest.raises(KeyboardInterrupt):
+        limiter.acquire(LANE_MOTOR)
+    assert limiter._queue == []
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from core.llm.router import AsyncRoutingLLMClient, Route, RoutingLLMClient
+from core.llm.types import LLMMessage, LLMRequest, LLMResponse
+
+REQUEST = LLMRequest(messages=[LLMMessage("user", "state")])
+
+
+class _FakeClient:
+    # Answers with its own name after ``release`` is set (immediately when
+    # None); ``fail`` makes every call raise instead.
+    def __init__(self, name, fail=False, release=None):
+        self.name = name
+        self.fail = fail
+        self.release = release
+        self.models = []
+
+    def generate(self, request):
+        self.models.append(request.model)
+        if self.release is not None:
+            self.release.wait(timeout=5.0)
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        return LLMResponse(text=self.name, provider=self.name)
+
+
+class _AsyncFakeClient:
+    def __init__(self, name, delay_s):
+        self.name = name
+        self.delay_s = delay_s
+        self.cancelled = False
+
+    async def generate(self, request):
+        try:
+            await asyncio.sleep(self.delay_s)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return LLMResponse(text=self.name, provider=self.name)
+
+
+def _warm(route, latency_ms, samples=5):
+    for _ in range(samples):
+        route.tracker.record(latency_ms, True)
+    return route
+
+
+def test_failover_skips_a_failing_route_and_then_ranks_it_last():
+    bad = _FakeClient("bad", fail=True)
+    good = _FakeClient("good")
+    router = RoutingLLMClient(
+        [Route("bad", bad, model="bad-model"), Route("good", good, model="good-model")],
+        hedge=False,
+        min_samples=2,
+    )
+    try:
+        answers = [router.generate(REQUEST).text for _ in range(6)]
+    finally:
+        router.close()
+    assert answers == ["good"] * 6
+    assert set(bad.models) == {"bad-model"}
+    assert set(good.models) == {"good-model"}
+    # Once both routes are measured the failing one is no longer tried.
+    assert len(bad.models) == 2
+    assert router.stats.failovers == 2
+
+
+def test_failover_off_surfaces_the_primary_error():
+    bad = _warm(Route("bad", _FakeClient("bad", fail=True)), 1.0)
+    router = RoutingLLMClient(
+        [bad, Route("good", _FakeClient("good"))],
+        hedge=False,
+        failover=False,
+        min_samples=0,
+    )
+    try:
+        with pytest.raises(RuntimeError, match="bad is down"):
+            router.generate(REQUEST)
+    finally:
+        router.close()
+
+
+def test_slow_primary_is_hedged_to_the_next_route():
+    release = threading.Event()
+    slow = _warm(Route("slow", _FakeClient("slow", release=release)), 1.0)
+    fast = _warm(Route("fast", _FakeClient("fast")), 5.0)
+    router = RoutingLLMClient([slow, fast], hedge_min_ms=20.0, max_hedge_ratio=1.0)
+    try:
+        response = router.generate(REQUEST)
+    finally:
+        release.set()
+        router.close()
+    assert response.text == "fast"
+    assert router.stats.hedged == 1
+    assert router.stats.hedge_wins == 1
+    assert router.stats.per_route == {"slow": 1}
+
+
+def test_hedge_budget_caps_the_share_of_hedged_requests():
+    release = threading.Event()
+    slow = _warm(Route("slow", _FakeClient("slow", release=release)), 1.0)
+    fast = _warm(Route("fast", _FakeClient("fast")), 5.0)
+    router = RoutingLLMClient([slow, fast], hedge_min_ms=20.0, max_hedge_ratio=0.0)
+    # The primary runs well past its p95, but the budget allows no hedges.
+    threading.Timer(0.1, release.set).start()
+    try:
+        assert router.generate(REQUEST).text == "slow"
+    finally:
+        router.close()
+    assert router.stats.hedged == 0
+
+
+def test_async_hedge_wins_and_cancels_the_slow_primary():
+    slow_client = _AsyncFakeClient("slow", delay_s=2.0)
+    fast_client = _AsyncFakeClient("fast", delay_s=0.0)
+    router = AsyncRoutingLLMClient(
+        [_warm(Route("slow", slow_client), 1.0), _warm(Route("fast", fast_client), 5.0)],
+        hedge_min_ms=20.0,
+        max_hedge_ratio=1.0,
+    )
+
+    async def main():
+        response = await router.generate(REQUEST)
+        await asyncio.sleep(0)
+        return response
+
+    response = asyncio.run(asyncio.wait_for(main(), timeout=1.0))
+    assert response.text == "fast"
+    assert router.stats.hedge_wins == 1
+    assert slow_client.cancelled
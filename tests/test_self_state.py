@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from core.memory.self_state import SelfStateMemory
+from core.memory.storage import InMemoryBackend
+from core.models.memory_records import SelfStateSnapshot
+from core.models.state import AgentState, HomeostasisState
+
+
+def _snapshot(step: int) -> SelfStateSnapshot:
+    return SelfStateSnapshot(
+        state=AgentState(homeostasis=HomeostasisState(life=20.0, food=float(step % 7))),
+        step=step,
+    )
+
+
+def test_default_memory_keeps_only_recent_snapshots():
+    memory = SelfStateMemory(chunk_steps=100, retain_chunks=2)
+    for step in range(1000):
+        memory.record(_snapshot(step))
+    assert memory.backend.count(memory.namespace) == 0
+    assert len(memory) == 1000
+    assert [snapshot.step for snapshot in memory.query(last=3)] == [997, 998, 999]
+    assert len(memory.query()) == 100
+    assert memory.aggregate(["food"])["food"].count == 1000
+    assert len(memory.windows("food", 100).steps) == 10
+
+
+def test_explicit_backend_keeps_the_snapshot_log():
+    backend = InMemoryBackend()
+    memory = SelfStateMemory(backend, chunk_steps=100)
+    for step in range(250):
+        memory.record(_snapshot(step))
+    assert backend.count(memory.namespace) == 250
+    assert len(memory.query()) == 250
+    assert memory.query(last=1)[0].step == 249
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import urllib.request
+from types import SimpleNamespace
+
+from core.llm.hashing import request_key
+from core.llm.providers.openai import OpenAIClient
+from core.llm.replay import ReplayLLMClient
+from core.llm.standin import ResponsesStandInServer, replay_responder
+from core.llm.types import LLMMessage, LLMRequest
+from core.observability.config import LoggingConfig
+from core.observability.logger import RunLogger
+
+RECORDED = '{"action": [1, 0, 0, 12, 12, 0, 0, 0]}'
+
+
+class _FakeResponses:
+    def __init__(self) -> None:
+        self.calls = []
+
+    def create(self, **params):
+        self.calls.append(params)
+        return SimpleNamespace(output_text=RECORDED, usage=None)
+
+
+def _post(url: str, payload) -> dict:
+    request = urllib.request.Request(
+        url + "/responses",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=5.0) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def test_standin_replays_a_run_recorded_with_the_default_model(tmp_path):
+    logger = RunLogger(LoggingConfig(log_root=tmp_path))
+    sdk = SimpleNamespace(responses=_FakeResponses())
+    client = OpenAIClient(client=sdk, default_model="gpt-test", logger=logger)
+    messages = [LLMMessage(role="user", content="life is low; pick an action")]
+    assert client.generate(LLMRequest(messages=messages)).text == RECORDED
+    logger.close()
+
+    replay = ReplayLLMClient(logger.paths.llm_jsonl)
+    with ResponsesStandInServer(responder=replay_responder(replay, default="DEFAULT")) as server:
+        # The SDK sends the payload the provider built, model resolved.
+        body = _post(server.url, sdk.responses.calls[0])
+    assert body["output"][0]["content"][0]["text"] == RECORDED
+    assert replay.stats.hits == 1
+
+
+def test_replay_matches_requests_recorded_without_a_resolved_model(tmp_path):
+    log = tmp_path / "llm.jsonl"
+    key_request = LLMRequest(messages=[LLMMessage(role="user", content="hi")])
+    records = [
+        {"event": "llm.request", "payload": {"key": request_key(key_request)}},
+        {"event": "llm.response", "payload": {"key": request_key(key_request), "text": "old"}},
+    ]
+    log.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+    replay = ReplayLLMClient(log)
+    resolved = LLMRequest(messages=key_request.messages, model="gpt-test")
+    assert replay.generate(resolved).text == "old"
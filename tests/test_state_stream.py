@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from core.observability.config import LoggingConfig
+from core.observability.logger import RunLogger
+from core.observability.state_stream import StateStreamReader
+
+
+def _state(step: int) -> dict:
+    # Food changes only at step 3, so its delta is the only record carrying it.
+    food = 20.0 if step < 3 else 19.0
+    return {"homeostasis": {"life": 20.0 - step, "food": food}, "position": {"xpos": float(step)}}
+
+
+def test_dropped_state_record_restarts_the_delta_chain(tmp_path):
+    config = LoggingConfig(
+        log_root=tmp_path, state_keyframe_interval=10, async_writes=True, backpressure="drop"
+    )
+    logger = RunLogger(config)
+    writer = logger._writer
+    submit = writer.submit
+    dropped = []
+
+    def lossy_submit(stream_key, record):
+        # Drop the delta for step 3, as a full queue would.
+        if stream_key == "state" and record["step"] == 3:
+            dropped.append(record["event"])
+            return False
+        return submit(stream_key, record)
+
+    writer.submit = lossy_submit
+    for step in range(8):
+        logger.state_snapshot(_state(step), step=step)
+    logger.close()
+
+    assert dropped == ["state.delta"]
+    reader = StateStreamReader(logger.paths.state_jsonl)
+    assert reader.steps() == [0, 1, 2, 4, 5, 6, 7]
+    for step in (0, 1, 2, 4, 5, 6, 7):
+        assert reader.state_at(step) == _state(step)
+    assert [step for step, _ in reader.iter_states()] == reader.steps()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from core.memory.storage import SegmentFileBackend, SQLiteBackend
+
+
+BACKENDS = {
+    "sqlite": lambda root: SQLiteBackend(root / "memory.db"),
+    "segments": lambda root: SegmentFileBackend(root / "segments"),
+}
+
+
+@pytest.mark.parametrize("name", sorted(BACKENDS))
+def test_seqs_are_not_reused_after_delete_and_reopen(tmp_path, name):
+    backend = BACKENDS[name](tmp_path)
+    assert backend.put("notes", "k", {"v": 1}) == 0
+    assert backend.delete("notes", "k")
+    assert backend.append("notes", {"v": 2}) > 0
+    backend.close()
+    reopened = BACKENDS[name](tmp_path)
+    seq = reopened.append("notes", {"v": 3})
+    assert [row for row, _ in reopened.scan("notes")][-1] == seq
+    assert seq > 1
+    reopened.close()
+
+
+def test_segment_compaction_keeps_seqs_growing(tmp_path):
+    backend = SegmentFileBackend(tmp_path)
+    assert backend.put("kv", "k", 1) == 0
+    assert backend.put("kv", "k2", 2) == 1
+    assert backend.delete("kv", "k2")
+    backend.close()
+    reopened = SegmentFileBackend(tmp_path)
+    assert reopened.put("kv", "k3", 3) == 3
+    assert reopened.delete("kv", "k3")
+    assert reopened.compact("kv") == 1
+    assert reopened.put("kv", "k4", 4) == 5
+    reopened.close()
+    reopened = SegmentFileBackend(tmp_path)
+    assert reopened.put("kv", "k5", 5) == 6
+    assert reopened.keys("kv") == ["k", "k4", "k5"]
+    reopened.close()
+
+
+def test_sqlite_failed_insert_rolls_back(tmp_path):
+    backend = SQLiteBackend(tmp_path / "memory.db")
+    backend.append("log", 1)
+    backend._conn.execute(
+        "CREATE TRIGGER reject BEFORE INSERT ON memory_records WHEN NEW.namespace = 'bad'"
+        " BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+    )
+    backend._conn.commit()
+    with pytest.raises(sqlite3.IntegrityError):
+        backend.append("bad", 1)
+    assert backend.append("log", 2) == 1
+    assert backend.count("bad") == 0
+    backend._conn.execute("DROP TRIGGER reject")
+    backend._conn.commit()
+    assert backend.append("bad", 1) == 0
+    backend.close()
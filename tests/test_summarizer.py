@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+import numpy as np
+
+from core.observability.summarizer import ObservationSummarizer
+
+
+def test_ordered_dict_observations_are_summarized_every_step():
+    summarize = ObservationSummarizer()
+    for step in range(3):
+        obs = OrderedDict(
+            [("rgb", np.full((2, 3), step, dtype=np.uint8)), ("life", 20.0 - step)]
+        )
+        summary = summarize(obs)
+        assert summary == {
+            "rgb": {"shape": [2, 3], "dtype": "uint8", "min": float(step), "max": float(step)},
+            "life": 20.0 - step,
+        }
+    assert summarize.recompiles == 1
+
+
+def test_memmap_observations_are_summarized(tmp_path):
+    summarize = ObservationSummarizer()
+    for step in range(3):
+        data = np.memmap(tmp_path / f"obs{step}.dat", dtype=np.float32, mode="w+", shape=(4, 4))
+        data[:] = np.arange(16, dtype=np.float32).reshape(4, 4) + step
+        summary = summarize({"voxels": data})
+        assert summary["voxels"]["min"] == float(step)
+        assert summary["voxels"]["max"] == float(15 + step)
+    assert summarize.recompiles == 1
+
+
+def test_masked_arrays_leave_out_masked_entries():
+    summarize = ObservationSummarizer()
+    obs = np.ma.masked_array([1.0, 50.0, 3.0], mask=[False, True, False])
+    assert summarize(obs) == {"shape": [3], "dtype": "float64", "min": 1.0, "max": 3.0}
+
+
+def test_switching_container_types_recompiles():
+    summarize = ObservationSummarizer()
+    plain = {"rgb": np.zeros(3, dtype=np.uint8)}
+    ordered = OrderedDict(plain)
+    assert summarize(plain) == summarize(ordered) == summarize(plain)
+    assert summarize.recompiles == 3
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import types
+
+import pytest
+
+from core.llm.providers import transport
+from core.llm.providers.transport import close_shared_transports, shared_httpx_client
+
+
+class _FakeClient:
+    def __init__(self, **kwargs) -> None:
+        self.kwargs = kwargs
+        self.is_closed = False
+
+    def close(self) -> None:
+        self.is_closed = True
+
+
+@pytest.fixture
+def fake_httpx(monkeypatch):
+    # Just enough of httpx for shared_httpx_client to build its clients.
+    module = types.ModuleType("httpx")
+    module.Limits = lambda **kwargs: kwargs
+    module.Timeout = lambda *args, **kwargs: (args, kwargs)
+    module.Client = _FakeClient
+    module.AsyncClient = _FakeClient
+    monkeypatch.setitem(sys.modules, "httpx", module)
+    yield module
+    close_shared_transports()
+
+
+def test_close_shared_transports_closes_cached_sync_clients(fake_httpx):
+    client = shared_httpx_client()
+    assert shared_httpx_client() is client
+    close_shared_transports()
+    assert client.is_closed
+    assert shared_httpx_client() is not client
+
+
+def test_async_clients_are_shared_per_event_loop(fake_httpx):
+    async def get():
+        return shared_httpx_client(asynchronous=True), shared_httpx_client(asynchronous=True)
+
+    first, again = asyncio.run(get())
+    second, _ = asyncio.run(get())
+    assert first is again
+    assert first is not second
+    with pytest.raises(RuntimeError):
+        shared_httpx_client(asynchronous=True)
+    close_shared_transports()
+    assert not transport._async_httpx_clients
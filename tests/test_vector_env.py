@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import sys
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from fixtures import FakeMineDojoEnv  # noqa: E402
+
+from core.adapters.minedojo.vector_env import (  # noqa: E402
+    FINAL_INFO_KEY,
+    FINAL_OBSERVATION_KEY,
+    VectorEnvError,
+    VectorMineDojoAdapter,
+)
+
+NOOP = [0, 0, 0, 12, 12, 0, 0, 0]
+
+
+class _BrokenEnv(FakeMineDojoEnv):
+    def step(self, action):
+        raise RuntimeError("simulator crashed")
+
+
+def test_reset_and_step_batch_observations_across_workers():
+    factory = partial(FakeMineDojoEnv, episode_len=10)
+    with VectorMineDojoAdapter([factory] * 3) as envs:
+        obs, infos = envs.reset()
+        assert obs["rgb"].shape == (3, 3, 160, 256)
+        assert obs["life_stats"]["life"].shape == (3, 1)
+        assert len(infos) == 3
+
+        for step in range(1, 4):
+            obs, rewards, dones, infos = envs.step([NOOP] * 3)
+            np.testing.assert_array_equal(obs["life_stats"]["life"][:, 0], [20.0 - step] * 3)
+            np.testing.assert_array_equal(rewards, [1.0, 1.0, 1.0])
+            assert not dones.any()
+            assert [info["xpos"] for info in infos] == [pytest.approx(10.5 + 0.1 * step)] * 3
+
+
+def test_finished_episodes_auto_reset_and_keep_the_final_observation():
+    factories = [partial(FakeMineDojoEnv, episode_len=2), partial(FakeMineDojoEnv, episode_len=5)]
+    with VectorMineDojoAdapter(factories) as envs:
+        envs.reset()
+        envs.step([NOOP] * 2)
+        _, _, dones, infos = envs.step([NOOP] * 2)
+        np.testing.assert_array_equal(dones, [True, False])
+        assert FINAL_OBSERVATION_KEY in infos[0]
+        assert infos[0][FINAL_INFO_KEY]["xpos"] == pytest.approx(10.7)
+        assert FINAL_OBSERVATION_KEY not in infos[1]
+
+        # The first env restarted its episode, so it runs two more steps.
+        envs.step([NOOP] * 2)
+        _, _, dones, _ = envs.step([NOOP] * 2)
+        np.testing.assert_array_equal(dones, [True, False])
+
+
+def test_step_requires_reset_and_one_action_per_env():
+    with VectorMineDojoAdapter([FakeMineDojoEnv] * 2) as envs:
+        with pytest.raises(ValueError):
+            envs.step([NOOP] * 2)
+        envs.reset()
+        with pytest.raises(ValueError):
+            envs.step([NOOP])
+
+
+def test_worker_failure_names_the_env_and_keeps_the_others_usable():
+    with VectorMineDojoAdapter([FakeMineDojoEnv, _BrokenEnv]) as envs:
+        envs.reset()
+        with pytest.raises(VectorEnvError) as excinfo:
+            envs.step([NOOP] * 2)
+        assert excinfo.value.index == 1
+        assert "simulator crashed" in excinfo.value.remote_traceback
+        obs, _ = envs.reset()
+        assert obs["rgb"].shape[0] == 2